@@ -56,6 +56,7 @@ TOAST_VERTICAL_OFFSET = -5 # 提示文字垂直偏移 (像素)，正值向下，
 # 地图提醒配置
 MAP_ALERT_SECONDS = 30  # 提前提醒时间（秒）/ Time before alert (in seconds)
 MAP_ALERT_WARNING_THRESHOLD_SECONDS = 10  # 倒计时转为警告颜色的阈值（秒）
+MAP_ALERT_PRERENDER_SECONDS = 60  # 提前预渲染提示的时间（秒），事件进入该窗口时预先创建提示窗口并渲染文字，0 为关闭
 MAP_ALERT_NORMAL_COLOR = 'rgb(239, 255, 238)'  # 倒计时提醒的正常颜色
 MAP_ALERT_WARNING_COLOR = 'rgb(255, 0, 0)'  # 倒计时提醒的警告颜色
 
@@ -338,6 +339,14 @@ def get_template_folder(lang, color):
 # 配置用参数，如无必要请勿修改
 #############################
 MUTATOR_WIDTH = 27 #UI界面突变图标区域宽度
+SEARCH_DEBOUNCE_MS = 250 # 地图搜索框输入防抖（毫秒）：停止输入后才切换地图
+DB_CONNECTION_MODE = 'snapshot' # 数据库连接模式: snapshot(内存快照) / pool(每线程 WAL 读连接) / direct(单个共享连接)
+DB_QUERY_CACHE_SIZE = 256 # DAO 查询结果缓存的最大条目数（LRU）
+DB_BACKUP_GENERATIONS = 10 # 每个数据库保留的备份代数
+DB_BACKUP_PAGES_PER_STEP = 64 # 后台备份每步复制的页数
+DB_BACKUP_STEP_SLEEP = 0.005 # 后台备份每步之间的休眠秒数
+RED_DOT_STATS_CSV = '' # 小地图红点检测每帧耗时追加写入的 CSV 路径，空为不写
+MINIMAP_AUTO_LOCATE = False # 是否搜索小地图边框定位小地图（非 16:9 / 改过界面缩放时使用），关闭时按截图高度推算
 
 #############################
 # 读取外部配置相关
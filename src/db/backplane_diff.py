@@ -0,0 +1,123 @@
+# src/db/backplane_diff.py
+# 背板数据差异同步：按主键比较新数据与数据库现有数据，只执行必要的新增 / 修改 / 删除，
+# 并在一个事务中提交，返回变更摘要与受影响的地图 / 因子名称（用于精确失效时间轴缓存）。
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+from src.db.query_cache import query_cache
+
+
+@dataclass
+class BackplaneDiff:
+    table: str
+    columns: Tuple[str, ...]
+    key_columns: Tuple[str, ...]
+    inserted: List[tuple] = field(default_factory=list)   # 完整行
+    updated: List[tuple] = field(default_factory=list)    # 完整行
+    updated_keys: List[tuple] = field(default_factory=list)  # 被修改行在数据库中的原始主键
+    deleted: List[tuple] = field(default_factory=list)    # 主键
+    unchanged: int = 0
+    affected_names: List[str] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.inserted or self.updated or self.deleted)
+
+    def summary(self) -> str:
+        return (
+            f"新增 {len(self.inserted)} 条，修改 {len(self.updated)} 条，删除 {len(self.deleted)} 条，"
+            f"未变化 {self.unchanged} 条，涉及 {len(self.affected_names)} 个项目"
+        )
+
+
+def _normalize(value):
+    """比较用的规范化：空字符串与 NULL 等价，整数值的浮点数与整数 / 数字字符串等价"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value).strip()
+    return text if text else None
+
+
+def compute_diff(conn, table, id_col, columns: Sequence[str], key_columns: Sequence[str],
+                 names, new_rows: Sequence[tuple]) -> BackplaneDiff:
+    """
+    计算 names 范围内的差异。new_rows 为按 columns 排列的完整行；
+    数据库中属于 names 但不在 new_rows 中的行视为删除。new_rows 中主键重复时以后出现的为准。
+    """
+    columns = tuple(columns)
+    key_columns = tuple(key_columns)
+    key_index = [columns.index(c) for c in key_columns]
+    id_index = columns.index(id_col)
+    names = list(dict.fromkeys(names))
+    diff = BackplaneDiff(table=table, columns=columns, key_columns=key_columns)
+    if not names:
+        return diff
+
+    def key_of(row):
+        return tuple(_normalize(row[i]) for i in key_index)
+
+    placeholders = ', '.join(['?'] * len(names))
+    cur = conn.execute(
+        f"SELECT {', '.join(columns)} FROM {table} WHERE {id_col} IN ({placeholders})",
+        names,
+    )
+    current: Dict[tuple, tuple] = {}
+    for r in cur.fetchall():
+        row = tuple(r)
+        current[key_of(row)] = row
+
+    incoming: Dict[tuple, tuple] = {}
+    for row in new_rows:
+        incoming[key_of(row)] = tuple(row)
+
+    affected = set()
+    for key, row in incoming.items():
+        old = current.get(key)
+        if old is None:
+            diff.inserted.append(row)
+            affected.add(row[id_index])
+        elif tuple(map(_normalize, old)) != tuple(map(_normalize, row)):
+            diff.updated.append(row)
+            diff.updated_keys.append(tuple(old[i] for i in key_index))
+            affected.add(row[id_index])
+        else:
+            diff.unchanged += 1
+    for key, old in current.items():
+        if key not in incoming:
+            diff.deleted.append(tuple(old[i] for i in key_index))
+            affected.add(old[id_index])
+
+    diff.affected_names = sorted(affected)
+    return diff
+
+
+def apply_diff(conn, diff: BackplaneDiff):
+    """在一个事务中执行差异（删除 -> 修改 -> 新增），只提交一次；失败时回滚并抛出异常"""
+    if diff.is_empty:
+        return
+    key_where = ' AND '.join(f"{c} IS ?" for c in diff.key_columns)
+
+    try:
+        if diff.deleted:
+            conn.executemany(f"DELETE FROM {diff.table} WHERE {key_where}", diff.deleted)
+        if diff.updated:
+            # 以数据库中的原始主键定位，主键列也一并写入新值（例如空字符串规范为 NULL）
+            assignments = ', '.join(f"{c} = ?" for c in diff.columns)
+            conn.executemany(
+                f"UPDATE {diff.table} SET {assignments} WHERE {key_where}",
+                [row + key for row, key in zip(diff.updated, diff.updated_keys)],
+            )
+        if diff.inserted:
+            conn.executemany(
+                f"INSERT INTO {diff.table} ({', '.join(diff.columns)}) "
+                f"VALUES ({', '.join(['?'] * len(diff.columns))})",
+                diff.inserted,
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        query_cache.invalidate(conn)
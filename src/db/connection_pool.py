@@ -0,0 +1,299 @@
+# src/db/connection_pool.py
+# 连接池与写入串行化：
+# - WriteSerializer：每个数据库一个写线程，所有写入排队执行，队列中已有的多个提交合并为一个事务，
+#   提交后通知监听者（快照替换、时间轴缓存失效等）。
+# - PooledConnection：每个线程一个只读连接（WAL 模式下读写互不阻塞），写入交给 WriteSerializer。
+import queue
+import re
+import sqlite3
+import threading
+from concurrent.futures import Future
+
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+# 这些语句只读，可以直接在读连接上执行
+_READ_PREFIXES = ('SELECT', 'EXPLAIN', 'VALUES')
+# 只有不带参数、不赋值的 PRAGMA（如 PRAGMA user_version）是读；PRAGMA x = y / PRAGMA x(y) 按写处理
+_READ_PRAGMA = re.compile(r'^PRAGMA\s+(\w+\.)?\w+\s*;?\s*$', re.IGNORECASE)
+# 语句开头的空白与注释
+_LEADING_NOISE = re.compile(r'^(\s+|--[^\n]*(\n|$)|/\*.*?\*/)*', re.DOTALL)
+# WITH 语句中 CTE 定义之后真正执行的语句
+_STATEMENT_VERBS = {'SELECT', 'VALUES', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE'}
+_TOKEN = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|`[^`]*`|\[[^\]]*\]|\w+|[()]|\S", re.DOTALL)
+
+
+def _with_statement_verb(sql) -> str:
+    """
+    WITH ... AS (...), ... <语句>：跳过括号内的 CTE 定义与引号内的文字，
+    返回括号外第一个 SELECT / VALUES / INSERT / UPDATE / DELETE / REPLACE。
+    """
+    depth = 0
+    for m in _TOKEN.finditer(sql):
+        token = m.group(0)
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+        elif depth == 0 and token.upper() in _STATEMENT_VERBS:
+            return token.upper()
+    return ''
+
+
+def is_read_statement(sql) -> bool:
+    sql = _LEADING_NOISE.sub('', str(sql), count=1)
+    head = sql[:7].upper()
+    if head.startswith(_READ_PREFIXES):
+        return True
+    if head.startswith('PRAGMA'):
+        return _READ_PRAGMA.match(sql) is not None
+    if head.startswith('WITH'):
+        return _with_statement_verb(sql) in ('SELECT', 'VALUES')
+    return False
+
+
+class WriteSerializer:
+    """
+    单写线程。submit() 提交一组语句（一个调用方事务），返回 Future。
+    写线程每次取出队列中全部待执行的事务，在同一个 BEGIN/COMMIT 中执行，
+    每个调用方事务用 SAVEPOINT 隔离，失败只回滚自己那一部分。
+    """
+
+    def __init__(self, db_path, wal=False):
+        self.db_path = db_path
+        self.wal = wal
+        self._queue = queue.Queue()
+        self._listeners = []
+        self._listeners_lock = threading.Lock()
+        self._commit_count = 0
+        self._ready = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"db-writer-{db_path}", daemon=True
+        )
+        self._thread.start()
+        self._ready.wait()
+
+    @property
+    def commit_count(self) -> int:
+        """已提交且产生数据变化的批次数"""
+        return self._commit_count
+
+    def add_listener(self, callback):
+        """注册变更通知，callback(db_path) 在写线程中、提交方的 Future 完成之前调用"""
+        with self._listeners_lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._listeners_lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def submit(self, statements) -> Future:
+        """statements: [(sql, params, is_many), ...]"""
+        future = Future()
+        self._queue.put((list(statements), future))
+        return future
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    # --- 写线程 ---
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        if self.wal:
+            mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+            if str(mode).lower() != 'wal':
+                logger.warning(f"数据库未能切换到 WAL 模式 ({mode}): {self.db_path}")
+        self._ready.set()
+
+        stopping = False
+        while not stopping:
+            job = self._queue.get()
+            if job is None:
+                break
+            batch = [job]
+            # 合并队列中已经在等待的事务
+            while True:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    stopping = True
+                    break
+                batch.append(job)
+            self._execute_batch(conn, batch)
+        conn.close()
+
+    def _execute_batch(self, conn, batch):
+        results = []
+        changes_before = conn.total_changes
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for index, (statements, future) in enumerate(batch):
+                savepoint = f"job_{index}"
+                conn.execute(f"SAVEPOINT {savepoint}")
+                try:
+                    for sql, params, is_many in statements:
+                        if is_many:
+                            conn.executemany(sql, params)
+                        else:
+                            conn.execute(sql, params)
+                    conn.execute(f"RELEASE {savepoint}")
+                    results.append((future, None))
+                except Exception as e:
+                    conn.execute(f"ROLLBACK TO {savepoint}")
+                    conn.execute(f"RELEASE {savepoint}")
+                    results.append((future, e))
+            conn.execute("COMMIT")
+        except Exception as e:
+            logger.error(f"写入批次提交失败: {e}")
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        if conn.total_changes != changes_before:
+            self._commit_count += 1
+            with self._listeners_lock:
+                listeners = list(self._listeners)
+            for callback in listeners:
+                try:
+                    callback(self.db_path)
+                except Exception as e:
+                    logger.error(f"数据库变更通知失败: {e}")
+
+        for future, error in results:
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+
+class BufferedWriteCursor:
+    """
+    缓冲写语句的 execute / executemany 返回的空游标：语句要到 commit 时才执行，
+    所以没有结果行，rowcount 为 -1，lastrowid 为 None。
+    """
+
+    rowcount = -1
+    lastrowid = None
+    description = None
+
+    def fetchone(self):
+        return None
+
+    def fetchmany(self, size=None):
+        return []
+
+    def fetchall(self):
+        return []
+
+    def __iter__(self):
+        return iter(())
+
+    def close(self):
+        pass
+
+
+_BUFFERED_WRITE_CURSOR = BufferedWriteCursor()
+
+
+class SerializedWriteMixin:
+    """
+    把 sqlite3.Connection 的写接口改为“按线程缓冲、commit 时整体提交到 WriteSerializer”。
+    写语句的 execute 返回 BufferedWriteCursor（没有结果行）；错误在 commit() 时抛出。
+    """
+
+    def _init_write_buffer(self, serializer):
+        self._serializer = serializer
+        self._pending = threading.local()
+
+    def _pending_statements(self):
+        statements = getattr(self._pending, 'statements', None)
+        if statements is None:
+            statements = self._pending.statements = []
+        return statements
+
+    @property
+    def in_transaction(self) -> bool:
+        return bool(getattr(self._pending, 'statements', None))
+
+    def _buffer_write(self, sql, params, is_many):
+        if is_many:
+            params = [tuple(p) if not isinstance(p, dict) else p for p in params]
+        self._pending_statements().append((sql, params, is_many))
+
+    def executemany(self, sql, seq_of_parameters):
+        self._buffer_write(sql, seq_of_parameters, True)
+        return _BUFFERED_WRITE_CURSOR
+
+    def commit(self):
+        statements = getattr(self._pending, 'statements', None)
+        if not statements:
+            return
+        self._pending.statements = []
+        self._serializer.submit(statements).result()
+
+    def rollback(self):
+        self._pending.statements = []
+
+
+class PooledConnection(SerializedWriteMixin):
+    """
+    与 sqlite3.Connection 接口兼容的连接池：每个线程使用自己的只读连接，写入串行化。
+    """
+
+    def __init__(self, db_path, serializer, row_factory=sqlite3.Row):
+        self.db_path = db_path
+        self._row_factory = row_factory
+        self._local = threading.local()
+        self._readers = []
+        self._readers_lock = threading.Lock()
+        self._init_write_buffer(serializer)
+
+    def _reader(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = self._row_factory
+            conn.execute("PRAGMA query_only = ON")
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    @property
+    def row_factory(self):
+        return self._row_factory
+
+    @row_factory.setter
+    def row_factory(self, value):
+        self._row_factory = value
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.row_factory = value
+
+    @property
+    def total_changes(self) -> int:
+        # 写入都发生在写线程中，用提交批次数代替本连接的修改计数
+        return self._serializer.commit_count
+
+    def execute(self, sql, parameters=()):
+        if is_read_statement(sql):
+            return self._reader().execute(sql, parameters)
+        self._buffer_write(sql, parameters, False)
+        return _BUFFERED_WRITE_CURSOR
+
+    def cursor(self):
+        return self._reader().cursor()
+
+    def close(self):
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
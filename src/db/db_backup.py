@@ -0,0 +1,223 @@
+# src/db/db_backup.py
+# 数据库备份轮换：
+# - 使用 sqlite3 的在线 backup() 在后台线程中按页分步复制，每步之间让出 CPU / 磁盘，不阻塞界面。
+# - 每个数据库保留最近 N 代备份，文件名中带内容哈希；内容与已有某一代相同时不再新建文件，
+#   只把那一代提升为最新。
+# - 恢复时先校验备份文件，再用一次 backup() 步骤把整个备份写入正在使用的数据库（单个事务，原子完成）。
+import hashlib
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from src import config
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+# 备份文件名：<数据库名>.<时间戳>.<内容哈希前 16 位>.db
+_GENERATION_PATTERN = re.compile(r'^(?P<stem>.+)\.(?P<stamp>\d{8}-\d{6}-\d{6})\.(?P<hash>[0-9a-f]{16})\.db$')
+_STAMP_FORMAT = '%Y%m%d-%H%M%S-%f'
+
+
+@dataclass(frozen=True)
+class BackupGeneration:
+    db_name: str          # 例如 maps.db
+    path: str
+    created_at: datetime
+    content_hash: str
+
+
+def hash_file(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+class BackupManager:
+    """
+    db_paths：要管理的数据库文件路径列表，备份请求可以用完整路径或文件名（如 'maps.db'）指定数据库。
+    所有备份在同一个后台线程中依次执行，同一数据库排队中的重复请求会合并。
+    """
+
+    def __init__(self, db_paths, backup_dir, generations=None, pages_per_step=None, step_sleep=None):
+        self.backup_dir = backup_dir
+        self.generations = max(1, generations or getattr(config, 'DB_BACKUP_GENERATIONS', 10))
+        self.pages_per_step = pages_per_step or getattr(config, 'DB_BACKUP_PAGES_PER_STEP', 64)
+        self.step_sleep = getattr(config, 'DB_BACKUP_STEP_SLEEP', 0.005) if step_sleep is None else step_sleep
+        self._db_paths: Dict[str, str] = {os.path.basename(p): p for p in db_paths}
+
+        self._queue = queue.Queue()
+        self._pending: Dict[str, Future] = {}
+        self._pending_lock = threading.Lock()
+        # 备份与恢复互斥，避免恢复过程中生成半新半旧的备份
+        self._file_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="db-backup", daemon=True)
+        self._thread.start()
+
+    # --- 备份 ---
+
+    def request_backup(self, db) -> Future:
+        """
+        异步备份一个数据库，立即返回 Future，结果为 BackupGeneration（失败时为异常）。
+        同一数据库已有排队中的请求时直接返回那个 Future。
+        """
+        db_name = self._resolve(db)
+        with self._pending_lock:
+            future = self._pending.get(db_name)
+            if future is None:
+                future = self._pending[db_name] = Future()
+                self._queue.put(db_name)
+            return future
+
+    def request_backup_all(self) -> List[Future]:
+        return [self.request_backup(name) for name in self._db_paths]
+
+    def db_path(self, db) -> str:
+        return self._db_paths[self._resolve(db)]
+
+    def list_generations(self, db) -> List[BackupGeneration]:
+        """某数据库的全部备份，按时间从新到旧排列"""
+        db_name = self._resolve(db)
+        stem = os.path.splitext(db_name)[0]
+        result = []
+        if not os.path.isdir(self.backup_dir):
+            return result
+        for filename in os.listdir(self.backup_dir):
+            m = _GENERATION_PATTERN.match(filename)
+            if not m or m.group('stem') != stem:
+                continue
+            result.append(BackupGeneration(
+                db_name=db_name,
+                path=os.path.join(self.backup_dir, filename),
+                created_at=datetime.strptime(m.group('stamp'), _STAMP_FORMAT),
+                content_hash=m.group('hash'),
+            ))
+        result.sort(key=lambda g: g.created_at, reverse=True)
+        return result
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=10)
+
+    # --- 恢复 ---
+
+    def restore(self, db, generation: Optional[BackupGeneration] = None) -> BackupGeneration:
+        """
+        用指定的一代（默认最新一代）覆盖数据库内容，在调用线程中同步执行。
+        恢复前会先同步备份当前内容，恢复可以再被撤销。
+        备份文件损坏（哈希不符或完整性检查失败）时抛出 ValueError，数据库保持不变。
+        """
+        db_name = self._resolve(db)
+        if generation is None:
+            generations = self.list_generations(db_name)
+            if not generations:
+                raise ValueError(f"没有可用的备份: {db_name}")
+            generation = generations[0]
+
+        # 先备份当前内容（会重命名 / 轮换备份文件，因此在打开备份文件之前进行），再按哈希重新定位要恢复的那一代
+        self._backup_now(db_name, keep_hash=generation.content_hash)
+        generation = next(
+            (g for g in self.list_generations(db_name) if g.content_hash == generation.content_hash), None
+        )
+        if generation is None:
+            raise ValueError(f"备份文件不存在: {db_name}")
+
+        if hash_file(generation.path) != generation.content_hash:
+            raise ValueError(f"备份文件内容与哈希不符: {generation.path}")
+        source = sqlite3.connect(f"file:{generation.path}?mode=ro", uri=True)
+        try:
+            result = source.execute("PRAGMA quick_check").fetchone()[0]
+            if result != 'ok':
+                raise ValueError(f"备份文件完整性检查失败: {result}")
+
+            with self._file_lock:
+                target = sqlite3.connect(self._db_paths[db_name], timeout=30)
+                try:
+                    # pages=-1：一次步骤复制全部页，在目标库的单个写事务中完成
+                    source.backup(target, pages=-1)
+                finally:
+                    target.close()
+        finally:
+            source.close()
+        logger.info(f"已从备份恢复 {db_name}: {os.path.basename(generation.path)}")
+        return generation
+
+    # --- 内部实现 ---
+
+    def _resolve(self, db) -> str:
+        db_name = os.path.basename(str(db))
+        if db_name not in self._db_paths:
+            raise KeyError(f"未受管理的数据库: {db}")
+        return db_name
+
+    def _run(self):
+        while True:
+            db_name = self._queue.get()
+            if db_name is None:
+                break
+            with self._pending_lock:
+                future = self._pending.pop(db_name, None)
+            try:
+                generation = self._backup_now(db_name)
+            except Exception as e:
+                logger.error(f"数据库备份失败 {db_name}: {e}")
+                if future is not None:
+                    future.set_exception(e)
+                continue
+            if future is not None:
+                future.set_result(generation)
+
+    def _backup_now(self, db_name, keep_hash=None) -> BackupGeneration:
+        os.makedirs(self.backup_dir, exist_ok=True)
+        stem = os.path.splitext(db_name)[0]
+        stamp = datetime.now().strftime(_STAMP_FORMAT)
+        tmp_path = os.path.join(self.backup_dir, f"{stem}.{stamp}.tmp")
+
+        with self._file_lock:
+            source = sqlite3.connect(f"file:{self._db_paths[db_name]}?mode=ro", uri=True)
+            target = sqlite3.connect(tmp_path)
+            try:
+                # 分步复制：每步 pages_per_step 页，步与步之间短暂休眠，把磁盘 / CPU 让给游戏与界面
+                source.backup(target, pages=self.pages_per_step, progress=self._throttle)
+            finally:
+                target.close()
+                source.close()
+
+        content_hash = hash_file(tmp_path)
+        generations = self.list_generations(db_name)
+        final_path = os.path.join(self.backup_dir, f"{stem}.{stamp}.{content_hash}.db")
+
+        duplicate = next((g for g in generations if g.content_hash == content_hash), None)
+        if duplicate is not None:
+            # 内容未变化：丢弃新文件，把已有的那一代提升为最新
+            os.remove(tmp_path)
+            os.replace(duplicate.path, final_path)
+            generations.remove(duplicate)
+            logger.debug(f"{db_name} 内容未变化，复用备份 {content_hash}")
+        else:
+            os.replace(tmp_path, final_path)
+            logger.info(f"已备份 {db_name} -> {os.path.basename(final_path)}")
+
+        # 轮换：保留最新的 generations 代（含本次），keep_hash 对应的那一代不删除
+        for old in generations[self.generations - 1:]:
+            if old.content_hash == keep_hash:
+                continue
+            try:
+                os.remove(old.path)
+            except OSError as e:
+                logger.warning(f"删除旧备份失败 {old.path}: {e}")
+
+        return BackupGeneration(db_name, final_path, datetime.strptime(stamp, _STAMP_FORMAT), content_hash)
+
+    def _throttle(self, status, remaining, total):
+        if remaining and self.step_sleep:
+            time.sleep(self.step_sleep)
@@ -1,36 +1,168 @@
 #db_manager.py
 #数据库管理器，负责创建和管理数据库连接
 import sqlite3
+from src import config
 from src.utils.fileutil import get_resources_dir
+from src.db.connection_pool import PooledConnection, WriteSerializer
+from src.db.db_backup import BackupManager
+from src.db.db_snapshot import SnapshotConnection
+from src.db.enemy_comp_index import EnemyCompIndex
+from src.db.migrations import migrate
+from src.db.query_cache import query_cache
+from src.db.timeline_cache import TimelineCache
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
 
 
 class DBManager:
     def __init__(self):
         self.maps_db_path = get_resources_dir("db", "maps.db")
         self.mutators_db_path = get_resources_dir("db", "mutators.db")
+        self.enemies_db_path = get_resources_dir("db", "enemies.db")
         self._maps_conn = None
         self._mutators_conn = None
+        self._enemies_conn = None
+        self._enemy_comp_index = None
+        self._backup_manager = None
+        self._map_timelines = None
+        self._mutator_timelines = None
+        self._serializers = {}
+        self._change_listeners = []
+        # 提交后立即丢弃该数据库的查询缓存条目，不等它们在 LRU 中按 total_changes 失配后被淘汰
+        self.add_change_listener(query_cache.invalidate_db)
+
+    def _connect(self, db_path):
+        """
+        按 DB_CONNECTION_MODE 创建连接：
+        snapshot - 读走内存快照，写入串行化后替换快照（默认）
+        pool     - 每线程一个 WAL 只读连接，写入串行化
+        direct   - 单个共享连接（旧行为）
+        """
+        try:
+            migrate(db_path)
+        except Exception as e:
+            logger.error(f"数据库迁移失败 {db_path}: {e}")
+
+        mode = getattr(config, 'DB_CONNECTION_MODE', 'snapshot')
+        if mode in ('snapshot', 'pool'):
+            serializer = self._get_serializer(db_path, wal=(mode == 'pool'))
+            if mode == 'snapshot':
+                conn = SnapshotConnection(db_path, serializer)
+            else:
+                conn = PooledConnection(db_path, serializer)
+            # 在连接自己的监听（快照重建）之后注册，回调触发时新快照已经生效
+            for callback in self._change_listeners:
+                serializer.add_listener(callback)
+            return conn
+        conn = sqlite3.connect(
+            db_path,
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _get_serializer(self, db_path, wal):
+        serializer = self._serializers.get(db_path)
+        if serializer is None:
+            serializer = WriteSerializer(db_path, wal=wal)
+            self._serializers[db_path] = serializer
+        return serializer
+
+    def add_change_listener(self, callback):
+        """数据库写入提交后的通知 callback(db_path)，在写线程中调用（direct 模式下无通知）"""
+        self._change_listeners.append(callback)
+        for serializer in self._serializers.values():
+            serializer.add_listener(callback)
 
     def get_maps_conn(self):
         if self._maps_conn is None:
-            self._maps_conn = sqlite3.connect(
-                self.maps_db_path,
-                check_same_thread=False
-            )
-            self._maps_conn.row_factory = sqlite3.Row
+            self._maps_conn = self._connect(self.maps_db_path)
         return self._maps_conn
 
     def get_mutators_conn(self):
         if self._mutators_conn is None:
-            self._mutators_conn = sqlite3.connect(
-                self.mutators_db_path,
-                check_same_thread=False
-            )
-            self._mutators_conn.row_factory = sqlite3.Row
+            self._mutators_conn = self._connect(self.mutators_db_path)
         return self._mutators_conn
 
+    def get_enemies_conn(self):
+        if self._enemies_conn is None:
+            self._enemies_conn = self._connect(self.enemies_db_path)
+        return self._enemies_conn
+
+    def get_enemy_comp_index(self):
+        """敌方构成倒排索引（enemies.db 不可用时使用 resources/enemy_comps 下的 CSV）"""
+        if self._enemy_comp_index is None:
+            try:
+                conn = self.get_enemies_conn()
+            except Exception as e:
+                logger.error(f"打开 enemies.db 失败: {e}")
+                conn = None
+            self._enemy_comp_index = EnemyCompIndex.from_db(conn)
+        return self._enemy_comp_index
+
+    def get_map_timelines(self):
+        """地图编译时间轴缓存（与 maps.db 内容绑定）"""
+        if self._map_timelines is None:
+            self._map_timelines = TimelineCache(
+                self.get_maps_conn(), self.maps_db_path, TimelineCache.KIND_MAP
+            )
+        return self._map_timelines
+
+    def get_mutator_timelines(self):
+        """突变因子编译时间轴缓存（与 mutators.db 内容绑定）"""
+        if self._mutator_timelines is None:
+            self._mutator_timelines = TimelineCache(
+                self.get_mutators_conn(), self.mutators_db_path, TimelineCache.KIND_MUTATOR
+            )
+        return self._mutator_timelines
+
+    def get_backup_manager(self):
+        """后台备份轮换（resources/db/db_backups）"""
+        if self._backup_manager is None:
+            self._backup_manager = BackupManager(
+                [self.maps_db_path, self.mutators_db_path, self.enemies_db_path],
+                get_resources_dir("db", "db_backups"),
+            )
+        return self._backup_manager
+
+    def restore_backup(self, db, generation=None):
+        """
+        从备份恢复数据库（默认最新一代），随后刷新内存快照与各级缓存。
+        db 为数据库路径或文件名（如 'maps.db'）。
+        """
+        backup_manager = self.get_backup_manager()
+        generation = backup_manager.restore(db, generation)
+        db_path = backup_manager.db_path(generation.db_name)
+        conn = {
+            self.maps_db_path: self._maps_conn,
+            self.mutators_db_path: self._mutators_conn,
+            self.enemies_db_path: self._enemies_conn,
+        }[db_path]
+        if conn is not None:
+            if isinstance(conn, SnapshotConnection):
+                conn.refresh()
+            query_cache.invalidate(conn)
+        if db_path == self.maps_db_path and self._map_timelines is not None:
+            self._map_timelines.invalidate()
+        if db_path == self.mutators_db_path and self._mutator_timelines is not None:
+            self._mutator_timelines.invalidate()
+        for callback in self._change_listeners:
+            try:
+                callback(db_path)
+            except Exception as e:
+                logger.error(f"数据库变更通知失败: {e}")
+        return generation
+
     def close_all(self):
         if self._maps_conn:
             self._maps_conn.close()
         if self._mutators_conn:
             self._mutators_conn.close()
+        if self._enemies_conn:
+            self._enemies_conn.close()
+        for serializer in self._serializers.values():
+            serializer.close()
+        self._serializers.clear()
+        if self._backup_manager:
+            self._backup_manager.close()
@@ -0,0 +1,161 @@
+# src/db/enemy_comp_index.py
+# 敌方 AI 部队构成的倒排索引：单位 -> [(构成, 首次出现的科技等级)]。
+# 根据已观察到的单位，在 O(观察到的单位数) 内给所有构成打分排序，
+# 用于在第一次交火后迅速缩小敌方 AI 构成的范围（识别器或用户手动输入单位均可）。
+import math
+import re
+import sys
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.db import enemy_comp_daos
+from src.utils.fileutil import get_resources_dir
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+# 单位字符串的分隔符，以及表示数量的后缀（如 "女妖多 解放少"）
+_UNIT_SEPARATORS = re.compile(r'[\s/、,，]+')
+_QUANTITY_SUFFIXES = ('多', '少')
+
+
+def normalize_unit(name) -> str:
+    name = str(name).strip()
+    if len(name) > 1 and name.endswith(_QUANTITY_SUFFIXES):
+        name = name[:-1]
+    return name
+
+
+def split_units(text) -> List[str]:
+    """把 units 原始字符串拆分为规范化的单位名称列表"""
+    if not text:
+        return []
+    units = [normalize_unit(u) for u in _UNIT_SEPARATORS.split(str(text))]
+    return [u for u in units if u]
+
+
+@dataclass(frozen=True)
+class CompCandidate:
+    config_name: str
+    english_name: Optional[str]
+    score: float
+    matched_units: Tuple[str, ...]        # 观察到且属于该构成的单位
+    first_tiers: Tuple[int, ...]          # 与 matched_units 对应的首次出现等级
+
+
+class EnemyCompIndex:
+    """
+    compositions 为 enemy_comp_daos.load_all_compositions 的返回格式。
+    单位权重为 IDF：只出现在少数构成中的单位（如 "大和"）比常见单位区分度更高。
+    """
+
+    def __init__(self, compositions: Dict[str, dict]):
+        self._english_names = {name: comp.get('english_name') for name, comp in compositions.items()}
+        # 单位 -> {构成: 首次出现等级}
+        first_tier: Dict[str, Dict[str, int]] = {}
+        self._tier_units: Dict[str, Dict[int, Tuple[str, ...]]] = {}
+        for name, comp in compositions.items():
+            tiers = {}
+            for tier in sorted(comp.get('tiers', {})):
+                units = tuple(dict.fromkeys(split_units(comp['tiers'][tier])))
+                tiers[tier] = units
+                for unit in units:
+                    first_tier.setdefault(unit, {}).setdefault(name, tier)
+            self._tier_units[name] = tiers
+
+        n = max(len(compositions), 1)
+        self._postings: Dict[str, Tuple[Tuple[str, int], ...]] = {
+            unit: tuple(comps.items()) for unit, comps in first_tier.items()
+        }
+        self._idf: Dict[str, float] = {
+            unit: math.log((n + 1) / len(comps)) for unit, comps in first_tier.items()
+        }
+
+    @classmethod
+    def from_db(cls, conn, csv_dir=None):
+        """从 enemies.db 加载；数据库不可用或为空时回退到 resources/enemy_comps 下的 CSV"""
+        compositions = {}
+        if conn is not None:
+            try:
+                compositions = enemy_comp_daos.load_all_compositions(conn)
+            except Exception as e:
+                logger.error(f"读取 enemy_composition 失败: {e}")
+        if not compositions:
+            compositions = enemy_comp_daos.load_compositions_from_csv(
+                csv_dir or get_resources_dir("enemy_comps")
+            )
+        index = cls(compositions)
+        logger.info(f"已加载 {len(compositions)} 个敌方构成，{len(index._postings)} 个关键单位")
+        return index
+
+    # --- 查询 ---
+
+    def composition_names(self) -> List[str]:
+        return list(self._tier_units.keys())
+
+    def unit_names(self) -> List[str]:
+        return list(self._postings.keys())
+
+    def english_name(self, config_name) -> Optional[str]:
+        return self._english_names.get(config_name)
+
+    def units_of(self, config_name, max_tier=None) -> List[str]:
+        """某构成在 max_tier（含）之前出现过的全部关键单位，按首次出现顺序"""
+        units = {}
+        for tier, tier_units in self._tier_units.get(config_name, {}).items():
+            if max_tier is not None and tier > max_tier:
+                break
+            units.update(dict.fromkeys(tier_units))
+        return list(units)
+
+    def compositions_with(self, unit) -> Tuple[Tuple[str, int], ...]:
+        """包含该单位的 (构成, 首次出现等级)"""
+        return self._postings.get(normalize_unit(unit), ())
+
+    def rank(self, observed_units: Iterable[str], max_tier=None, limit=None) -> List[CompCandidate]:
+        """
+        按已观察到的单位给构成排序。只遍历观察到的单位的倒排表，未知单位被忽略。
+        max_tier：当前可能达到的最高科技等级，晚于该等级才出现的单位不计分。
+        同分时首次出现等级之和较小者优先（更早能见到这些单位）。
+        """
+        scores: Dict[str, float] = {}
+        matched: Dict[str, List[Tuple[str, int]]] = {}
+        for unit in dict.fromkeys(normalize_unit(u) for u in observed_units):
+            postings = self._postings.get(unit)
+            if not postings:
+                continue
+            weight = self._idf[unit]
+            for config_name, tier in postings:
+                if max_tier is not None and tier > max_tier:
+                    continue
+                scores[config_name] = scores.get(config_name, 0.0) + weight
+                matched.setdefault(config_name, []).append((unit, tier))
+
+        order = sorted(
+            scores,
+            key=lambda name: (-scores[name], sum(t for _, t in matched[name]), name),
+        )
+        if limit is not None:
+            order = order[:limit]
+        return [
+            CompCandidate(
+                config_name=name,
+                english_name=self._english_names.get(name),
+                score=round(scores[name], 4),
+                matched_units=tuple(u for u, _ in matched[name]),
+                first_tiers=tuple(t for _, t in matched[name]),
+            )
+            for name in order
+        ]
+
+
+# 测试代码：python -m src.db.enemy_comp_index 大和 渡鸦
+if __name__ == '__main__':
+    from src.db.db_manager import DBManager
+
+    index = DBManager().get_enemy_comp_index()
+    observed = sys.argv[1:] or ['解放', '渡鸦']
+    print(f"观察到: {observed}")
+    for candidate in index.rank(observed, limit=5):
+        print(f"  {candidate.config_name} ({candidate.english_name}) "
+              f"score={candidate.score} units={candidate.matched_units} tiers={candidate.first_tiers}")
@@ -1,49 +1,47 @@
 # src/db/map_daos.py
+from src.db.query_cache import query_cache
 
 # 根据地图名称加载地图配置
 def load_map_by_name(conn, map_name):
   #键值：	"map_name","time_label"，	"time_value","count_value",	"event_text",	"army_text"，"sound_filename"，"hero_text"
+    # 显式列出查询列，使查询能直接由覆盖索引返回（见 migrations.py）
     if map_name =='净网行动':
     # 特殊排序逻辑：优先按 已净化节点count_value 升序，其次按 倒计时 time_value 降序,
-    # 最后再按 波次T>压制塔 event_text 特定规则排序
+    # 最后再按 波次T>压制塔 event_text 特定规则排序（event_rank 为预先计算的排序键）
         sql = """
-        SELECT *
+        SELECT map_name, time_label, time_value, count_value, event_text, army_text, sound_filename, hero_text
         FROM map_configs
         WHERE map_name = ?
         ORDER BY
             count_value ASC,
             time_value DESC,
-            CASE
-                WHEN event_text GLOB 'T[0-9]*' THEN 1
-                ELSE 0
-            END DESC,
+            event_rank DESC,
             event_text ASC
         """
     else:
     # 一般排序逻辑：按 time_value 升序
         sql = """
-        SELECT *
+        SELECT map_name, time_label, time_value, count_value, event_text, army_text, sound_filename, hero_text
         FROM map_configs
         WHERE map_name = ?
         ORDER BY time_value ASC
         """
-    cur = conn.execute(sql, (map_name,))
-    rows = cur.fetchall()
+    rows = query_cache.fetchall(conn, sql, (map_name,))
 
     result = []
-    # 组织结果为字典列表，便于日后数据库修改
-    for r in rows:
+    # 组织结果为字典列表，便于日后数据库修改（缓存中是不可变元组，每次返回新的字典，调用方可随意修改）
+    for name, label, value, count, event, army, sound, hero in rows:
         result.append({
-            "map_name": r["map_name"],
+            "map_name": name,
             "time": {
-                "label": r["time_label"],
-                "value": r["time_value"],
+                "label": label,
+                "value": value,
             },
-            "count": r["count_value"],
-            "event": r["event_text"],
-            "army": r["army_text"],
-            "sound": r["sound_filename"],
-            "hero": r["hero_text"],
+            "count": count,
+            "event": event,
+            "army": army,
+            "sound": sound,
+            "hero": hero,
         })
     return result
 
@@ -52,11 +50,31 @@ def get_all_map_names(conn):
     sql = """
     SELECT * FROM maps
     """
-    cur = conn.execute(sql)
-    rows = cur.fetchall()
+    rows = query_cache.fetchall(conn, sql)
     return [row[0] for row in rows]
 
 
+# 导出全部地图配置：一次有序查询，地图顺序与 get_all_map_names 一致，
+# 每张地图内部的顺序与 load_map_by_name 一致（净网行动使用特殊排序）
+MAP_EXPORT_COLUMNS = ('map_name', 'time_label', 'count_value', 'event_text', 'army_text', 'sound_filename', 'hero_text')
+
+def export_all_map_configs(conn):
+    """返回 (列名元组, 行列表)，行按 MAP_EXPORT_COLUMNS 排列"""
+    sql = f"""
+    SELECT {', '.join('c.' + col for col in MAP_EXPORT_COLUMNS)}
+    FROM maps m
+    JOIN map_configs c ON c.map_name = m.map_name
+    ORDER BY
+        m.rowid,
+        CASE WHEN c.map_name = '净网行动' THEN c.count_value END ASC,
+        CASE WHEN c.map_name = '净网行动' THEN -c.time_value ELSE c.time_value END ASC,
+        CASE WHEN c.map_name = '净网行动' THEN c.event_rank END DESC,
+        -- 同一时间点的多条事件：与 load_map_by_name 走的覆盖索引顺序一致
+        c.time_label, c.count_value, c.event_text
+    """
+    return MAP_EXPORT_COLUMNS, conn.execute(sql).fetchall()
+
+
 # === 关键词管理 ===
 
 # 搜索关键词对应的地图列表
@@ -67,16 +85,19 @@ def search_maps_by_keyword(conn, keyword):
     WHERE keyword = ?
     ORDER BY priority DESC
     """
-    cur = conn.execute(sql, (keyword,))
-    return [row[0] for row in cur.fetchall()]
+    return [row[0] for row in query_cache.fetchall(conn, sql, (keyword,))]
 
 # 获取所有搜索关键词映射
 def get_all_keywords(conn):
     """获取所有搜索关键词映射"""
     sql = "SELECT keyword, map_name FROM map_keywords ORDER BY priority DESC"
-    cur = conn.execute(sql)
     # 返回字典格式，方便业务层直接使用
-    return {row[0]: row[1] for row in cur.fetchall()}
+    return {row[0]: row[1] for row in query_cache.fetchall(conn, sql)}
+
+# 获取全部 (关键词, 地图名)，按优先级从高到低排列（同一关键词可对应多张地图）
+def get_keyword_entries(conn):
+    sql = "SELECT keyword, map_name FROM map_keywords ORDER BY priority DESC"
+    return [(row[0], row[1]) for row in query_cache.fetchall(conn, sql)]
 
 # 批量更新关键词（清空并重建）
 def update_keywords_batch(conn, keyword_dict):
@@ -85,6 +106,7 @@ def update_keywords_batch(conn, keyword_dict):
     sql = "INSERT INTO map_keywords (keyword, map_name) VALUES (?, ?)"
     conn.executemany(sql, keyword_dict.items())
     conn.commit()
+    query_cache.invalidate(conn)
 
 # === Excel 导入支持 ===
 def convert_time_to_seconds(time_str):
@@ -97,6 +119,22 @@ def convert_time_to_seconds(time_str):
     except:
         return 0
 
+# map_configs 的列顺序与主键
+MAP_CONFIG_COLUMNS = ('map_name', 'time_label', 'time_value', 'count_value', 'event_text', 'army_text',
+                      'sound_filename', 'hero_text')
+MAP_CONFIG_KEY = ('map_name', 'time_value', 'event_text')
+
+def map_config_row(item):
+    """把导入 / 编辑得到的字典转换为按 MAP_CONFIG_COLUMNS 排列的行"""
+    # 自动换算：$$TotalSeconds = Minutes \times 60 + Seconds$$
+    t_val = item.get('time_value')
+    if t_val is None:
+        t_val = convert_time_to_seconds(str(item['time_label']))
+    return (
+        item['map_name'], item['time_label'], t_val, item.get('count_value'),
+        item.get('event_text'), item.get('army_text'), item.get('sound_filename'), item.get('hero_text')
+    )
+
 def bulk_import_map_configs(conn, data_list):
     """
     批量导入地图配置。
@@ -107,16 +145,8 @@ def bulk_import_map_configs(conn, data_list):
     (map_name, time_label, time_value, count_value, event_text, army_text, sound_filename, hero_text)
     VALUES (?, ?, ?, ?, ?, ?, ?, ?)
     """
-    processed_data = []
-    for item in data_list:
-        # 自动换算：$$TotalSeconds = Minutes \times 60 + Seconds$$
-        t_val = item.get('time_value')
-        if t_val is None:
-            t_val = convert_time_to_seconds(str(item['time_label']))
-        processed_data.append((
-            item['map_name'], item['time_label'], t_val, item.get('count_value'),
-            item.get('event_text'), item.get('army_text'), item.get('sound_filename'), item.get('hero_text')
-        ))
+    processed_data = [map_config_row(item) for item in data_list]
 
     conn.executemany(sql, processed_data)
-    conn.commit()
\ No newline at end of file
+    conn.commit()
+    query_cache.invalidate(conn)
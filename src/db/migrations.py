@@ -0,0 +1,84 @@
+# src/db/migrations.py
+# 数据库结构迁移：以 PRAGMA user_version 作为 schema_version，
+# 启动时按版本号顺序执行尚未应用的迁移，每个迁移在单独的事务中完成。
+import os
+import sqlite3
+
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+# 每个数据库文件的迁移列表：(版本号, 说明, SQL 语句列表)，版本号必须严格递增
+MIGRATIONS = {
+    'maps.db': [
+        (1, "地图事件 / 关键词查询的覆盖索引，净网行动排序键", [
+            # load_map_by_name（一般地图）：按名称查找并按时间排序，索引包含全部列，无需回表
+            """
+            CREATE INDEX IF NOT EXISTS idx_map_configs_name_time
+            ON map_configs (map_name, time_value, time_label, count_value, event_text,
+                            army_text, sound_filename, hero_text)
+            """,
+            # 净网行动的“波次 T 优先”排序键，由 SQLite 维护，写入无需额外处理
+            """
+            ALTER TABLE map_configs ADD COLUMN event_rank INTEGER
+            GENERATED ALWAYS AS (CASE WHEN event_text GLOB 'T[0-9]*' THEN 1 ELSE 0 END) VIRTUAL
+            """,
+            # load_map_by_name（净网行动）：索引顺序与 ORDER BY 完全一致，排序键在索引中预先计算
+            """
+            CREATE INDEX IF NOT EXISTS idx_map_configs_malwarfare_order
+            ON map_configs (map_name, count_value ASC, time_value DESC, event_rank DESC, event_text ASC,
+                            time_label, army_text, sound_filename, hero_text)
+            """,
+            # search_maps_by_keyword：按关键词查找并按优先级排序
+            """
+            CREATE INDEX IF NOT EXISTS idx_map_keywords_keyword_priority
+            ON map_keywords (keyword, priority DESC, map_name)
+            """,
+        ]),
+    ],
+    'mutators.db': [
+        (1, "突变因子时间点查询的覆盖索引", [
+            # load_mutator_by_name：按名称查找并按时间排序
+            """
+            CREATE INDEX IF NOT EXISTS idx_mutator_configs_name_time
+            ON mutator_configs (mutator_name, time_value, time_label, content_text, sound_filename)
+            """,
+        ]),
+    ],
+}
+
+
+def get_schema_version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(db_path, migrations=None) -> int:
+    """
+    对 db_path 执行尚未应用的迁移，返回迁移后的 schema_version。
+    migrations 默认按文件名从 MIGRATIONS 中选取；失败的迁移整体回滚并抛出异常。
+    """
+    if migrations is None:
+        migrations = MIGRATIONS.get(os.path.basename(db_path), [])
+    if not migrations or not os.path.exists(db_path):
+        return 0
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        version = get_schema_version(conn)
+        for target_version, description, statements in migrations:
+            if target_version <= version:
+                continue
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for sql in statements:
+                    conn.execute(sql)
+                conn.execute(f"PRAGMA user_version = {int(target_version)}")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            version = target_version
+            logger.info(f"数据库迁移完成 {os.path.basename(db_path)} -> v{version}: {description}")
+        return version
+    finally:
+        conn.close()
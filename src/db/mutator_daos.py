@@ -1,27 +1,27 @@
 # src/db/mutator_daos.py
+from src.db.query_cache import query_cache
 
 # 根据突变名称加载突变配置
 def load_mutator_by_name(conn, mutator_name):
   #键值：	"mutator_name",	"time_label", "time_value",	"content_text","sound_filename"
     sql = """
-    SELECT *
+    SELECT mutator_name, time_label, time_value, content_text, sound_filename
     FROM mutator_configs
     WHERE mutator_name = ?
     ORDER BY time_value ASC
     """
-    cur = conn.execute(sql, (mutator_name,))
-    rows = cur.fetchall()
+    rows = query_cache.fetchall(conn, sql, (mutator_name,))
     result = []
-    # 组织结果为字典列表，便于日后数据库修改
-    for r in rows:
+    # 组织结果为字典列表，便于日后数据库修改（缓存中是不可变元组，每次返回新的字典）
+    for name, label, value, content, sound in rows:
         result.append({
-            "mutator_name": r["mutator_name"],
+            "mutator_name": name,
             "time": {
-                "label": r["time_label"],
-                "value": r["time_value"],
+                "label": label,
+                "value": value,
             },
-            "content": r["content_text"],
-            "sound": r["sound_filename"],
+            "content": content,
+            "sound": sound,
         })
     return result
 
@@ -30,8 +30,7 @@ def get_all_mutator_names(conn):
     sql = """
     SELECT mutator_name FROM mutator_meta ORDER BY sort_order ASC;
     """
-    cur = conn.execute(sql)
-    rows = cur.fetchall()
+    rows = query_cache.fetchall(conn, sql)
     return  [row[0] for row in rows]
 
 # 获取需要通知的突变列表
@@ -39,10 +38,22 @@ def get_all_notify_mutator_names(conn):
     sql = """
     SELECT mutator_name FROM mutator_meta WHERE need_notify = 1 ORDER BY sort_order ASC;
     """
-    cur = conn.execute(sql)
-    rows = cur.fetchall()
+    rows = query_cache.fetchall(conn, sql)
     return  [row[0] for row in rows]
 
+# 导出全部突变配置：一次有序查询，顺序与 get_all_mutator_names + load_mutator_by_name 一致
+MUTATOR_EXPORT_COLUMNS = ('mutator_name', 'time_label', 'content_text', 'sound_filename')
+
+def export_all_mutator_configs(conn):
+    """返回 (列名元组, 行列表)，行按 MUTATOR_EXPORT_COLUMNS 排列"""
+    sql = f"""
+    SELECT {', '.join('c.' + col for col in MUTATOR_EXPORT_COLUMNS)}
+    FROM mutator_meta m
+    JOIN mutator_configs c ON c.mutator_name = m.mutator_name
+    ORDER BY m.sort_order ASC, c.time_value ASC
+    """
+    return MUTATOR_EXPORT_COLUMNS, conn.execute(sql).fetchall()
+
 # === Excel 导入支持 ===
 
 def convert_time_to_seconds(time_str):
@@ -55,6 +66,20 @@ def convert_time_to_seconds(time_str):
     except:
         return 0
 
+# mutator_configs 的列顺序与主键
+MUTATOR_CONFIG_COLUMNS = ('mutator_name', 'time_label', 'time_value', 'content_text', 'sound_filename')
+MUTATOR_CONFIG_KEY = ('mutator_name', 'time_value')
+
+def mutator_config_row(item):
+    """把导入 / 编辑得到的字典转换为按 MUTATOR_CONFIG_COLUMNS 排列的行"""
+    t_val = item.get('time_value')
+    if t_val is None:
+        t_val = convert_time_to_seconds(str(item['time_label']))
+    return (
+        item['mutator_name'], item['time_label'], t_val,
+        item.get('content_text'), item.get('sound_filename')
+    )
+
 def bulk_import_mutator_configs(conn, data_list):
     """批量导入突变配置"""
     sql = """
@@ -62,16 +87,8 @@ def bulk_import_mutator_configs(conn, data_list):
     (mutator_name, time_label, time_value, content_text, sound_filename)
     VALUES (?, ?, ?, ?, ?)
     """
-    processed_data = []
-    for item in data_list:
-        t_val = item.get('time_value')
-        if t_val is None:
-            t_val = convert_time_to_seconds(str(item['time_label']))
-        processed_data.append((
-            item['mutator_name'], item['time_label'], t_val, 
-            item.get('content_text'), item.get('sound_filename')
-        ))
-
+    processed_data = [mutator_config_row(item) for item in data_list]
 
     conn.executemany(sql, processed_data)
-    conn.commit()
\ No newline at end of file
+    conn.commit()
+    query_cache.invalidate(conn)
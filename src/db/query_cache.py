@@ -0,0 +1,82 @@
+# src/db/query_cache.py
+# DAO 级查询结果缓存：以 (数据库, SQL, 参数) 为键，缓存不可变的行元组，按 LRU 淘汰。
+# 重复选择地图、切换变体、开关突变因子时，同一查询只需一次字典查找。
+# 写入路径（bulk_import_*、update_keywords_batch、差异同步）会显式失效对应数据库的全部条目，
+# DBManager 也在写线程每次提交后按数据库路径失效（invalidate_db）；
+# 另外每个条目记录写入时连接的 total_changes，经同一个连接绕过 DAO 的写入也不会读到旧数据。
+# 只缓存带 db_path 的连接（SnapshotConnection / PooledConnection，写入都经过它们）；
+# 普通 sqlite3.Connection（direct 模式、工具脚本临时打开的连接）直接查询不缓存：
+# 其他连接的写入不会改变它的 total_changes，而且关闭后 id 可能被新连接复用。
+import threading
+from collections import OrderedDict
+
+from src import config
+
+
+class QueryCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # key -> (stamp, rows)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def db_key(conn):
+        """同一数据库文件的多个连接共享缓存条目；没有路径信息的连接返回 None（不缓存）"""
+        return getattr(conn, 'db_path', None) or None
+
+    @staticmethod
+    def _stamp(conn):
+        try:
+            return conn.total_changes
+        except Exception:
+            return None
+
+    def fetchall(self, conn, sql, args=()):
+        """执行只读查询并返回 tuple(tuple(row))，命中时不访问数据库"""
+        args = tuple(args)
+        db = self.db_key(conn)
+        if db is None:
+            return tuple(tuple(r) for r in conn.execute(sql, args).fetchall())
+
+        key = (db, sql, args)
+        stamp = self._stamp(conn)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+        rows = tuple(tuple(r) for r in conn.execute(sql, args).fetchall())
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (stamp, rows)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return rows
+
+    def invalidate(self, conn=None):
+        """失效 conn 所在数据库的全部条目；conn 为 None 时清空缓存"""
+        with self._lock:
+            if conn is None:
+                self._entries.clear()
+                return
+        self.invalidate_db(self.db_key(conn))
+
+    def invalidate_db(self, db_path):
+        """失效某个数据库文件的全部条目，可直接作为 DBManager.add_change_listener 的回调"""
+        if db_path is None:
+            return
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == db_path]:
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# 全局共享实例，由各 DAO 使用
+query_cache = QueryCache(getattr(config, 'DB_QUERY_CACHE_SIZE', 256))
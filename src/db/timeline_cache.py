@@ -0,0 +1,254 @@
+# src/db/timeline_cache.py
+# 编译后的时间轴缓存：把 map_configs / mutator_configs 的查询结果压成列式数组，
+# 并以数据库文件内容哈希为键持久化到 db 文件旁边。
+# 切换地图 / 开关因子时直接取数组，不再重复执行 SQL 和构造嵌套字典。
+import hashlib
+import os
+import pickle
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from src.db import map_daos, mutator_daos
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+# 持久化格式版本，结构变化时递增，旧缓存文件会被自动丢弃
+CACHE_FORMAT_VERSION = 1
+
+# count_value 为 NULL 时在数组中的占位值
+NO_COUNT = -1
+
+
+@dataclass(frozen=True)
+class MapTimeline:
+    """单张地图的列式时间轴，行顺序与 map_daos.load_map_by_name 一致"""
+    name: str
+    time_values: np.ndarray     # int32
+    count_values: np.ndarray    # int32，NULL 记为 NO_COUNT
+    time_labels: Tuple[str, ...]
+    events: Tuple[str, ...]
+    armies: Tuple[str, ...]
+    sounds: Tuple[str, ...]
+    heroes: Tuple[str, ...]
+
+    def __len__(self) -> int:
+        return len(self.time_labels)
+
+
+@dataclass(frozen=True)
+class MutatorTimeline:
+    """单个突变因子的列式时间轴，按 time_value 升序"""
+    name: str
+    time_values: np.ndarray     # int32
+    time_labels: Tuple[str, ...]
+    contents: Tuple[str, ...]
+    sounds: Tuple[str, ...]
+
+    def __len__(self) -> int:
+        return len(self.time_labels)
+
+    def iter_time_points(self) -> Iterator[Tuple[int, str, str]]:
+        """按 MutatorManager 使用的 (秒数, 内容, 音频) 形式遍历"""
+        for i in range(len(self)):
+            yield int(self.time_values[i]), self.contents[i], self.sounds[i]
+
+
+def _text(value) -> str:
+    return "" if value is None else str(value)
+
+
+def _count(value) -> int:
+    """count_value 可能是 NULL 或空字符串，统一记为 NO_COUNT"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return NO_COUNT
+
+
+def compile_map_timeline(map_name, map_rows) -> MapTimeline:
+    """把 load_map_by_name 的结果编译成 MapTimeline"""
+    return MapTimeline(
+        name=map_name,
+        time_values=np.array([r['time']['value'] for r in map_rows], dtype=np.int32),
+        count_values=np.array(
+            [_count(r['count']) for r in map_rows],
+            dtype=np.int32,
+        ),
+        time_labels=tuple(_text(r['time']['label']) for r in map_rows),
+        events=tuple(_text(r['event']) for r in map_rows),
+        armies=tuple(_text(r['army']) for r in map_rows),
+        sounds=tuple(_text(r['sound']) for r in map_rows),
+        heroes=tuple(_text(r['hero']) for r in map_rows),
+    )
+
+
+def compile_mutator_timeline(mutator_name, mutator_rows) -> MutatorTimeline:
+    """把 load_mutator_by_name 的结果编译成 MutatorTimeline"""
+    return MutatorTimeline(
+        name=mutator_name,
+        time_values=np.array([r['time']['value'] for r in mutator_rows], dtype=np.int32),
+        time_labels=tuple(_text(r['time']['label']) for r in mutator_rows),
+        contents=tuple(_text(r['content']) for r in mutator_rows),
+        sounds=tuple(_text(r['sound']) for r in mutator_rows),
+    )
+
+
+def hash_db_file(db_path) -> Optional[str]:
+    """计算数据库文件内容哈希（WAL 模式下包含尚未检查点的 -wal 文件），文件不存在时返回 None"""
+    if not db_path or not os.path.exists(db_path):
+        return None
+    digest = hashlib.sha1()
+    for path in (db_path, f"{db_path}-wal"):
+        if not os.path.exists(path):
+            continue
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TimelineCache:
+    """
+    某个数据库（maps / mutators）的编译时间轴缓存。
+
+    有效性判断分两层：
+    1. 内存层：PRAGMA data_version（其他连接的提交）+ conn.total_changes（本连接的写入），
+       两者都没变化时直接返回内存中的时间轴。
+    2. 磁盘层：数据库文件内容哈希，与 db 同目录下的 <db>.timeline.pkl 中记录的哈希一致时，
+       启动阶段直接反序列化，跳过全部 SQL。
+    """
+
+    KIND_MAP = 'map'
+    KIND_MUTATOR = 'mutator'
+
+    _REGISTRY = {
+        KIND_MAP: (map_daos.get_all_map_names, map_daos.load_map_by_name, compile_map_timeline),
+        KIND_MUTATOR: (mutator_daos.get_all_mutator_names, mutator_daos.load_mutator_by_name, compile_mutator_timeline),
+    }
+
+    def __init__(self, conn, db_path, kind):
+        if kind not in self._REGISTRY:
+            raise ValueError(f"未知的时间轴类型: {kind}")
+        self.conn = conn
+        self.db_path = db_path
+        self.kind = kind
+        self.cache_path = f"{os.path.splitext(db_path)[0]}.timeline.pkl" if db_path else None
+
+        self._db_hash = None
+        self._stamp = None
+        self._timelines: Dict[str, object] = {}
+
+        self._refresh(force=True)
+
+    def get(self, name):
+        """返回指定名称的编译时间轴；数据库中不存在时返回 None"""
+        self._refresh()
+        timeline = self._timelines.get(name)
+        if timeline is None:
+            timeline = self._compile_one(name)
+            if timeline is not None:
+                self._timelines[name] = timeline
+                self._save()
+        return timeline
+
+    def names(self):
+        self._refresh()
+        return list(self._timelines.keys())
+
+    def invalidate(self, names=None):
+        """写入后显式失效：names 为 None 时重建全部，否则只重建指定项"""
+        if names is None:
+            self._timelines.clear()
+            self._compile_all()
+        else:
+            for name in names:
+                self._timelines.pop(name, None)
+                timeline = self._compile_one(name)
+                if timeline is not None:
+                    self._timelines[name] = timeline
+        self._db_hash = hash_db_file(self.db_path)
+        self._stamp = self._read_stamp()
+        self._save()
+
+    # --- 内部实现 ---
+
+    def _read_stamp(self):
+        try:
+            data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        except Exception:
+            data_version = None
+        return data_version, self.conn.total_changes
+
+    def _refresh(self, force=False):
+        stamp = self._read_stamp()
+        if not force and stamp == self._stamp:
+            return
+        self._stamp = stamp
+
+        db_hash = hash_db_file(self.db_path)
+        if not force and db_hash == self._db_hash and self._timelines:
+            return
+
+        self._db_hash = db_hash
+        self._timelines = {}
+        if self._load(db_hash):
+            logger.info(f"已从缓存文件加载 {len(self._timelines)} 条 {self.kind} 时间轴: {self.cache_path}")
+            return
+
+        self._compile_all()
+        self._save()
+        logger.info(f"已重新编译 {len(self._timelines)} 条 {self.kind} 时间轴")
+
+    def _compile_one(self, name):
+        _, dao_load, compile_func = self._REGISTRY[self.kind]
+        rows = dao_load(self.conn, name)
+        if not rows:
+            return None
+        return compile_func(name, rows)
+
+    def _compile_all(self):
+        dao_get_names = self._REGISTRY[self.kind][0]
+        for name in dao_get_names(self.conn):
+            timeline = self._compile_one(name)
+            if timeline is not None:
+                self._timelines[name] = timeline
+
+    def _load(self, db_hash):
+        if not db_hash or not self.cache_path or not os.path.exists(self.cache_path):
+            return False
+        try:
+            with open(self.cache_path, 'rb') as f:
+                payload = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"读取时间轴缓存失败，将重新编译: {e}")
+            return False
+
+        if (
+            payload.get('format') != CACHE_FORMAT_VERSION
+            or payload.get('kind') != self.kind
+            or payload.get('db_hash') != db_hash
+        ):
+            return False
+
+        self._timelines = dict(payload.get('timelines', {}))
+        return True
+
+    def _save(self):
+        if not self._db_hash or not self.cache_path:
+            return
+        payload = {
+            'format': CACHE_FORMAT_VERSION,
+            'kind': self.kind,
+            'db_hash': self._db_hash,
+            'timelines': self._timelines,
+        }
+        tmp_path = f"{self.cache_path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            logger.warning(f"写入时间轴缓存失败: {e}")
@@ -0,0 +1,104 @@
+# alert_rules.py
+# 提醒判定的纯函数：只根据时间轴和当前秒数计算“该不该提醒、提醒什么”，不依赖 Qt。
+# MapEventManager / MutatorManager / CountdownManager 与无界面模拟器共用这里的规则，
+# 保证模拟结果与实际播报一致。
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src import config
+from src.utils.temp_translate_utils import mutator_names_to_CHS
+
+
+def parse_time_label(time_text) -> int:
+    """将 MM:SS 或 HH:MM:SS 转换为秒数，格式错误时抛出 ValueError"""
+    parts = str(time_text).split(':')
+    if len(parts) == 2:
+        return int(parts[0]) * 60 + int(parts[1])
+    if len(parts) == 3:
+        return int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
+    raise ValueError(f"Invalid time format: {time_text}")
+
+
+# === 地图事件 ===
+
+def map_alert_rows(time_values: Sequence[int], current_seconds, alert_seconds=None) -> List[Tuple[int, int]]:
+    """返回处于提醒窗口内的 (行号, 剩余秒数)，窗口为 (0, alert_seconds]"""
+    if alert_seconds is None:
+        alert_seconds = config.MAP_ALERT_SECONDS
+    time_diffs = np.asarray(time_values, dtype=np.int64) - current_seconds
+    rows = np.flatnonzero((time_diffs > 0) & (time_diffs <= alert_seconds))
+    return list(zip(rows.tolist(), time_diffs[rows].tolist()))
+
+
+def map_prerender_rows(time_values: Sequence[int], current_seconds, alert_seconds=None,
+                       lookahead_seconds=None) -> List[Tuple[int, int]]:
+    """返回即将进入提醒窗口、需要预渲染的 (行号, 剩余秒数)，窗口为 (alert_seconds, lookahead_seconds]"""
+    if alert_seconds is None:
+        alert_seconds = config.MAP_ALERT_SECONDS
+    if lookahead_seconds is None:
+        lookahead_seconds = getattr(config, 'MAP_ALERT_PRERENDER_SECONDS', 60)
+    time_diffs = np.asarray(time_values, dtype=np.int64) - current_seconds
+    rows = np.flatnonzero((time_diffs > alert_seconds) & (time_diffs <= lookahead_seconds))
+    return list(zip(rows.tolist(), time_diffs[rows].tolist()))
+
+
+def build_map_alert_message(time_diff, time_label, event_text, army_text=None, hero_text="",
+                            is_heroes_from_the_storm_active=False) -> str:
+    """地图事件提示文本"""
+    return (
+        f'{time_diff:0>2}秒后'
+        + f"{time_label}\t{event_text}"
+        + (f"\t{army_text}" if army_text is not None else "")
+        + (f"风暴: \t{hero_text}" if is_heroes_from_the_storm_active and hero_text else "")
+    )
+
+
+def build_malwarfare_alert_message(time_diff, time_label, event_text, army_text="") -> str:
+    """净网行动事件提示文本，time_diff 为距离事件的剩余倒计时"""
+    return f'余{int(time_diff):0>2}秒  ' + f"  {time_label}\t{event_text}" + (
+        f"\t{army_text}" if army_text else "")
+
+
+def toast_color_and_sound(time_diff, sound_filename=None, default_color=None) -> Tuple[str, Optional[str]]:
+    """ToastManager 的配色与音频规则：进入警告阈值后变色，并带上音频"""
+    text_color = default_color if default_color else config.MAP_ALERT_NORMAL_COLOR
+    final_sound_filename = None
+    if time_diff is not None and time_diff <= config.MAP_ALERT_WARNING_THRESHOLD_SECONDS:
+        text_color = config.MAP_ALERT_WARNING_COLOR
+        if sound_filename:
+            final_sound_filename = sound_filename
+    return text_color, final_sound_filename
+
+
+# === 突变因子 ===
+
+def find_next_time_point(time_points, current_seconds) -> Optional[Tuple[int, str, str]]:
+    """在已排序的 (秒数, 内容, 音频) 列表中找到下一个尚未到达的时间点"""
+    for time_point in time_points:
+        if time_point[0] > current_seconds:
+            return time_point
+    return None
+
+
+def build_mutator_alert_message(mutator_name, time_remaining, content) -> str:
+    """突变因子倒计时提示文本"""
+    if mutator_name == "AggressiveDeploymentProtoss" or mutator_name == "AggressiveDeployment":
+        # 部署因子涉及到强度信息
+        return f"{int(time_remaining)}秒后：{mutator_names_to_CHS.get(mutator_name)} 强度：{content}"
+    # 其他因子只涉及到数量，风暴不由 mutatormanager 播报
+    return f"{int(time_remaining)}秒后：{mutator_names_to_CHS.get(mutator_name)}*{content} "
+
+
+def mutator_color_and_sound(time_remaining, warning_sound_filename=None) -> Tuple[str, Optional[str]]:
+    """MutatorManager 的配色与音频规则"""
+    if time_remaining is not None and time_remaining <= config.MUTATOR_WARNING_THRESHOLD_SECONDS:
+        return config.MUTATOR_WARNING_COLOR, warning_sound_filename
+    return config.MUTATOR_NORMAL_COLOR, None
+
+
+# === 自定义倒计时 ===
+
+def build_countdown_message(label, remaining) -> str:
+    """自定义倒计时提示文本，格式: "BOSS: 55秒" """
+    return f"{label}: {int(remaining)}秒"
@@ -6,6 +6,7 @@ from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 from src import config
 from src.utils.logging_util import get_logger
 from src.utils.window_utils import get_sc2_window_geometry
+from src.event_managers_and_notifiers.alert_rules import build_countdown_message
 
 class CountdownSelectionWindow(QWidget):
     """倒计时选择的小弹窗"""
@@ -262,7 +263,7 @@ class CountdownManager(QWidget):
             
             # 2. 准备显示内容
             # 格式: "BOSS: 55秒"
-            message = f"{entry['label']}: {int(remaining)}秒"
+            message = build_countdown_message(entry['label'], remaining)
             
             # 3. 检查是否需要播放声音
             sound_to_play = None
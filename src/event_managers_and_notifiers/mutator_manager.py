@@ -15,6 +15,11 @@ from src.utils.temp_translate_utils import mutator_names_to_CHS
 from src.presentation_modules.message_presenter import MessagePresenter
 from src.utils.window_utils import get_sc2_window_geometry
 from src.game_state_service import state as game_state
+from src.event_managers_and_notifiers.alert_rules import (
+    build_mutator_alert_message,
+    find_next_time_point,
+    mutator_color_and_sound,
+)
 from src.db.mutator_daos import load_mutator_by_name,get_all_mutator_names,get_all_notify_mutator_names
 
 
@@ -22,11 +27,13 @@ class MutatorManager(QWidget):
     MUTATOR_ACTIVATION_NOTICE_MAX_SECOND = 110
     MUTATOR_ACTIVATION_NOTICE_SECONDS = 5
     
-    def __init__(self, parent=None, mutators_db=None):
+    def __init__(self, parent=None, mutators_db=None, mutator_timelines=None):
         super().__init__(parent)
         self.logger = get_logger(__name__)
 
         self.mutators_db = mutators_db
+        # 编译时间轴缓存（TimelineCache），为 None 时回退到直接查询数据库
+        self.mutator_timelines = mutator_timelines
         self.mutator_names = get_all_mutator_names(self.mutators_db)
         self.notify_mutator_names = get_all_notify_mutator_names(self.mutators_db)
         # 突变因子提醒标签和定时器
@@ -174,6 +181,10 @@ class MutatorManager(QWidget):
     def load_mutator_config(self, mutator_name):
         """加载突变因子配置文件"""
         try:
+            if self.mutator_timelines is not None:
+                timeline = self.mutator_timelines.get(mutator_name)
+                return list(timeline.iter_time_points()) if timeline else []
+
             time_points_info = []
             mutator_data = load_mutator_by_name(self.mutators_db,mutator_name)
             for a_mutator in mutator_data:
@@ -352,12 +363,7 @@ class MutatorManager(QWidget):
             ):
                 continue
 
-            next_deployment_info = None
-            
-            for deployment_seconds, content_text,sound_filename in time_points_info:
-                if deployment_seconds > current_seconds:
-                    next_deployment_info = (deployment_seconds, content_text,sound_filename)
-                    break
+            next_deployment_info = find_next_time_point(time_points_info, current_seconds)
             
             if not next_deployment_info:
                 self.hide_mutator_alert(mutator_name)
@@ -370,12 +376,7 @@ class MutatorManager(QWidget):
             if (next_deployment_time - current_seconds) <= config.MUTATOR_ALERT_SECONDS:
                 time_remaining = next_deployment_time - current_seconds
 
-                if (mutator_name == "AggressiveDeploymentProtoss" or mutator_name == "AggressiveDeployment"):
-                    #部署因子涉及到强度信息
-                     message = f"{int(time_remaining)}秒后：{mutator_names_to_CHS.get(mutator_name)} 强度：{content_to_show}"
-                else:
-                    #其他因子只涉及到数量，风暴不由mutatormanager播报
-                    message = f"{int(time_remaining)}秒后：{mutator_names_to_CHS.get(mutator_name)}*{content_to_show} "
+                message = build_mutator_alert_message(mutator_name, time_remaining, content_to_show)
 
 
                 self.show_mutator_alert(message, mutator_name, time_remaining,warning_sound_filename)
@@ -429,13 +430,7 @@ class MutatorManager(QWidget):
             alert_label.move(alert_label_x, alert_label_y)
 
         # 动态更新文本、颜色和字体大小
-        text_color = config.MUTATOR_NORMAL_COLOR
-
-        if time_remaining is not None and time_remaining <= config.MUTATOR_WARNING_THRESHOLD_SECONDS:
-            text_color = config.MUTATOR_WARNING_COLOR
-            sound_filename = warning_sound_filename
-        else:
-            sound_filename = None
+        text_color, sound_filename = mutator_color_and_sound(time_remaining, warning_sound_filename)
 
         # 传递计算好的 font_size
         alert_label.update_message(
@@ -0,0 +1,421 @@
+# src/game_readers/minimap_locator.py
+"""
+小地图位置定位。
+
+截图在 game_state_service 中统一缩放到 1920 宽（保持纵横比），但小地图在截图中的位置仍随
+纵横比、界面缩放、录像界面等变化，不能只按 1920x1080 的固定坐标裁剪。
+
+星际 2 的界面按窗口高度缩放、锚定在左下角，所以先按截图高度算出默认几何；
+再在默认几何附近按不同缩放比例和偏移搜索小地图的矩形边框（四条边上的亮度突变），
+找到后缓存，同一尺寸的截图之后直接复用，不再每帧搜索。
+"""
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+try:
+    from src.utils.logging_util import get_logger
+    logger = get_logger(__name__)
+except Exception:
+    import logging
+    logger = logging.getLogger(__name__)
+
+
+# 1920x1080 下的小地图位置与尺寸
+BASE_X = 27
+BASE_Y = 807
+BASE_W = 264
+BASE_H = 259
+BASE_SCREEN_H = 1080
+
+
+@dataclass(frozen=True)
+class MinimapGeometry:
+    """
+    小地图在截图中的原生像素位置。
+    scale 为原生像素 / 基准像素（1920x1080 下为 1.0）。
+    located 为 False 表示没有找到边框，使用的是按截图高度推算的默认几何。
+    """
+    x: int
+    y: int
+    w: int
+    h: int
+    scale: float
+    confidence: float = 0.0
+    located: bool = False
+
+    def roi(self) -> Tuple[int, int, int, int]:
+        return self.x, self.y, self.w, self.h
+
+
+def default_geometry(screenshot_w: int, screenshot_h: int) -> MinimapGeometry:
+    """
+    按截图高度推算：界面随高度等比缩放，小地图与左边、底边的距离也等比缩放。
+    1920x1080 时恰好为 (27, 807, 264, 259)。
+    """
+    return _geometry_for_scale(screenshot_h, screenshot_h / float(BASE_SCREEN_H))
+
+
+def _geometry_for_scale(screenshot_h: int, scale: float, dx: int = 0, dy: int = 0) -> MinimapGeometry:
+    w = int(round(BASE_W * scale))
+    h = int(round(BASE_H * scale))
+    x = int(round(BASE_X * scale)) + dx
+    y = screenshot_h - int(round((BASE_SCREEN_H - BASE_Y) * scale)) + dy
+    return MinimapGeometry(x=x, y=y, w=w, h=h, scale=scale)
+
+
+# 边框判定用的三条带：紧贴矩形外侧的边框线（在这几个像素里找最明显的一列）、矩形内侧、
+# 更外侧的界面背景（像素）。
+_FRAME_LINE_PX = 3
+_FRAME_GAP_PX = 1
+_FRAME_STRIP_PX = 3
+# 矩形四周至少要留出的像素，才能取到上面三条带。
+_FRAME_MARGIN_PX = _FRAME_LINE_PX + 2 * _FRAME_GAP_PX + _FRAME_STRIP_PX
+
+
+class _EdgeEvidence:
+    """
+    搜索区域上的边缘证据，矩形参数可以是同形状的数组（一次评估一批假设）：
+    - gradient：四条边上的平均亮度梯度 / 区域平均梯度；
+    - frame_contrast：四条边各自的“边框线”对比度。边框是一条细线，
+      它比内侧和外侧都亮（或都暗）；未探索黑区之类的地图内部直边只是一侧亮一侧暗的台阶，对比度为 0。
+    """
+
+    def __init__(self, gray: np.ndarray) -> None:
+        gray = gray.astype(np.float32)
+        self.shape = gray.shape
+
+        # grad_x[:, i] 为第 i-1 列与第 i 列之间的亮度差，grad_y 同理；
+        # 沿边方向做前缀和，任意一段边上的梯度和都是 O(1)。
+        grad_x = np.zeros(gray.shape, dtype=np.float32)
+        grad_x[:, 1:] = np.abs(np.diff(gray, axis=1))
+        grad_y = np.zeros(gray.shape, dtype=np.float32)
+        grad_y[1:, :] = np.abs(np.diff(gray, axis=0))
+
+        self.col_sum = np.zeros((gray.shape[0] + 1, gray.shape[1]), dtype=np.float64)
+        np.cumsum(grad_x, axis=0, out=self.col_sum[1:])
+        self.row_sum = np.zeros((gray.shape[0], gray.shape[1] + 1), dtype=np.float64)
+        np.cumsum(grad_y, axis=1, out=self.row_sum[:, 1:])
+
+        self.integral = np.zeros((gray.shape[0] + 1, gray.shape[1] + 1), dtype=np.float64)
+        np.cumsum(np.cumsum(gray, axis=0, dtype=np.float64), axis=1, out=self.integral[1:, 1:])
+
+        self.baseline = float(grad_x.mean() + grad_y.mean()) / 2.0 + 1e-3
+
+    def gradient(self, x, y, w: int, h: int) -> np.ndarray:
+        col_sum, row_sum = self.col_sum, self.row_sum
+        left = col_sum[y + h, x] - col_sum[y, x]
+        right = col_sum[y + h, x + w] - col_sum[y, x + w]
+        top = row_sum[y, x + w] - row_sum[y, x]
+        bottom = row_sum[y + h, x + w] - row_sum[y + h, x]
+        return (left + right + top + bottom) / (2.0 * (w + h)) / self.baseline
+
+    def frame_contrast(self, x, y, w: int, h: int) -> np.ndarray:
+        """
+        返回形状为 (4, ...) 的数组，依次为左、右、上、下四条边的边框线对比度（灰度级）。
+        """
+        line, gap, strip = _FRAME_LINE_PX, _FRAME_GAP_PX, _FRAME_STRIP_PX
+        outer = line + gap
+
+        def ridge(line_mean, inner_mean, outer_mean):
+            d_in = line_mean - inner_mean
+            d_out = line_mean - outer_mean
+            return np.where(d_in * d_out > 0, np.minimum(np.abs(d_in), np.abs(d_out)), 0.0)
+
+        def cols(c0, c1):
+            return self._box_mean(c0, y, c1, y + h)
+
+        def rows(r0, r1):
+            return self._box_mean(x, r0, x + w, r1)
+
+        def best_line(strip_mean, first, step, inner_mean, outer_mean):
+            # 边框线可能只有 1 像素宽：逐列（行）比较，取对比度最大的一条
+            return np.max([
+                ridge(strip_mean(first + k * step, first + k * step + 1), inner_mean, outer_mean)
+                for k in range(line)
+            ], axis=0)
+
+        return np.stack([
+            best_line(cols, x - 1, -1, cols(x + gap, x + gap + strip),
+                      cols(x - outer - strip, x - outer)),
+            best_line(cols, x + w, 1, cols(x + w - gap - strip, x + w - gap),
+                      cols(x + w + outer, x + w + outer + strip)),
+            best_line(rows, y - 1, -1, rows(y + gap, y + gap + strip),
+                      rows(y - outer - strip, y - outer)),
+            best_line(rows, y + h, 1, rows(y + h - gap - strip, y + h - gap),
+                      rows(y + h + outer, y + h + outer + strip)),
+        ])
+
+    def _box_mean(self, x0, y0, x1, y1):
+        ii = self.integral
+        total = ii[y1, x1] - ii[y0, x1] - ii[y1, x0] + ii[y0, x0]
+        return total / ((x1 - x0) * (y1 - y0))
+
+
+class MinimapLocator:
+    """
+    在截图左下角搜索小地图边框，结果按截图尺寸缓存。
+
+    搜索范围：
+    - 缩放比例：默认比例（截图高度 / 1080）乘以 ui_scales 中的各个系数；
+    - 偏移：默认位置左右、上下各 search_offset_px 像素。
+    一个假设要被采用，需要同时满足：
+    - 四条边外侧都有边框线（对比度不低于 min_frame_contrast），只有一侧亮一侧暗的地图内部直边不算；
+    - 四条边的平均梯度除以搜索区域的平均梯度（置信度）不低于 min_confidence；
+    - 与默认几何不同时，置信度至少是默认几何的 min_margin 倍。
+    否则使用默认几何，并在 retry_interval_s 后重新搜索（例如第一张截图还是加载画面）。
+    找到的几何每隔 verify_interval_s 在当前截图上复查一次边框，复查失败就重新搜索。
+    """
+
+    def __init__(
+        self,
+        ui_scales: Tuple[float, ...] = tuple(np.round(np.arange(0.80, 1.2501, 0.01), 2)),
+        search_offset_px: int = 24,
+        min_confidence: float = 3.0,
+        min_frame_contrast: float = 10.0,
+        min_margin: float = 1.5,
+        retry_interval_s: float = 5.0,
+        verify_interval_s: float = 10.0,
+    ) -> None:
+        self.ui_scales = tuple(float(s) for s in ui_scales)
+        self.search_offset_px = int(search_offset_px)
+        self.min_confidence = float(min_confidence)
+        self.min_frame_contrast = float(min_frame_contrast)
+        self.min_margin = float(min_margin)
+        self.retry_interval_s = float(retry_interval_s)
+        self.verify_interval_s = float(verify_interval_s)
+
+        self._cached_shape: Optional[Tuple[int, int]] = None
+        self._cached: Optional[MinimapGeometry] = None
+        self._cached_at = 0.0
+
+    def reset(self) -> None:
+        """
+        丢弃缓存，下一张截图重新定位（新游戏 / 切换到录像时调用）。
+        """
+        self._cached_shape = None
+        self._cached = None
+
+    def geometry(self, screenshot: np.ndarray) -> MinimapGeometry:
+        """
+        返回小地图几何；同一尺寸的截图只定位一次，找到的结果定期复查。
+        """
+        shape = screenshot.shape[:2]
+        now = time.perf_counter()
+
+        cached = self._cached
+        if cached is not None and self._cached_shape == shape:
+            if not cached.located:
+                if now - self._cached_at < self.retry_interval_s:
+                    return cached
+            elif now - self._cached_at < self.verify_interval_s:
+                return cached
+            elif self.verify(screenshot, cached):
+                self._cached_at = now
+                return cached
+            else:
+                logger.info("minimap frame lost at roi=%s, searching again", cached.roi())
+
+        geometry = self.locate(screenshot)
+        self._cached_shape = shape
+        self._cached = geometry
+        self._cached_at = now
+
+        if geometry.located:
+            logger.info(
+                "minimap located: screenshot=%dx%d roi=%s scale=%.3f confidence=%.2f",
+                shape[1], shape[0], geometry.roi(), geometry.scale, geometry.confidence,
+            )
+        else:
+            logger.debug(
+                "minimap frame not found, using default: screenshot=%dx%d roi=%s confidence=%.2f",
+                shape[1], shape[0], geometry.roi(), geometry.confidence,
+            )
+
+        return geometry
+
+    def verify(self, screenshot: np.ndarray, geometry: MinimapGeometry) -> bool:
+        """
+        在当前截图上复查某个几何：四条边仍有边框线，且置信度不低于 min_confidence。
+        """
+        area, area_y = self._search_area(screenshot)
+        if area is None:
+            return False
+        x, y = geometry.x, geometry.y - area_y
+        if not self._fits(area.shape, x, y, geometry.w, geometry.h):
+            return False
+        evidence = _EdgeEvidence(area)
+        score = float(evidence.gradient(x, y, geometry.w, geometry.h))
+        contrast = evidence.frame_contrast(x, y, geometry.w, geometry.h)
+        return score >= self.min_confidence and bool(np.all(contrast >= self.min_frame_contrast))
+
+    def locate(self, screenshot: np.ndarray) -> MinimapGeometry:
+        """
+        不使用缓存，直接搜索一次。
+        """
+        screen_h, screen_w = screenshot.shape[:2]
+        default = default_geometry(screen_w, screen_h)
+        pad = self.search_offset_px
+
+        area, area_y = self._search_area(screenshot)
+        if area is None:
+            return default
+
+        evidence = _EdgeEvidence(area)
+        area_h, area_w = area.shape
+
+        default_score = 0.0
+        if self._fits(area.shape, default.x, default.y - area_y, default.w, default.h):
+            default_score = float(evidence.gradient(default.x, default.y - area_y, default.w, default.h))
+
+        best: Optional[MinimapGeometry] = None
+        best_score = -1.0
+        offsets = np.arange(-pad, pad + 1)
+        margin = _FRAME_MARGIN_PX
+
+        for ui_scale in self.ui_scales:
+            scale = default.scale * ui_scale
+            base = _geometry_for_scale(screen_h, scale)
+            w, h = base.w, base.h
+
+            xs = base.x + offsets
+            ys = base.y - area_y + offsets
+            xs = xs[(xs >= margin) & (xs + w + margin <= area_w)]
+            ys = ys[(ys >= margin) & (ys + h + margin <= area_h)]
+            if len(xs) == 0 or len(ys) == 0:
+                continue
+
+            y_grid, x_grid = np.meshgrid(ys, xs, indexing="ij")
+            x_grid, y_grid = x_grid.ravel(), y_grid.ravel()
+            score = evidence.gradient(x_grid, y_grid, w, h)
+
+            # 边框检查只做在可能胜出的假设上
+            keep = np.flatnonzero(score >= max(self.min_confidence, best_score))
+            if len(keep) == 0:
+                continue
+            framed = np.all(
+                evidence.frame_contrast(x_grid[keep], y_grid[keep], w, h) >= self.min_frame_contrast, axis=0,
+            )
+            keep = keep[framed]
+            if len(keep) == 0:
+                continue
+
+            k = int(keep[np.argmax(score[keep])])
+            if score[k] > best_score:
+                best_score = float(score[k])
+                best = MinimapGeometry(
+                    x=int(x_grid[k]),
+                    y=int(y_grid[k]) + area_y,
+                    w=w,
+                    h=h,
+                    scale=scale,
+                    confidence=best_score,
+                    located=True,
+                )
+
+        fallback = MinimapGeometry(
+            x=default.x, y=default.y, w=default.w, h=default.h,
+            scale=default.scale, confidence=default_score, located=False,
+        )
+        if best is None or best_score < self.min_confidence:
+            return fallback
+
+        # 默认几何在 1920x1080 下就是对的：离开它需要明显更强的证据。
+        near_default = (
+            abs(best.scale - default.scale) < 0.005
+            and abs(best.x - default.x) <= 2
+            and abs(best.y - default.y) <= 2
+        )
+        if not near_default and best_score < default_score * self.min_margin:
+            return fallback
+
+        return best
+
+    def _search_area(self, screenshot: np.ndarray) -> Tuple[Optional[np.ndarray], int]:
+        """
+        只看左下角：最大缩放下的小地图加上搜索偏移和边框带。返回 (灰度区域, 区域在截图中的 y)。
+        """
+        screen_h, screen_w = screenshot.shape[:2]
+        pad = self.search_offset_px + _FRAME_MARGIN_PX + 2
+        max_scale = screen_h / float(BASE_SCREEN_H) * max(self.ui_scales)
+        area_w = min(screen_w, int(math.ceil((BASE_X + BASE_W) * max_scale)) + pad)
+        area_y = max(0, screen_h - int(math.ceil((BASE_SCREEN_H - BASE_Y) * max_scale)) - pad)
+        area = screenshot[area_y:, :area_w]
+        if area.size == 0:
+            return None, area_y
+        gray = area if area.ndim == 2 else cv2.cvtColor(area, cv2.COLOR_BGR2GRAY)
+        return gray, area_y
+
+    @staticmethod
+    def _fits(area_shape: Tuple[int, int], x: int, y: int, w: int, h: int) -> bool:
+        margin = _FRAME_MARGIN_PX
+        return x >= margin and y >= margin and x + w + margin <= area_shape[1] and y + h + margin <= area_shape[0]
+
+
+# 测试代码：python -m src.game_readers.minimap_locator [截图路径 ...]
+if __name__ == '__main__':
+    import sys
+
+    locator = MinimapLocator()
+    paths = sys.argv[1:]
+
+    if not paths:
+        # 没有截图时用合成画面自检：不同纵横比 / 界面缩放 / 偏移下画一个小地图。
+        # border 为 None 的几组边框很弱，小地图里还有未探索黑区的直边，
+        # 这时应当找不到（located=False，使用默认几何），而不是锁定到某个错误的矩形。
+        rng = np.random.default_rng(0)
+        failures = 0
+        for screen_w, screen_h, ui_scale, dx, dy, border in (
+            (1920, 1080, 1.0, 0, 0, 170),
+            (1920, 1200, 1.0, 0, 0, 170),
+            (1920, 823, 1.0, 0, 0, 170),
+            (1920, 1080, 0.9, 6, -10, 170),
+            (1920, 1440, 1.15, -4, 8, 170),
+            (1920, 1080, 1.0, 0, 0, None),
+            (1920, 1080, 0.9, 6, -10, None),
+            (1920, 1440, 1.0, 0, 0, None),
+        ):
+            noise = rng.integers(50, 110, size=(screen_h, screen_w, 3), dtype=np.uint8)
+            image = cv2.GaussianBlur(noise, (7, 7), 0)
+            truth = _geometry_for_scale(screen_h, screen_h / float(BASE_SCREEN_H) * ui_scale, dx, dy)
+            inner = cv2.GaussianBlur(
+                rng.integers(60, 140, size=(truth.h, truth.w, 3), dtype=np.uint8), (5, 5), 0,
+            )
+            for _ in range(3):
+                x0 = 0 if rng.random() < 0.5 else int(rng.integers(0, truth.w - 60))
+                y0 = 0 if rng.random() < 0.5 else int(rng.integers(0, truth.h - 60))
+                x1, y1 = int(rng.integers(x0 + 50, truth.w + 1)), int(rng.integers(y0 + 50, truth.h + 1))
+                inner[y0:y1, x0:x1] = 0
+            image[truth.y:truth.y + truth.h, truth.x:truth.x + truth.w] = inner
+            color = (border, border, border) if border is not None else (70, 70, 70)
+            cv2.rectangle(image, (truth.x - 1, truth.y - 1), (truth.x + truth.w, truth.y + truth.h), color, 1)
+
+            found = locator.locate(image)
+            if border is not None:
+                ok = found.located and found.roi() == truth.roi()
+            else:
+                ok = not found.located or found.roi() == truth.roi()
+            failures += not ok
+            print(f"{screen_w}x{screen_h} ui={ui_scale:.2f} border={border} truth={truth.roi()} "
+                  f"found={found.roi()} scale={found.scale:.3f} "
+                  f"confidence={found.confidence:.2f} located={found.located} {'ok' if ok else 'FAIL'}")
+        sys.exit(1 if failures else 0)
+    else:
+        for path in paths:
+            image = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if image is None:
+                print(f"{path}: 无法读取")
+                continue
+            if image.shape[1] != 1920:
+                # 与 game_state_service 一致：先缩放到 1920 宽
+                image = cv2.resize(image, (1920, int(image.shape[0] * 1920.0 / image.shape[1])),
+                                   interpolation=cv2.INTER_AREA)
+            found = locator.locate(image)
+            default = default_geometry(image.shape[1], image.shape[0])
+            print(f"{path}: roi={found.roi()} scale={found.scale:.3f} "
+                  f"confidence={found.confidence:.2f} located={found.located} default={default.roi()}")
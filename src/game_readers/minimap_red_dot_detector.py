@@ -4,18 +4,23 @@
 
 设计目标：
 1. 从 game_state_service.state.latest_screenshot 读取游戏截图。
-2. 裁剪 1920x1080 基准下的小地图区域。
+2. 默认按截图高度推算小地图位置（1920x1080 下即固定的 27,807,264,259）；
+   开启 auto_locate_minimap 后用 MinimapLocator 搜索小地图边框（结果缓存）。按原生分辨率裁剪，阈值随缩放比例调整；
+   对外的坐标仍统一为 1920x1080 基准下的小地图局部坐标 (264x259)。
 3. 后台持续检测红点候选。
 4. confirmed detection 后才更新 monitor 的 count。
 5. 对外通过 monitor_id 获取检测窗口结果。
+6. 也可以用 subscribe 订阅一个区域，track 一确认就回调推送 RedDotEvent。
 """
 
+import csv
 import math
+import os
 import time
 import uuid
 import threading
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import cv2
 import numpy as np
@@ -26,6 +31,14 @@ except Exception:
     # 如果你的 game_state_service 路径不同，改这里。
     from game_state_service import state
 
+from src.game_readers import minimap_locator
+from src.game_readers.minimap_locator import MinimapGeometry, MinimapLocator, default_geometry
+
+try:
+    from src import config
+except Exception:
+    config = None
+
 try:
     from src.utils.logging_util import get_logger
     logger = get_logger(__name__)
@@ -45,7 +58,7 @@ class RedDotDetection:
     对外返回的单个 confirmed 红点。
     坐标全部以小地图左上角为原点。
     """
-    track_id: str
+    track_id: int
     center_minimap: Point
     bbox_minimap: BBox
     core_bbox_minimap: BBox
@@ -69,6 +82,29 @@ class RedDotDetection:
         }
 
 
+@dataclass
+class RedDotEvent:
+    """
+    subscribe 推送的事件：某个 track 在这一帧刚刚 confirmed。
+    confirmed_at 与 screenshot_ts 都是 time.perf_counter() 时间，
+    screenshot_ts 是触发确认的那张截图的时间戳。
+    """
+    subscription_id: str
+    detection: RedDotDetection
+    confirmed_at: float
+    screenshot_ts: float
+    frame_id: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "subscription_id": self.subscription_id,
+            "detection": self.detection.to_dict(),
+            "confirmed_at": self.confirmed_at,
+            "screenshot_ts": self.screenshot_ts,
+            "frame_id": self.frame_id,
+        }
+
+
 @dataclass
 class _FrameCandidate:
     """
@@ -81,55 +117,191 @@ class _FrameCandidate:
     has_outer_ring: bool
 
 
-@dataclass
-class _Track:
+class _TrackTable:
     """
-    monitor 内部的跨帧 track。
+    monitor 内部的跨帧 track，按列存放在 NumPy 数组中，track_id 为 monitor 内递增的整数。
+
+    每帧的候选与 track 的关联在距离矩阵上完成：
+    候选按 score 从高到低依次取最近的、本帧尚未匹配的旧 track（贪心），
+    本帧新建的 track 不参与本帧的匹配。
     """
-    track_id: str
-    center: Point
-    bbox: BBox
-    core_bbox: BBox
-    max_score: float
-    hit_frames: int
-    has_outer_ring: bool
-    first_seen: float
-    last_seen: float
-    confirmed: bool = False
-    last_matched_frame_id: int = -1
 
-    def update(self, candidate: _FrameCandidate, now: float, frame_id: int) -> None:
-        # 避免同一帧被重复更新。
-        if self.last_matched_frame_id == frame_id:
-            return
+    _INITIAL_CAPACITY = 8
+
+    def __init__(self) -> None:
+        self.size = 0
+        self._next_id = 1
+        self._allocate(self._INITIAL_CAPACITY)
+
+    def _allocate(self, capacity: int) -> None:
+        old = self.__dict__.get("ids")
+        n = self.size
+
+        def grow(name: str, shape: Tuple[int, ...], dtype) -> None:
+            array = np.zeros((capacity,) + shape, dtype=dtype)
+            if old is not None:
+                array[:n] = getattr(self, name)[:n]
+            setattr(self, name, array)
+
+        grow("ids", (), np.int64)
+        grow("center", (2,), np.float64)
+        grow("bbox", (4,), np.int32)
+        grow("core_bbox", (4,), np.int32)
+        grow("max_score", (), np.float64)
+        grow("hit_frames", (), np.int32)
+        grow("has_outer_ring", (), np.bool_)
+        grow("first_seen", (), np.float64)
+        grow("last_seen", (), np.float64)
+        grow("confirmed", (), np.bool_)
+
+    def associate(
+        self,
+        candidates: List[_FrameCandidate],
+        now: float,
+        match_distance: float,
+        confirmed_match_distance: float,
+    ) -> np.ndarray:
+        """
+        把本帧候选关联到 track：匹配上的更新，匹配不上的新建。
+        返回本帧被更新或新建的 track 下标。
+        """
+        if not candidates:
+            return np.empty(0, dtype=np.intp)
+
+        # 高分优先匹配，避免弱候选抢 track。
+        candidates = sorted(candidates, key=lambda c: c.score, reverse=True)
+        n_old = self.size
+        assigned = np.full(len(candidates), -1, dtype=np.intp)
+
+        if n_old:
+            cand_centers = np.array([c.center for c in candidates], dtype=np.float64)
+            diff = cand_centers[:, None, :] - self.center[None, :n_old, :]
+            dist = np.hypot(diff[:, :, 0], diff[:, :, 1])
 
-        old_x, old_y = self.center
-        new_x, new_y = candidate.center
+            # confirmed track 保留到窗口结束，匹配距离放宽。
+            # 这样同一个红点外圈消失后再次出现，不会重复计数。
+            max_dist = np.where(self.confirmed[:n_old], confirmed_match_distance, match_distance)
+            dist[dist > max_dist[None, :]] = np.inf
+
+            for i in range(len(candidates)):
+                j = int(np.argmin(dist[i]))
+                if np.isfinite(dist[i, j]):
+                    assigned[i] = j
+                    # 每个 track 每帧最多匹配一次。
+                    dist[:, j] = np.inf
+
+        matched = assigned >= 0
+        if matched.any():
+            idx = assigned[matched]
+            matched_candidates = [c for c, ok in zip(candidates, matched) if ok]
+
+            # 轻微平滑中心点，减少闪动。
+            new_centers = np.array([c.center for c in matched_candidates], dtype=np.float64)
+            self.center[idx] = self.center[idx] * 0.6 + new_centers * 0.4
+
+            self.bbox[idx] = [c.bbox for c in matched_candidates]
+            self.core_bbox[idx] = [c.core_bbox for c in matched_candidates]
+            self.max_score[idx] = np.maximum(
+                self.max_score[idx],
+                [c.score for c in matched_candidates],
+            )
+            self.hit_frames[idx] += 1
+            self.has_outer_ring[idx] |= np.array([c.has_outer_ring for c in matched_candidates])
+            self.last_seen[idx] = now
+
+        new_candidates = [c for c, ok in zip(candidates, matched) if not ok]
+        if new_candidates:
+            start = self.size
+            end = start + len(new_candidates)
+            if end > len(self.ids):
+                self._allocate(max(end, len(self.ids) * 2))
+
+            self.ids[start:end] = np.arange(self._next_id, self._next_id + len(new_candidates))
+            self._next_id += len(new_candidates)
+            self.center[start:end] = [c.center for c in new_candidates]
+            self.bbox[start:end] = [c.bbox for c in new_candidates]
+            self.core_bbox[start:end] = [c.core_bbox for c in new_candidates]
+            self.max_score[start:end] = [c.score for c in new_candidates]
+            self.hit_frames[start:end] = 1
+            self.has_outer_ring[start:end] = [c.has_outer_ring for c in new_candidates]
+            self.first_seen[start:end] = now
+            self.last_seen[start:end] = now
+            self.confirmed[start:end] = False
+            self.size = end
+
+        return np.concatenate([
+            assigned[matched],
+            np.arange(n_old, self.size, dtype=np.intp),
+        ])
+
+    def confirm(
+        self,
+        indices: np.ndarray,
+        min_confirmed_frames: int,
+        min_score: float,
+        high_score: float,
+    ) -> np.ndarray:
+        """
+        严格模式：
+        core-only 只用于维持 track，不直接确认。
+        必须至少观察到一次 outer ring，才认为这是红点 ping。
 
-        # 轻微平滑中心点，减少闪动。
-        self.center = (old_x * 0.6 + new_x * 0.4, old_y * 0.6 + new_y * 0.4)
+        返回本次由未确认变为 confirmed 的 track 下标。
+        """
+        if len(indices) == 0:
+            return np.empty(0, dtype=np.intp)
+
+        was_confirmed = self.confirmed[indices].copy()
+        score = self.max_score[indices]
+        self.confirmed[indices] |= (
+            (self.hit_frames[indices] >= min_confirmed_frames) &
+            self.has_outer_ring[indices] &
+            ((score >= min_score) | (score >= high_score))
+        )
+        return indices[self.confirmed[indices] & ~was_confirmed]
 
-        self.bbox = candidate.bbox
-        self.core_bbox = candidate.core_bbox
-        self.max_score = max(self.max_score, candidate.score)
-        self.hit_frames += 1
-        self.has_outer_ring = self.has_outer_ring or candidate.has_outer_ring
-        self.last_seen = now
-        self.last_matched_frame_id = frame_id
+    def prune(self, before: float) -> int:
+        """
+        删除 last_seen 早于 before 的 track（confirmed 的也删），返回删除数量。
+        只用于不限时长的订阅，避免 track 在整局游戏里无限增长。
+        """
+        keep = np.flatnonzero(self.last_seen[:self.size] >= before)
+        removed = self.size - len(keep)
+        if removed == 0:
+            return 0
+
+        n = len(keep)
+        for name in (
+            "ids", "center", "bbox", "core_bbox", "max_score", "hit_frames",
+            "has_outer_ring", "first_seen", "last_seen", "confirmed",
+        ):
+            array = getattr(self, name)
+            array[:n] = array[keep]
+        self.size = n
+        return removed
 
-    def to_detection(self) -> RedDotDetection:
+    def detection(self, i: int) -> RedDotDetection:
         return RedDotDetection(
-            track_id=self.track_id,
-            center_minimap=self.center,
-            bbox_minimap=self.bbox,
-            core_bbox_minimap=self.core_bbox,
-            score=self.max_score,
-            hit_frames=self.hit_frames,
-            has_outer_ring=self.has_outer_ring,
-            first_seen=self.first_seen,
-            last_seen=self.last_seen,
+            track_id=int(self.ids[i]),
+            center_minimap=(float(self.center[i, 0]), float(self.center[i, 1])),
+            bbox_minimap=tuple(int(v) for v in self.bbox[i]),
+            core_bbox_minimap=tuple(int(v) for v in self.core_bbox[i]),
+            score=float(self.max_score[i]),
+            hit_frames=int(self.hit_frames[i]),
+            has_outer_ring=bool(self.has_outer_ring[i]),
+            first_seen=float(self.first_seen[i]),
+            last_seen=float(self.last_seen[i]),
         )
 
+    def confirmed_detections(self) -> List[RedDotDetection]:
+        """
+        全部 confirmed track，按 first_seen 排序。
+        """
+        idx = np.flatnonzero(self.confirmed[:self.size])
+        idx = idx[np.argsort(self.first_seen[idx], kind="stable")]
+
+        return [self.detection(i) for i in idx]
+
 
 @dataclass
 class _MonitorState:
@@ -141,13 +313,242 @@ class _MonitorState:
     min_confirmed_frames: int
     min_score: float
     high_score: float
-    tracks: Dict[str, _Track] = field(default_factory=dict)
+    tracks: _TrackTable = field(default_factory=_TrackTable)
+    # 可选的时间背景模型；为 None 时使用整帧红色 mask。
+    background: Optional["RedBackgroundModel"] = None
+    # subscribe 创建的 monitor：track 刚 confirmed 时回调；
+    # track_ttl_s 不为 None 时，超过这么久没再看到的 track 会被删除。
+    callback: Optional[Callable[[RedDotEvent], None]] = None
+    track_ttl_s: Optional[float] = None
     active: bool = True
     expired: bool = False
     valid: bool = False
     reason: Optional[str] = "not_updated_yet"
     updated_at: Optional[float] = None
     frame_updates: int = 0
+    # 帧覆盖统计：无效帧次数、最近一次有效帧时间、相邻有效帧之间的最大间隔
+    invalid_updates: int = 0
+    last_valid_at: Optional[float] = None
+    max_frame_gap_s: float = 0.0
+    # tracks 每次更新加 1；get_result 的 detections 按版本缓存
+    tracks_version: int = 0
+    detections_cache: Optional[Tuple[int, List[Dict[str, Any]]]] = None
+
+
+class _DetectorStats:
+    """
+    检测器的性能统计：处理 / 跳过 / 无效帧数，各阶段耗时，各启发式拒绝次数。
+    读写都在 detector 的锁内进行。
+    """
+
+    # 每帧的阶段顺序，也是 CSV 的列顺序。
+    STAGES = ("roi_copy", "mask", "components", "clustering", "scoring", "tracking", "callbacks", "total")
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.started_at = time.perf_counter()
+        self.frames_processed = 0
+        self.frames_duplicate = 0
+        self.frames_invalid: Dict[str, int] = {}
+        # 阶段 -> [次数, 累计秒, 最大秒, 最近一次秒]
+        self.stages: Dict[str, List[float]] = {}
+        self.rejections: Dict[str, int] = {}
+
+    def add_stage(self, stage: str, seconds: float) -> None:
+        entry = self.stages.get(stage)
+        if entry is None:
+            self.stages[stage] = [1, seconds, seconds, seconds]
+            return
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] = max(entry[2], seconds)
+        entry[3] = seconds
+
+    def add_rejections(self, rejections: Dict[str, int]) -> None:
+        for reason, count in rejections.items():
+            self.rejections[reason] = self.rejections.get(reason, 0) + count
+
+    def add_invalid(self, reason: str) -> None:
+        self.frames_invalid[reason] = self.frames_invalid.get(reason, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        uptime = time.perf_counter() - self.started_at
+        return {
+            "uptime_s": uptime,
+            "frames_processed": self.frames_processed,
+            "frames_duplicate": self.frames_duplicate,
+            "frames_invalid": dict(self.frames_invalid),
+            "fps": self.frames_processed / uptime if uptime > 0 else 0.0,
+            "stages": {
+                stage: {
+                    "count": int(count),
+                    "total_ms": total * 1000.0,
+                    "mean_ms": total * 1000.0 / count,
+                    "max_ms": max_s * 1000.0,
+                    "last_ms": last * 1000.0,
+                }
+                for stage, (count, total, max_s, last) in self.stages.items()
+            },
+            "rejections": dict(sorted(self.rejections.items(), key=lambda kv: -kv[1])),
+        }
+
+
+# 红色 mask 的两条判定都要求 R >= 65、G <= 90、B <= 90，盒外的颜色恒为非红。
+_RED_CANDIDATE_LOWER = np.array([0, 0, 65], dtype=np.uint8)
+_RED_CANDIDATE_UPPER = np.array([90, 90, 255], dtype=np.uint8)
+
+_RED_MASK_DILATE_KERNEL = np.array(
+    [[0, 1, 0],
+     [1, 1, 1],
+     [0, 1, 0]],
+    dtype=np.uint8
+)
+
+# 全部 2^24 种颜色的红色判定位图（2 MB），下标为 BGRA 像素按 uint32 读出后的低 24 位。
+_red_mask_bits: Optional[np.ndarray] = None
+_red_mask_bits_lock = threading.Lock()
+
+
+def _red_pixel_predicate(bgr: np.ndarray) -> np.ndarray:
+    """
+    红点 mask 的逐像素判定（膨胀前），返回 bool 数组。
+    颜色位图由它生成，也用于校验查表结果。
+    """
+    b = bgr[:, :, 0].astype(np.int16)
+    g = bgr[:, :, 1].astype(np.int16)
+    r = bgr[:, :, 2].astype(np.int16)
+
+    hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
+    hue = hsv[:, :, 0].astype(np.int16)
+    sat = hsv[:, :, 1].astype(np.int16)
+    val = hsv[:, :, 2].astype(np.int16)
+
+    # SC2 小地图 ping 红点基本是非常纯的红色：
+    # hue 接近 0/180，饱和度高，G/B 很低。
+    red_hue = (hue <= 8) | (hue >= 172)
+
+    pure_red_hsv = (
+        red_hue &
+        (sat >= 155) &
+        (val >= 65)
+    )
+
+    red_dominance = (
+        (r >= 65) &
+        ((r - g) >= 45) &
+        ((r - b) >= 45) &
+        (g <= 85) &
+        (b <= 85)
+    )
+
+    # 对非常亮的纯红做一点兜底。
+    bright_pure_red = (
+        red_hue &
+        (r >= 150) &
+        ((r - g) >= 80) &
+        ((r - b) >= 80) &
+        (g <= 90) &
+        (b <= 90)
+    )
+
+    return (pure_red_hsv & red_dominance) | bright_pure_red
+
+
+def _get_red_mask_bits() -> np.ndarray:
+    """
+    首次使用时只对候选颜色盒（约 158 万种颜色）运行 _red_pixel_predicate，
+    再把判定为红的颜色写入位图；盒外的位保持 0。
+    """
+    global _red_mask_bits
+
+    bits = _red_mask_bits
+    if bits is not None:
+        return bits
+
+    with _red_mask_bits_lock:
+        if _red_mask_bits is None:
+            lower = _RED_CANDIDATE_LOWER.astype(np.uint32)
+            upper = _RED_CANDIDATE_UPPER.astype(np.uint32)
+            b, g, r = np.meshgrid(
+                np.arange(lower[0], upper[0] + 1, dtype=np.uint32),
+                np.arange(lower[1], upper[1] + 1, dtype=np.uint32),
+                np.arange(lower[2], upper[2] + 1, dtype=np.uint32),
+                indexing="ij",
+            )
+            colors = np.stack([b, g, r], axis=-1).astype(np.uint8).reshape(b.shape[0], -1, 3)
+            red = _red_pixel_predicate(colors).reshape(b.shape)
+
+            # 与小端序下 BGRA 像素的 uint32 值一致：B | G << 8 | R << 16
+            keys = b[red] | (g[red] << 8) | (r[red] << 16)
+            table = np.zeros(1 << 21, dtype=np.uint8)
+            np.bitwise_or.at(table, keys >> 3, (1 << (keys & 7)).astype(np.uint8))
+            _red_mask_bits = table
+
+        return _red_mask_bits
+
+
+class RedBackgroundModel:
+    """
+    小地图红色像素的时间背景模型：每个像素“是红色”的指数滑动平均 (EMA)，坐标为小地图局部坐标。
+
+    当前帧为红、且背景中为红的比例低于 threshold 的像素才算新出现的红色；
+    静态红色建筑、持续存在的突变因子效果会留在背景里，不再每帧重新分割、打分。
+    像素第一次被看到时直接用当前值作为背景初值，因此窗口开始时就已存在的红色从第一帧起被压掉。
+    新出现的红点大约要 log(1 - threshold) / log(1 - alpha) 帧才会被吸收进背景
+    （默认约 14 帧 ≈ 1.4 秒），足够 track 完成确认。
+    """
+
+    def __init__(self, alpha: float = 0.05, threshold: float = 0.5) -> None:
+        self.alpha = float(alpha)
+        self.threshold = float(threshold)
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        清空背景（小地图几何变化、坐标不再对应时调用）。
+        初始按 1920x1080 下的小地图大小分配，原生分辨率更大时在 foreground 中扩展。
+        """
+        self._mean = np.zeros(
+            (MinimapRedDotDetector.MINIMAP_BASE_H, MinimapRedDotDetector.MINIMAP_BASE_W),
+            dtype=np.float32,
+        )
+        self._seen = np.zeros(self._mean.shape, dtype=bool)
+
+    def _ensure_size(self, h: int, w: int) -> None:
+        old_h, old_w = self._mean.shape
+        if h <= old_h and w <= old_w:
+            return
+
+        mean = np.zeros((max(h, old_h), max(w, old_w)), dtype=np.float32)
+        seen = np.zeros(mean.shape, dtype=bool)
+        mean[:old_h, :old_w] = self._mean
+        seen[:old_h, :old_w] = self._seen
+        self._mean = mean
+        self._seen = seen
+
+    def foreground(self, red_pixels: np.ndarray, origin: Tuple[int, int] = (0, 0)) -> np.ndarray:
+        """
+        red_pixels 为未膨胀的红色 mask（0 / 255），origin 为其左上角的小地图坐标。
+        先按更新前的背景去掉静态红色，再用当前帧更新背景；原地修改并返回 red_pixels。
+        """
+        x, y = origin
+        h, w = red_pixels.shape[:2]
+        self._ensure_size(y + h, x + w)
+        mean = self._mean[y:y + h, x:x + w]
+        seen = self._seen[y:y + h, x:x + w]
+
+        current = red_pixels.astype(np.float32) * (1.0 / 255.0)
+
+        unseen = ~seen
+        if unseen.any():
+            mean[unseen] = current[unseen]
+            seen[:] = True
+
+        red_pixels[mean >= self.threshold] = 0
+        cv2.accumulateWeighted(current, mean, self.alpha)
+        return red_pixels
 
 
 class RedDotFrameAnalyzer:
@@ -156,34 +557,145 @@ class RedDotFrameAnalyzer:
 
     输入：小地图 BGR 图像。
     输出：当前帧红点候选列表。
+
+    scale 为输入图像相对 1920x1080 下小地图的缩放比例（原生像素 / 基准像素）。
+    下面的尺寸阈值都按 1920x1080 给出，长度乘 scale、面积乘 scale 的平方；
+    scale 为 1.0 时与基准阈值完全相同。
     """
 
-    def __init__(self) -> None:
+    def __init__(self, scale: float = 1.0) -> None:
+        self.scale = float(scale)
+
+        def px(v: int) -> int:
+            return max(1, int(round(v * self.scale)))
+
+        def area(v: int) -> int:
+            return max(1, int(round(v * self.scale * self.scale)))
+
         # 候选尺寸范围，基于 1920x1080 下的小地图像素。
         # 红点0.png 的本体在膨胀后仍会大于 5x5，所以这里可以安全收紧。
-        self.min_candidate_w = 5
-        self.min_candidate_h = 5
-        self.max_candidate_w = 28
-        self.max_candidate_h = 28
+        self.min_candidate_w = px(5)
+        self.min_candidate_h = px(5)
+        self.max_candidate_w = px(28)
+        self.max_candidate_h = px(28)
+        # 小于等于这个尺寸的候选 size_score 降低。
+        self.tiny_candidate_size = px(4)
 
         # 连通块过滤。
-        self.min_component_area = 3
-        self.max_component_area = 220
+        self.min_component_area = area(3)
+        self.max_component_area = area(220)
 
         # 聚类时允许的红色块间隙。
         # 原本 10 太宽，容易把单位/选择框附近的红色碎片合并。
-        self.cluster_gap = 5
-        self.component_center_merge_distance = 9.0
+        self.cluster_gap = px(5)
+        self.component_center_merge_distance = 9.0 * self.scale
+
+        self.max_cluster_w = px(28)
+        self.max_cluster_h = px(28)
+        self.min_cluster_red_pixels = area(18)
+
+        # 中央菱形 core 的尺寸 / 面积范围；没有外圈的 cluster 也按 core 的下限过滤。
+        self.min_core_w = px(7)
+        self.max_core_w = px(24)
+        self.min_core_area = area(40)
+        self.min_core_red_pixels = area(35)
+
+        # 外圈判定：bbox 至少这么大；只有一个连通块时要更大才算外圈。
+        self.min_ring_size = px(12)
+        self.min_single_ring_size = px(16)
+
+        # 去重：bbox 外扩 dedupe_touch_gap 后接触，或中心距离不超过 dedupe_merge_distance
+        # 且至少一个候选不小于 dedupe_min_size，视为同一红点。
+        self.dedupe_touch_gap = px(3)
+        self.dedupe_merge_distance = 16.0 * self.scale
+        self.dedupe_min_size = px(12)
+
+        # _lookup_red_pixels 的复用缓冲区：(BGRA 图, 位偏移, 位图字节)
+        self._mask_buffers: Optional[Tuple[np.ndarray, ...]] = None
+
+        # 性能统计：各阶段累计耗时（秒）、各启发式拒绝次数，由 take_stats 取走并清零。
+        self.stage_seconds: Dict[str, float] = {}
+        self.rejections: Dict[str, int] = {}
 
-        self.max_cluster_w = 28
-        self.max_cluster_h = 28
+    def take_stats(self) -> Tuple[Dict[str, float], Dict[str, int]]:
+        """
+        取走上次调用以来的阶段耗时与拒绝次数。
+        """
+        stats = self.stage_seconds, self.rejections
+        self.stage_seconds = {}
+        self.rejections = {}
+        return stats
+
+    def _add_stage(self, stage: str, started: float) -> float:
+        now = time.perf_counter()
+        self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + (now - started)
+        return now
+
+    def _reject(self, reason: str, count: int = 1) -> None:
+        self.rejections[reason] = self.rejections.get(reason, 0) + count
 
-    def analyze(self, minimap_bgr: np.ndarray) -> List[_FrameCandidate]:
+    def analyze(
+        self,
+        minimap_bgr: np.ndarray,
+        region: Optional[Region] = None,
+        background: Optional["RedBackgroundModel"] = None,
+        red_pixels: Optional[np.ndarray] = None,
+    ) -> List[_FrameCandidate]:
+        """
+        region 为小地图局部坐标 (x1, y1, x2, y2)：只在该区域内建 mask、找连通块，
+        返回的候选坐标仍以小地图左上角为原点。None 表示整个小地图。
+        background 不为 None 时，只有相对背景模型新出现的红色像素参与连通块搜索。
+        red_pixels 为调用方已经查好的未膨胀红色 mask（与 region 同大小，见 lookup_red_pixels），
+        传入时不再重复查表；背景模型会原地修改它。
+        """
         if minimap_bgr is None or minimap_bgr.size == 0:
             return []
 
-        red_mask = self._build_red_mask(minimap_bgr)
+        if region is not None:
+            x1, y1, x2, y2 = region
+            if x1 > 0 or y1 > 0 or x2 < minimap_bgr.shape[1] or y2 < minimap_bgr.shape[0]:
+                candidates = self._analyze_crop(minimap_bgr[y1:y2, x1:x2], (x1, y1), background, red_pixels)
+                return [self._translate_candidate(c, x1, y1) for c in candidates]
+
+        return self._analyze_crop(minimap_bgr, (0, 0), background, red_pixels)
+
+    def lookup_red_pixels(self, minimap_bgr: np.ndarray, region: Optional[Region] = None) -> np.ndarray:
+        """
+        未膨胀的红色 mask（0 / 255）。region 不为 None 时只查该区域，返回区域大小的 mask。
+        同一帧要分析多个区域时先查一次，再把各区域的切片传给 analyze(red_pixels=...)。
+        """
+        t = time.perf_counter()
+        if region is not None:
+            x1, y1, x2, y2 = region
+            minimap_bgr = minimap_bgr[y1:y2, x1:x2]
+        red_pixels = self._lookup_red_pixels(minimap_bgr)
+        self._add_stage("mask", t)
+        return red_pixels
+
+    def _analyze_crop(
+        self,
+        minimap_bgr: np.ndarray,
+        origin: Tuple[int, int],
+        background: Optional["RedBackgroundModel"],
+        red_pixels: Optional[np.ndarray] = None,
+    ) -> List[_FrameCandidate]:
+        """
+        origin 为这块图像左上角在小地图中的坐标，只用于对齐背景模型；返回的候选坐标相对这块图像。
+        """
+        t = time.perf_counter()
+        if red_pixels is None:
+            red_pixels = self._lookup_red_pixels(minimap_bgr)
+        if background is not None:
+            red_pixels = background.foreground(red_pixels, origin)
+            # 静态红色全部被背景吸收（绝大多数帧），不用膨胀、找连通块
+            if cv2.countNonZero(red_pixels) == 0:
+                self._add_stage("mask", t)
+                return []
+        red_mask = self._dilate_red_mask(red_pixels)
+        t = self._add_stage("mask", t)
+
         components = self._find_red_components(red_mask)
+        t = self._add_stage("components", t)
 
         if not components:
             return []
@@ -198,9 +710,11 @@ class RedDotFrameAnalyzer:
             minimap_bgr,
         )
         candidates.extend(core_candidates)
+        t = self._add_stage("scoring", t)
 
         # 2. 再做 cluster，用于识别中央点 + 外圈的完整红点。
         clusters = self._cluster_components(components)
+        t = self._add_stage("clustering", t)
 
         for cluster in clusters:
             candidate = self._cluster_to_candidate(cluster, red_mask, minimap_bgr)
@@ -208,7 +722,22 @@ class RedDotFrameAnalyzer:
                 candidates.append(candidate)
 
         # 3. 去重，避免同一个红点既被 core 检出，又被 cluster 检出。
-        return self._dedupe_candidates(candidates)
+        kept = self._dedupe_candidates(candidates)
+        self._reject("duplicate", len(candidates) - len(kept))
+        self._add_stage("scoring", t)
+        return kept
+
+    @staticmethod
+    def _translate_candidate(candidate: _FrameCandidate, dx: int, dy: int) -> _FrameCandidate:
+        cx, cy = candidate.center
+        x, y, w, h = candidate.bbox
+        core_x, core_y, core_w, core_h = candidate.core_bbox
+        return replace(
+            candidate,
+            center=(cx + dx, cy + dy),
+            bbox=(x + dx, y + dy, w, h),
+            core_bbox=(core_x + dx, core_y + dy, core_w, core_h),
+        )
 
     def _build_red_mask(self, bgr: np.ndarray) -> np.ndarray:
         """
@@ -217,58 +746,50 @@ class RedDotFrameAnalyzer:
 
         这里故意偏向检测“纯红 ping 标记”，避免把小地图上的红紫色单位、
         棕红色头像/选择框像素误认为红点。
+        逐像素判定见 _red_pixel_predicate，这里查预先算好的颜色位图，结果完全一致。
         """
-        b = bgr[:, :, 0].astype(np.int16)
-        g = bgr[:, :, 1].astype(np.int16)
-        r = bgr[:, :, 2].astype(np.int16)
-
-        hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
-        hue = hsv[:, :, 0].astype(np.int16)
-        sat = hsv[:, :, 1].astype(np.int16)
-        val = hsv[:, :, 2].astype(np.int16)
-
-        # SC2 小地图 ping 红点基本是非常纯的红色：
-        # hue 接近 0/180，饱和度高，G/B 很低。
-        red_hue = (hue <= 8) | (hue >= 172)
-
-        pure_red_hsv = (
-            red_hue &
-            (sat >= 155) &
-            (val >= 65)
-        )
-
-        red_dominance = (
-            (r >= 65) &
-            ((r - g) >= 45) &
-            ((r - b) >= 45) &
-            (g <= 85) &
-            (b <= 85)
-        )
-
-        # 对非常亮的纯红做一点兜底。
-        bright_pure_red = (
-            red_hue &
-            (r >= 150) &
-            ((r - g) >= 80) &
-            ((r - b) >= 80) &
-            (g <= 90) &
-            (b <= 90)
-        )
-
-        mask = ((pure_red_hsv & red_dominance) | bright_pure_red).astype(np.uint8) * 255
+        return self._dilate_red_mask(self._lookup_red_pixels(bgr))
 
+    @staticmethod
+    def _dilate_red_mask(mask: np.ndarray) -> np.ndarray:
         # 轻微连接被背景侵蚀的红色边缘。
         # 保留 1 次膨胀，但前面的 mask 已经收紧，误合并会少很多。
-        kernel = np.array(
-            [[0, 1, 0],
-            [1, 1, 1],
-            [0, 1, 0]],
-            dtype=np.uint8
-        )
+        return cv2.dilate(mask, _RED_MASK_DILATE_KERNEL, iterations=1)
 
-        mask = cv2.dilate(mask, kernel, iterations=1)
+    def _lookup_red_pixels(self, bgr: np.ndarray) -> np.ndarray:
+        """
+        查位图得到未膨胀的红色 mask（与 _red_pixel_predicate 逐像素一致）。
 
+        先用 inRange 判断是否存在候选颜色，没有时直接返回（大多数帧如此）；
+        否则把整帧转为 BGRA、按 uint32 读出作为颜色下标查位图。
+        所有中间数组按尺寸复用，每帧只分配 inRange 的结果。
+        """
+        mask = cv2.inRange(bgr, _RED_CANDIDATE_LOWER, _RED_CANDIDATE_UPPER)
+        if cv2.countNonZero(mask) == 0:
+            return mask
+
+        bits = _get_red_mask_bits()
+        shape = bgr.shape[:2]
+        if self._mask_buffers is None or self._mask_buffers[0].shape[:2] != shape:
+            self._mask_buffers = (
+                np.empty(shape + (4,), dtype=np.uint8),
+                np.empty(shape, dtype=np.uint32),
+                np.empty(shape, dtype=np.uint8),
+            )
+        bgra, offset, byte = self._mask_buffers
+
+        cv2.cvtColor(bgr, cv2.COLOR_BGR2BGRA, dst=bgra)
+        key = bgra.view(np.uint32)[:, :, 0]
+        np.bitwise_and(key, 0xFFFFFF, out=key)
+
+        np.right_shift(key, 3, out=offset)
+        np.take(bits, offset, out=byte)
+        np.bitwise_and(key, 7, out=offset)
+        np.right_shift(byte, offset, out=byte, casting="unsafe")
+        np.bitwise_and(byte, 1, out=byte)
+        np.multiply(byte, 255, out=mask)
         return mask
+
     def _find_red_components(self, mask: np.ndarray) -> List[Dict[str, Any]]:
         """
         找红色连通块。
@@ -281,10 +802,13 @@ class RedDotFrameAnalyzer:
             x, y, w, h, area = stats[label_id]
 
             if area < self.min_component_area:
+                self._reject("component_area_small")
                 continue
             if area > self.max_component_area:
+                self._reject("component_area_large")
                 continue
             if w > self.max_candidate_w or h > self.max_candidate_h:
+                self._reject("component_too_large")
                 continue
 
             cx, cy = centroids[label_id]
@@ -317,10 +841,9 @@ class RedDotFrameAnalyzer:
             if ra != rb:
                 parent[rb] = ra
 
-        for i in range(n):
-            for j in range(i + 1, n):
-                if self._should_merge_components(components[i], components[j]):
-                    union(i, j)
+        for i, j in self._candidate_merge_pairs(components):
+            if self._should_merge_components(components[i], components[j]):
+                union(i, j)
 
         groups: Dict[int, List[Dict[str, Any]]] = {}
         for i, comp in enumerate(components):
@@ -329,6 +852,36 @@ class RedDotFrameAnalyzer:
 
         return list(groups.values())
 
+    def _candidate_merge_pairs(self, components: List[Dict[str, Any]]) -> List[Tuple[int, int]]:
+        """
+        用均匀网格找出可能合并的连通块对 (i, j)，i < j。
+
+        能合并的两块，要么外扩 cluster_gap 后 bbox 相交，要么中心距离不超过
+        component_center_merge_distance（中心在各自 bbox 内），
+        所以两个 bbox 的间距一定不超过 reach。
+        格子边长取 reach，每块只需和自身 bbox 外扩 reach 后覆盖的格子里的块比较，
+        红色碎片很多的帧也不再两两比较。
+        """
+        reach = max(1, self.cluster_gap, int(math.ceil(self.component_center_merge_distance)))
+
+        grid: Dict[Tuple[int, int], List[int]] = {}
+        for i, comp in enumerate(components):
+            x, y, w, h = comp["bbox"]
+            for gx in range(x // reach, (x + w) // reach + 1):
+                for gy in range(y // reach, (y + h) // reach + 1):
+                    grid.setdefault((gx, gy), []).append(i)
+
+        pairs = set()
+        for i, comp in enumerate(components):
+            x, y, w, h = comp["bbox"]
+            for gx in range((x - reach) // reach, (x + w + reach) // reach + 1):
+                for gy in range((y - reach) // reach, (y + h + reach) // reach + 1):
+                    for j in grid.get((gx, gy), ()):
+                        if j > i:
+                            pairs.add((i, j))
+
+        return sorted(pairs)
+
     def _should_merge_components(self, a: Dict[str, Any], b: Dict[str, Any]) -> bool:
         ax, ay, aw, ah = a["bbox"]
         bx, by, bw, bh = b["bbox"]
@@ -383,9 +936,11 @@ class RedDotFrameAnalyzer:
         h = y2 - y1
 
         if w < self.min_candidate_w or h < self.min_candidate_h:
+            self._reject("cluster_too_small")
             return None
 
         if w > self.max_candidate_w or h > self.max_candidate_h:
+            self._reject("cluster_too_large")
             return self._try_make_core_candidate_from_cluster(
                 cluster,
                 red_mask,
@@ -395,6 +950,7 @@ class RedDotFrameAnalyzer:
         aspect = w / max(1, h)
 
         if aspect < 0.65 or aspect > 1.55:
+            self._reject("cluster_bad_aspect")
             return self._try_make_core_candidate_from_cluster(
                 cluster,
                 red_mask,
@@ -407,6 +963,7 @@ class RedDotFrameAnalyzer:
         # 暴风雪是暗红半透明 blob，可能形状上凑成 ring，
         # 但通常没有高亮纯红核心。
         if not self._has_hot_ping_red(minimap_bgr, candidate_bbox):
+            self._reject("cluster_no_hot_red")
             return self._try_make_core_candidate_from_cluster(
                 cluster,
                 red_mask,
@@ -415,11 +972,13 @@ class RedDotFrameAnalyzer:
 
         crop = red_mask[y1:y2, x1:x2]
         if crop.size == 0:
+            self._reject("cluster_empty")
             return None
 
         red_count = int(np.count_nonzero(crop))
 
-        if red_count < 18:
+        if red_count < self.min_cluster_red_pixels:
+            self._reject("cluster_few_red_pixels")
             return None
 
         score, has_outer_ring = self._score_diamond_candidate(crop)
@@ -433,6 +992,7 @@ class RedDotFrameAnalyzer:
             fill_ratio=fill_ratio,
             has_outer_ring=has_outer_ring,
         ):
+            self._reject("cluster_fragmented")
             return self._try_make_core_candidate_from_cluster(
                 cluster,
                 red_mask,
@@ -440,19 +1000,23 @@ class RedDotFrameAnalyzer:
             )
 
         if not has_outer_ring:
-            if w < 7 or h < 7 or red_count < 35:
+            if w < self.min_core_w or h < self.min_core_w or red_count < self.min_core_red_pixels:
+                self._reject("cluster_small_without_ring")
                 return None
 
         if has_outer_ring and score < 0.68:
+            self._reject("cluster_ring_score_low")
             return None
 
         if not has_outer_ring and score < 0.72:
+            self._reject("cluster_score_low")
             return None
 
         core_bbox = self._estimate_core_bbox(cluster, x1, y1, w, h)
 
         # core 也必须有高亮纯红，否则可能是暴风雪碎片。
         if not self._has_hot_ping_red(minimap_bgr, core_bbox, min_hot_pixels=2):
+            self._reject("cluster_core_no_hot_red")
             return None
 
         cx = core_bbox[0] + core_bbox[2] / 2.0
@@ -494,9 +1058,9 @@ class RedDotFrameAnalyzer:
         has_outer_ring = self._has_outer_ring(red)
 
         size_score = 1.0
-        if w <= 4 and h <= 4:
+        if w <= self.tiny_candidate_size and h <= self.tiny_candidate_size:
             size_score = 0.65
-        elif w >= 28 or h >= 28:
+        elif w >= self.max_candidate_w or h >= self.max_candidate_h:
             size_score = 0.75
 
         outer_bonus = 0.12 if has_outer_ring else 0.0
@@ -586,8 +1150,7 @@ class RedDotFrameAnalyzer:
         # 这里主要保证红色分布不要离菱形结构太远。
         return support
 
-    @staticmethod
-    def _has_outer_ring(red: np.ndarray) -> bool:
+    def _has_outer_ring(self, red: np.ndarray) -> bool:
         """
         判断是否存在外围菱形边框特征。
 
@@ -596,7 +1159,7 @@ class RedDotFrameAnalyzer:
         """
         h, w = red.shape[:2]
 
-        if w < 12 or h < 12:
+        if w < self.min_ring_size or h < self.min_ring_size:
             return False
 
         top_band = red[0:max(1, h // 4), :]
@@ -635,7 +1198,7 @@ class RedDotFrameAnalyzer:
         largest_ratio = largest_area / max(1, red_count)
 
         # 很小的单连通块通常只是中央菱形本体，不要当作 outer ring。
-        if component_count <= 1 and min(w, h) < 16:
+        if component_count <= 1 and min(w, h) < self.min_single_ring_size:
             return False
 
         # 如果碎成 3 块以上，而且没有一个主块占主导，就不要认为它是 ring。
@@ -644,8 +1207,8 @@ class RedDotFrameAnalyzer:
 
         return True
 
-    @staticmethod
     def _estimate_core_bbox(
+        self,
         cluster: List[Dict[str, Any]],
         group_x: int,
         group_y: int,
@@ -670,8 +1233,8 @@ class RedDotFrameAnalyzer:
             dist = math.hypot(cx - gcx, cy - gcy)
 
             # 中央点通常更靠近组中心。
-            # 面积太大的外圈片段稍微惩罚。
-            area_penalty = comp["area"] * 0.02
+            # 面积太大的外圈片段稍微惩罚（面积按 scale 的平方增长，距离按 scale 增长）。
+            area_penalty = comp["area"] * 0.02 / self.scale
             score = dist + area_penalty
 
             if score < best_score:
@@ -856,10 +1419,12 @@ class RedDotFrameAnalyzer:
         x, y, w, h = comp["bbox"]
         area = int(comp["area"])
 
-        def reject(reason: str):
+        def reject(reason: str, detail: str = ""):
+            self._reject(f"core_{reason}")
             logger.debug(
-                "core reject: reason=%s bbox=%s area=%s",
+                "core reject: reason=%s%s bbox=%s area=%s",
                 reason,
+                detail,
                 (x, y, w, h),
                 area,
             )
@@ -870,18 +1435,18 @@ class RedDotFrameAnalyzer:
         if not self._has_hot_ping_red(minimap_bgr, (x, y, w, h), min_hot_pixels=2):
             return reject("no_hot_ping_red")
 
-        if w < 7 or h < 7:
+        if w < self.min_core_w or h < self.min_core_w:
             return reject("too_small")
 
-        if w > 24 or h > 24:
+        if w > self.max_core_w or h > self.max_core_w:
             return reject("too_large")
 
         aspect = w / max(1, h)
         if aspect < 0.70 or aspect > 1.45:
-            return reject(f"bad_aspect_{aspect:.2f}")
+            return reject("bad_aspect", f"_{aspect:.2f}")
 
-        if area < 40:
-            return reject("area_lt_40")
+        if area < self.min_core_area:
+            return reject("area_small", f"_lt_{self.min_core_area}")
 
         crop = red_mask[y:y + h, x:x + w]
         if crop.size == 0:
@@ -891,12 +1456,12 @@ class RedDotFrameAnalyzer:
         fill_ratio = red_count / max(1, w * h)
 
         if fill_ratio < 0.30:
-            return reject(f"fill_ratio_low_{fill_ratio:.2f}")
+            return reject("fill_ratio_low", f"_{fill_ratio:.2f}")
 
         score, _ = self._score_diamond_candidate(crop)
 
         if score < 0.68:
-            return reject(f"score_low_{score:.3f}")
+            return reject("score_low", f"_{score:.3f}")
 
         cx = x + w / 2.0
         cy = y + h / 2.0
@@ -911,7 +1476,7 @@ class RedDotFrameAnalyzer:
     def _dedupe_candidates(
         self,
         candidates: List[_FrameCandidate],
-        merge_distance: float = 16.0
+        merge_distance: Optional[float] = None
     ) -> List[_FrameCandidate]:
         """
         去除同一个红点的重复候选。
@@ -924,6 +1489,9 @@ class RedDotFrameAnalyzer:
         if not candidates:
             return []
 
+        if merge_distance is None:
+            merge_distance = self.dedupe_merge_distance
+
         def bbox_area(c: _FrameCandidate) -> int:
             return c.bbox[2] * c.bbox[3]
 
@@ -937,7 +1505,7 @@ class RedDotFrameAnalyzer:
             dist = math.hypot(ax - bx, ay - by)
 
             # bbox 轻微接触/重叠，基本就是同一个 ping 的外圈/核心。
-            if self._bbox_overlap(expand_bbox(a.bbox, 3), b.bbox):
+            if self._bbox_overlap(expand_bbox(a.bbox, self.dedupe_touch_gap), b.bbox):
                 return True
 
             # 中心近但 bbox 没接触时，仍保守一点，避免误合并两个真实红点。
@@ -946,7 +1514,7 @@ class RedDotFrameAnalyzer:
                 bw, bh = b.bbox[2], b.bbox[3]
 
                 # 两个候选至少有一个不是很小，才按同一点合并。
-                if max(aw, ah, bw, bh) >= 12:
+                if max(aw, ah, bw, bh) >= self.dedupe_min_size:
                     return True
 
             return False
@@ -992,40 +1560,86 @@ class MinimapRedDotDetector:
 
         result = red_dot_detector.get_result(monitor_id)
 
+    或者订阅推送（不需要轮询，也不需要 cleanup_expired）：
+
+        subscription_id = red_dot_detector.subscribe(
+            region=(50, 50, 160, 160),
+            callback=on_ping,
+            min_confirmed_frames=2,
+        )
+        ...
+        red_dot_detector.unsubscribe(subscription_id)
+
     注意：
     - start_monitor 开启检测窗口。
     - get_result 只读取缓存，不做图像检测。
     - count 只统计 confirmed detection。
+    - subscribe 的回调在后台检测线程中执行，Qt 界面相关的操作要自己转到主线程。
     """
 
-    MINIMAP_BASE_X = 27
-    MINIMAP_BASE_Y = 807
-    MINIMAP_BASE_W = 264
-    MINIMAP_BASE_H = 259
-    BASE_WIDTH = 1920.0
+    # 1920x1080 下的小地图位置；其他分辨率按截图高度推算，开启 auto_locate_minimap 时由 MinimapLocator 定位。
+    # 对外的小地图局部坐标（region、detection）始终以 264x259 为基准。
+    MINIMAP_BASE_X = minimap_locator.BASE_X
+    MINIMAP_BASE_Y = minimap_locator.BASE_Y
+    MINIMAP_BASE_W = minimap_locator.BASE_W
+    MINIMAP_BASE_H = minimap_locator.BASE_H
+
+    # 小地图比基准小时，原生像素里红点只剩几个像素，按比例缩小的阈值不可靠：
+    # 缩放比例低于这个值时仍把 ROI 放大回 264x259，用基准阈值分析。
+    NATIVE_MIN_SCALE = 0.95
+
+    # 只分析 active monitor 区域的并集时，四周额外保留的像素。
+    # 大于红点外圈的最大尺寸 (28) 和去重距离，区域边缘附近的红点及其外圈不会被裁断。
+    ANALYSIS_REGION_PADDING = 32
 
     REGION_CENTER_IN = "center_in"
     REGION_CORE_BBOX_IN = "core_bbox_in"
     REGION_FULL_BBOX_IN = "full_bbox_in"
 
+    # 订阅中超过这么久没再看到的 track 会被删除；之后同一位置再出现红点会作为新的 ping 推送。
+    SUBSCRIPTION_TRACK_TTL_S = 3.0
+
+    # stats_csv_path 的列：每处理一帧一行，阶段耗时单位为毫秒。
+    STATS_CSV_HEADER = (
+        "time", "frame_id", "screenshot_age_ms", "analysis_scale", "active_monitors",
+        "candidates", "rejections",
+        *(f"{stage}_ms" for stage in _DetectorStats.STAGES),
+    )
+
     def __init__(
         self,
-        sample_interval_s: float = 0.10,
         max_screenshot_age_s: float = 0.35,
         track_match_distance_px: float = 13.0,
         debug: bool = False,
+        expected_frame_interval_s: float = 0.1,
+        stats_csv_path: Optional[str] = None,
+        auto_locate_minimap: bool = False,
     ) -> None:
-        self.sample_interval_s = sample_interval_s
+        # 后台线程由新截图驱动：每张新截图处理一次。
+        # 超过 max_screenshot_age_s 没有新截图时也会醒来一次，把 monitor 标记为 stale。
         self.max_screenshot_age_s = max_screenshot_age_s
         self.track_match_distance_px = track_match_distance_px
         self.debug = debug
-
+        # 截图间隔（screenshot_scheduler 每 0.1 秒一张），用于计算 monitor 的帧覆盖率。
+        self.expected_frame_interval_s = expected_frame_interval_s
+        # 不为空时每处理一帧向该 CSV 追加一行阶段耗时。
+        self.stats_csv_path = stats_csv_path or None
+        self._stats = _DetectorStats()
+
+        # 小地图定位结果按截图尺寸缓存；分析器的阈值随定位到的缩放比例重建。
+        # 边框搜索还没有在真实的 1080p / 1440p / 带鱼屏截图上验证过，默认关闭，只用推算的几何。
+        self.auto_locate_minimap = auto_locate_minimap
+        self._locator = MinimapLocator()
+        self._geometry: Optional[MinimapGeometry] = None
+        self._analysis_scale = 1.0
         self._analyzer = RedDotFrameAnalyzer()
 
         self._lock = threading.RLock()
         self._monitors: Dict[str, _MonitorState] = {}
 
         self._stop_event = threading.Event()
+        # 没有 active monitor 时 worker 在这里等待，start_monitor / stop_worker 唤醒。
+        self._monitor_event = threading.Event()
         self._worker_thread: Optional[threading.Thread] = None
 
         self._frame_id = 0
@@ -1055,6 +1669,8 @@ class MinimapRedDotDetector:
         停止后台检测线程。
         """
         self._stop_event.set()
+        self._monitor_event.set()
+        state.wake_screenshot_waiters()
 
         thread = self._worker_thread
         if thread is not None and thread.is_alive():
@@ -1070,6 +1686,9 @@ class MinimapRedDotDetector:
         min_confirmed_frames: int = 2,
         min_score: float = 0.58,
         high_score: float = 0.82,
+        background_model: bool = False,
+        callback: Optional[Callable[[RedDotEvent], None]] = None,
+        track_ttl_s: Optional[float] = None,
     ) -> str:
         """
         开启一个检测窗口。
@@ -1094,6 +1713,12 @@ class MinimapRedDotDetector:
             high_score:
                 高分候选阈值。当前版本仍会遵守 min_confirmed_frames，
                 先保守，避免单帧误判。
+            background_model:
+                为该窗口维护一个红色像素的时间背景模型（见 RedBackgroundModel），
+                只让新出现的红色参与检测。适合有静态红色建筑 / 持续红色突变因子效果的地图；
+                窗口开始时就已经存在的红点会被当作背景。
+            callback / track_ttl_s:
+                供 subscribe 使用，见 subscribe。
 
         Returns:
             monitor_id
@@ -1123,12 +1748,16 @@ class MinimapRedDotDetector:
             min_confirmed_frames=max(1, int(min_confirmed_frames)),
             min_score=float(min_score),
             high_score=float(high_score),
+            background=RedBackgroundModel() if background_model else None,
+            callback=callback,
+            track_ttl_s=track_ttl_s,
         )
 
         with self._lock:
             self._monitors[monitor_id] = monitor
 
         self.start_worker()
+        self._monitor_event.set()
 
         logger.debug(
             "red dot monitor started: id=%s duration=%.2f region=%s mode=%s",
@@ -1137,6 +1766,50 @@ class MinimapRedDotDetector:
 
         return monitor_id
 
+    def subscribe(
+        self,
+        region: Optional[Region],
+        callback: Callable[[RedDotEvent], None],
+        min_confirmed_frames: int = 2,
+        region_mode: str = REGION_CORE_BBOX_IN,
+        min_score: float = 0.58,
+        high_score: float = 0.82,
+        duration_s: Optional[float] = None,
+        background_model: bool = False,
+    ) -> str:
+        """
+        订阅一个区域的红点 ping。
+
+        每个 track 刚 confirmed 的那一帧，在后台检测线程中调用一次 callback(RedDotEvent)。
+        参数含义同 start_monitor；duration_s 为 None 表示一直订阅到 unsubscribe。
+        订阅 id 同时也是 monitor_id，get_result 仍然可用，
+        但其中只包含最近 SUBSCRIPTION_TRACK_TTL_S 秒内还被看到过的 track。
+
+        Returns:
+            subscription_id
+        """
+        if not callable(callback):
+            raise ValueError("callback must be callable")
+
+        monitor_id = self.start_monitor(
+            duration_s=math.inf if duration_s is None else duration_s,
+            region=region,
+            region_mode=region_mode,
+            min_confirmed_frames=min_confirmed_frames,
+            min_score=min_score,
+            high_score=high_score,
+            background_model=background_model,
+            callback=callback,
+            track_ttl_s=self.SUBSCRIPTION_TRACK_TTL_S,
+        )
+        return monitor_id
+
+    def unsubscribe(self, subscription_id: str) -> bool:
+        """
+        取消订阅。返回值同 stop_monitor。
+        """
+        return self.stop_monitor(subscription_id)
+
     def get_result(self, monitor_id: str) -> Dict[str, Any]:
         """
         获取检测窗口当前快照。
@@ -1194,6 +1867,62 @@ class MinimapRedDotDetector:
 
         return removed
 
+    def reset_minimap_geometry(self) -> None:
+        """
+        丢弃缓存的小地图位置，下一帧重新定位（新游戏 / 进入录像时调用）。
+        """
+        self._locator.reset()
+
+    def get_minimap_geometry(self) -> Optional[MinimapGeometry]:
+        """
+        最近一帧使用的小地图几何，还没有处理过截图时为 None。
+        """
+        return self._geometry
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        性能统计快照：
+        - frames_processed / frames_duplicate / frames_invalid（按原因）/ fps；
+        - stages：各阶段（roi_copy、mask、components、clustering、scoring、tracking、callbacks、total）
+          的次数与耗时（毫秒）；
+        - rejections：各启发式拒绝候选的次数；
+        - monitors：每个 monitor 的帧覆盖（已处理帧数 / 窗口内应有帧数）。
+        """
+        now = time.perf_counter()
+
+        with self._lock:
+            stats = self._stats.to_dict()
+            stats["analysis_scale"] = self._analysis_scale
+            geometry = self._geometry
+            stats["minimap_geometry"] = None if geometry is None else {
+                "roi": geometry.roi(),
+                "scale": geometry.scale,
+                "confidence": geometry.confidence,
+                "located": geometry.located,
+            }
+
+            monitors = {}
+            for monitor_id, monitor in self._monitors.items():
+                self._refresh_monitor_expired_state(monitor, now)
+                monitors[monitor_id] = {
+                    "active": monitor.active,
+                    "expired": monitor.expired,
+                    "subscription": monitor.callback is not None,
+                    "frame_updates": monitor.frame_updates,
+                    **self._monitor_coverage(monitor, now),
+                }
+            stats["monitors"] = monitors
+
+        return stats
+
+    def reset_stats(self) -> None:
+        """
+        清零性能统计（不影响 monitor 的帧覆盖）。
+        """
+        with self._lock:
+            self._stats.reset()
+            self._analyzer.take_stats()
+
     def has_active_monitors(self) -> bool:
         with self._lock:
             now = time.perf_counter()
@@ -1204,14 +1933,31 @@ class MinimapRedDotDetector:
         return False
 
     def _worker_loop(self) -> None:
-        while not self._stop_event.is_set():
+        frame_id = 0
+
+        while not self._stop_event.is_set() and not state.app_closing:
+            if not self.has_active_monitors():
+                # 没有检测窗口时不看截图，等 start_monitor 唤醒。
+                self._monitor_event.wait()
+                self._monitor_event.clear()
+                continue
+
+            # 程序关闭后 wait_for_screenshot 总是立即返回，必须退出循环，否则会空转。
+            frame_id = state.wait_for_screenshot(
+                frame_id,
+                timeout=self.max_screenshot_age_s,
+                should_stop=self._stop_event.is_set,
+            )
+            if self._stop_event.is_set() or state.app_closing:
+                break
+
+            # 走到这里要么是新截图，要么是等待超时（需要把 monitor 标记为 stale），两种情况都处理一次。
+
             try:
                 self._process_once()
             except Exception:
                 logger.exception("MinimapRedDotDetector worker error")
 
-            time.sleep(self.sample_interval_s)
-
     def _process_once(self) -> None:
         now = time.perf_counter()
 
@@ -1225,7 +1971,20 @@ class MinimapRedDotDetector:
             if not any(m.active for m in self._monitors.values()):
                 return
 
+            active_monitors = [m for m in self._monitors.values() if m.active]
+            plain_monitors = [m for m in active_monitors if m.background is None]
+            analysis_region = self._analysis_region([m.region for m in plain_monitors])
+
+            # 使用背景模型的 monitor 各自只分析自己的区域（各自的背景只对齐自己的窗口）。
+            background_jobs = [
+                (m.monitor_id, m.background, self._analysis_region([m.region]))
+                for m in active_monitors
+                if m.background is not None
+            ]
+
+        started = time.perf_counter()
         minimap_bgr, screenshot_ts, reason = self._copy_minimap_roi()
+        roi_copy_s = time.perf_counter() - started
 
         if minimap_bgr is None:
             self._mark_active_monitors_invalid(reason)
@@ -1233,21 +1992,204 @@ class MinimapRedDotDetector:
 
         # 同一张截图不重复处理。
         if screenshot_ts <= self._last_processed_screenshot_ts:
+            with self._lock:
+                self._stats.frames_duplicate += 1
             return
 
         self._last_processed_screenshot_ts = screenshot_ts
         self._frame_id += 1
 
-        candidates = self._analyzer.analyze(minimap_bgr)
+        if self._analysis_scale != self._analyzer.scale:
+            self._on_scale_changed(self._analysis_scale)
+
+        # 红色像素查表对所有区域只做一次；使用背景模型的 monitor 从中切出自己的区域，
+        # 扣掉背景后只在剩下的前景上找连通块。
+        regions = [region for _, _, region in background_jobs]
+        if plain_monitors:
+            regions.append(analysis_region)
+        shared_region = self._native_region(minimap_bgr, self._merge_regions(regions))
+        shared_red_pixels = (
+            self._analyzer.lookup_red_pixels(minimap_bgr, shared_region),
+            shared_region[:2],
+        )
+
+        candidates: List[_FrameCandidate] = []
+        if plain_monitors:
+            candidates = self._analyze_native(minimap_bgr, analysis_region, None, shared_red_pixels)
+
+        monitor_candidates = {
+            monitor_id: self._analyze_native(minimap_bgr, region, background, shared_red_pixels)
+            for monitor_id, background, region in background_jobs
+        }
+
+        self._update_monitors_with_candidates(
+            candidates, now, monitor_candidates, screenshot_ts=screenshot_ts,
+        )
+
+        stage_seconds, rejections = self._analyzer.take_stats()
+        stage_seconds["roi_copy"] = roi_copy_s
+        stage_seconds["total"] = time.perf_counter() - started
+        candidate_count = len(candidates) + sum(len(c) for c in monitor_candidates.values())
+
+        with self._lock:
+            stats = self._stats
+            stats.frames_processed += 1
+            for stage, seconds in stage_seconds.items():
+                stats.add_stage(stage, seconds)
+            stats.add_rejections(rejections)
+            if self.stats_csv_path:
+                # tracking / callbacks 由 _update_monitors_with_candidates 记录，取本帧的值。
+                for stage in ("tracking", "callbacks"):
+                    entry = stats.stages.get(stage)
+                    stage_seconds[stage] = entry[3] if entry else 0.0
 
         if self.debug:
-            logger.debug("red dot frame candidates=%d", len(candidates))
+            logger.debug(
+                "red dot frame %d candidates=%d region=%s background_monitors=%d total=%.2fms",
+                self._frame_id, len(candidates), analysis_region, len(background_jobs),
+                stage_seconds["total"] * 1000.0,
+            )
+
+        if self.stats_csv_path:
+            self._append_stats_csv([
+                time.strftime("%Y-%m-%d %H:%M:%S"),
+                self._frame_id,
+                round((started - screenshot_ts) * 1000.0, 3),
+                round(self._analysis_scale, 4),
+                len(active_monitors),
+                candidate_count,
+                sum(rejections.values()),
+                *(round(stage_seconds.get(stage, 0.0) * 1000.0, 3) for stage in _DetectorStats.STAGES),
+            ])
+
+    def _append_stats_csv(self, row: List[Any]) -> None:
+        path = self.stats_csv_path
+        try:
+            write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+            with open(path, "a", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                if write_header:
+                    writer.writerow(self.STATS_CSV_HEADER)
+                writer.writerow(row)
+        except OSError as e:
+            # 写失败后不再重试，避免每帧刷日志。
+            logger.warning("red dot stats csv disabled, write failed: %s (%s)", path, e)
+            self.stats_csv_path = None
+
+    def _on_scale_changed(self, scale: float) -> None:
+        """
+        小地图缩放比例变化：按新比例重建分析器，背景模型的坐标不再对应，全部清空。
+        """
+        logger.info("red dot analyzer rescaled: %.3f -> %.3f", self._analyzer.scale, scale)
+        self._analyzer = RedDotFrameAnalyzer(scale)
+
+        with self._lock:
+            for monitor in self._monitors.values():
+                if monitor.background is not None:
+                    monitor.background.reset()
 
-        self._update_monitors_with_candidates(candidates, now, self._frame_id)
+    def _analyze_native(
+        self,
+        minimap_bgr: np.ndarray,
+        region: Optional[Region],
+        background: Optional[RedBackgroundModel] = None,
+        shared_red_pixels: Optional[Tuple[np.ndarray, Tuple[int, int]]] = None,
+    ) -> List[_FrameCandidate]:
+        """
+        在原生分辨率的小地图上分析：region 为基准坐标，先换算到原生像素；
+        返回的候选换算回基准坐标，track 距离和 monitor 区域都按基准坐标工作。
+        shared_red_pixels 为本帧已查好的 (未膨胀红色 mask, 其左上角的原生坐标)，
+        必须覆盖 region；传入时直接切出本区域，不再重复查表。
+        """
+        scale = self._analyzer.scale
+        native_region = self._native_region(minimap_bgr, region)
+
+        red_pixels = None
+        if shared_red_pixels is not None:
+            mask, (mask_x, mask_y) = shared_red_pixels
+            x1, y1, x2, y2 = native_region
+            red_pixels = mask[y1 - mask_y:y2 - mask_y, x1 - mask_x:x2 - mask_x]
+            if background is not None:
+                # foreground 原地修改，不能改到其他区域共用的 mask
+                red_pixels = red_pixels.copy()
+
+        candidates = self._analyzer.analyze(minimap_bgr, native_region, background, red_pixels)
+        if scale == 1.0:
+            return candidates
+        return [self._candidate_to_base(c, scale) for c in candidates]
+
+    def _native_region(self, minimap_bgr: np.ndarray, region: Optional[Region]) -> Region:
+        """
+        基准坐标的区域换算为原生像素并裁到小地图范围内；None 表示整个小地图。
+        """
+        h, w = minimap_bgr.shape[:2]
+        if region is None:
+            return 0, 0, w, h
+
+        scale = self._analyzer.scale
+        x1, y1, x2, y2 = region
+        return (
+            max(0, int(math.floor(x1 * scale))),
+            max(0, int(math.floor(y1 * scale))),
+            min(w, int(math.ceil(x2 * scale))),
+            min(h, int(math.ceil(y2 * scale))),
+        )
+
+    @staticmethod
+    def _merge_regions(regions: List[Optional[Region]]) -> Optional[Region]:
+        """
+        几个分析区域的外接矩形；有任一为 None（整个小地图）时返回 None。
+        """
+        if not regions or any(region is None for region in regions):
+            return None
+        return (
+            min(r[0] for r in regions),
+            min(r[1] for r in regions),
+            max(r[2] for r in regions),
+            max(r[3] for r in regions),
+        )
+
+    @staticmethod
+    def _candidate_to_base(candidate: _FrameCandidate, scale: float) -> _FrameCandidate:
+        def to_base(bbox: BBox) -> BBox:
+            x, y, w, h = bbox
+            return (
+                int(round(x / scale)),
+                int(round(y / scale)),
+                max(1, int(round(w / scale))),
+                max(1, int(round(h / scale))),
+            )
+
+        cx, cy = candidate.center
+        return replace(
+            candidate,
+            center=(cx / scale, cy / scale),
+            bbox=to_base(candidate.bbox),
+            core_bbox=to_base(candidate.core_bbox),
+        )
+
+    def _analysis_region(self, regions: List[Optional[Region]]) -> Optional[Region]:
+        """
+        monitor 区域的外接矩形，四周外扩 ANALYSIS_REGION_PADDING 并裁到小地图范围内。
+        有任一 monitor 不限区域时返回 None（分析整个小地图）。
+        """
+        if not regions or any(region is None for region in regions):
+            return None
+
+        pad = self.ANALYSIS_REGION_PADDING
+        return (
+            max(0, int(math.floor(min(r[0] for r in regions))) - pad),
+            max(0, int(math.floor(min(r[1] for r in regions))) - pad),
+            min(self.MINIMAP_BASE_W, int(math.ceil(max(r[2] for r in regions))) + pad),
+            min(self.MINIMAP_BASE_H, int(math.ceil(max(r[3] for r in regions))) + pad),
+        )
 
     def _copy_minimap_roi(self) -> Tuple[Optional[np.ndarray], float, Optional[str]]:
         """
-        从全局截图复制小地图 ROI。
+        从全局截图按原生分辨率复制小地图 ROI，不再缩放回 264x259
+        （缩放比例低于 NATIVE_MIN_SCALE 时除外）；
+        使用的几何记录在 self._geometry，分析用的缩放比例记录在 self._analysis_scale。
+        开启 auto_locate_minimap 时同一尺寸的截图只在第一帧搜索（几十毫秒），之后用缓存并定期复查。
         """
         with state.screenshot_lock:
             screenshot = state.latest_screenshot
@@ -1263,64 +2205,57 @@ class MinimapRedDotDetector:
                 return None, screenshot_ts, "stale_screenshot"
 
             h, w = screenshot.shape[:2]
-            scale = self._get_effective_scale(w)
-
-            x = int(round(self.MINIMAP_BASE_X * scale))
-            y = int(round(self.MINIMAP_BASE_Y * scale))
-            roi_w = int(round(self.MINIMAP_BASE_W * scale))
-            roi_h = int(round(self.MINIMAP_BASE_H * scale))
+            if self.auto_locate_minimap:
+                geometry = self._locator.geometry(screenshot)
+            else:
+                geometry = default_geometry(w, h)
+            x, y, roi_w, roi_h = geometry.roi()
 
             if x < 0 or y < 0 or x + roi_w > w or y + roi_h > h:
                 return None, screenshot_ts, "minimap_roi_out_of_range"
 
             minimap = screenshot[y:y + roi_h, x:x + roi_w].copy()
 
-        # 如果将来未强制缩放到 1920 宽，这里把小地图 ROI 统一缩回基准大小，
-        # 让后续检测阈值继续按 264x259 工作。
-        if minimap.shape[1] != self.MINIMAP_BASE_W or minimap.shape[0] != self.MINIMAP_BASE_H:
+        self._geometry = geometry
+        self._analysis_scale = geometry.scale
+        if geometry.scale < self.NATIVE_MIN_SCALE:
             minimap = cv2.resize(
                 minimap,
                 (self.MINIMAP_BASE_W, self.MINIMAP_BASE_H),
-                interpolation=cv2.INTER_AREA,
+                interpolation=cv2.INTER_LINEAR,
             )
+            self._analysis_scale = 1.0
 
         return minimap, screenshot_ts, None
 
-    def _get_effective_scale(self, screenshot_width: int) -> float:
-        """
-        当前 game_state_service 会把截图缩放到 1920 宽，并把 scale_factor 设为 1.0。
-        如果以后取消强制缩放，这里仍尽量兼容。
-        """
-        if abs(screenshot_width - int(self.BASE_WIDTH)) <= 2:
-            return 1.0
-
-        scale_from_width = screenshot_width / self.BASE_WIDTH
-
-        scale_from_state = getattr(state, "scale_factor", None)
-        if isinstance(scale_from_state, (int, float)) and scale_from_state > 0:
-            # 如果 state.scale_factor 明显不是 1，优先用它。
-            if abs(float(scale_from_state) - 1.0) > 0.01:
-                return float(scale_from_state)
-
-        return float(scale_from_width)
-
     def _mark_active_monitors_invalid(self, reason: Optional[str]) -> None:
         now = time.perf_counter()
 
         with self._lock:
+            self._stats.add_invalid(reason or "unknown")
             for monitor in self._monitors.values():
                 self._refresh_monitor_expired_state(monitor, now)
                 if monitor.active:
                     monitor.valid = False
                     monitor.reason = reason or "unknown"
                     monitor.updated_at = now
+                    monitor.invalid_updates += 1
 
     def _update_monitors_with_candidates(
         self,
         candidates: List[_FrameCandidate],
         now: float,
-        frame_id: int
+        monitor_candidates: Optional[Dict[str, List[_FrameCandidate]]] = None,
+        screenshot_ts: Optional[float] = None,
     ) -> None:
+        """
+        monitor_candidates：使用背景模型的 monitor 单独分析得到的候选，按 monitor_id 索引。
+        订阅的回调在释放锁之后再调用，回调里可以安全地 subscribe / unsubscribe。
+        """
+        monitor_candidates = monitor_candidates or {}
+        events: List[Tuple[Callable[[RedDotEvent], None], RedDotEvent]] = []
+        started = time.perf_counter()
+
         with self._lock:
             for monitor in self._monitors.values():
                 self._refresh_monitor_expired_state(monitor, now)
@@ -1328,106 +2263,85 @@ class MinimapRedDotDetector:
                 if not monitor.active:
                     continue
 
+                if monitor.background is not None:
+                    if monitor.monitor_id not in monitor_candidates:
+                        # 本帧开始分析之后才创建的 monitor，下一帧再处理。
+                        continue
+                    source = monitor_candidates[monitor.monitor_id]
+                else:
+                    source = candidates
+
                 region_candidates = [
-                    c for c in candidates
+                    c for c in source
                     if self._candidate_in_monitor_region(c, monitor)
                 ]
 
-                self._update_monitor_tracks(monitor, region_candidates, now, frame_id)
+                confirmed = self._update_monitor_tracks(monitor, region_candidates, now)
+
+                previous = monitor.last_valid_at if monitor.last_valid_at is not None else monitor.started_at
+                monitor.max_frame_gap_s = max(monitor.max_frame_gap_s, now - previous)
+                monitor.last_valid_at = now
 
                 monitor.valid = True
                 monitor.reason = None
                 monitor.updated_at = now
                 monitor.frame_updates += 1
 
-    def _update_monitor_tracks(
-        self,
-        monitor: _MonitorState,
-        candidates: List[_FrameCandidate],
-        now: float,
-        frame_id: int
-    ) -> None:
-        unmatched_track_ids = set(monitor.tracks.keys())
-
-        # 高分优先匹配，避免弱候选抢 track。
-        candidates = sorted(candidates, key=lambda c: c.score, reverse=True)
-
-        for candidate in candidates:
-            track = self._find_best_track(monitor, candidate, unmatched_track_ids)
-
-            if track is None:
-                track_id = str(uuid.uuid4())
-                track = _Track(
-                    track_id=track_id,
-                    center=candidate.center,
-                    bbox=candidate.bbox,
-                    core_bbox=candidate.core_bbox,
-                    max_score=candidate.score,
-                    hit_frames=1,
-                    has_outer_ring=candidate.has_outer_ring,
-                    first_seen=now,
-                    last_seen=now,
-                    confirmed=False,
-                    last_matched_frame_id=frame_id,
+                if monitor.callback is not None:
+                    events.extend(
+                        (monitor.callback, RedDotEvent(
+                            subscription_id=monitor.monitor_id,
+                            detection=detection,
+                            confirmed_at=now,
+                            screenshot_ts=now if screenshot_ts is None else screenshot_ts,
+                            frame_id=self._frame_id,
+                        ))
+                        for detection in confirmed
+                    )
+
+            callbacks_started = time.perf_counter()
+            self._stats.add_stage("tracking", callbacks_started - started)
+
+        for callback, event in events:
+            try:
+                callback(event)
+            except Exception:
+                logger.exception(
+                    "red dot subscription callback error: id=%s", event.subscription_id
                 )
-                monitor.tracks[track_id] = track
-            else:
-                track.update(candidate, now, frame_id)
-                unmatched_track_ids.discard(track.track_id)
 
-            self._maybe_confirm_track(monitor, track)
+        with self._lock:
+            self._stats.add_stage("callbacks", time.perf_counter() - callbacks_started)
 
-    def _find_best_track(
+    def _update_monitor_tracks(
         self,
         monitor: _MonitorState,
-        candidate: _FrameCandidate,
-        allowed_track_ids: set
-    ) -> Optional[_Track]:
-        best_track = None
-        best_dist = float("inf")
-
-        cx, cy = candidate.center
-
-        for track_id in allowed_track_ids:
-            track = monitor.tracks.get(track_id)
-            if track is None:
-                continue
-
-            tx, ty = track.center
-            dist = math.hypot(cx - tx, cy - ty)
-
-            # confirmed track 保留到窗口结束。
-            # 这样同一个红点外圈消失后再次出现，不会重复计数。
-            max_dist = self.track_match_distance_px
-            if track.confirmed:
-                max_dist = max(max_dist, 16.0)
-
-            if dist <= max_dist and dist < best_dist:
-                best_dist = dist
-                best_track = track
-
-        return best_track
-
-    @staticmethod
-    def _maybe_confirm_track(monitor: _MonitorState, track: _Track) -> None:
-        if track.confirmed:
-            return
-
-        if track.hit_frames < monitor.min_confirmed_frames:
-            return
-
-        # 严格模式：
-        # core-only 只用于维持 track，不直接确认。
-        # 必须至少观察到一次 outer ring，才认为这是红点 ping。
-        if not track.has_outer_ring:
-            return
+        candidates: List[_FrameCandidate],
+        now: float,
+    ) -> List[RedDotDetection]:
+        """
+        返回本帧刚 confirmed 的 detection。
+        """
+        tracks = monitor.tracks
+        if monitor.track_ttl_s is not None and tracks.prune(now - monitor.track_ttl_s):
+            monitor.tracks_version += 1
 
-        if track.max_score >= monitor.min_score:
-            track.confirmed = True
-            return
+        updated = tracks.associate(
+            candidates,
+            now,
+            match_distance=self.track_match_distance_px,
+            confirmed_match_distance=max(self.track_match_distance_px, 16.0),
+        )
+        confirmed = tracks.confirm(
+            updated,
+            monitor.min_confirmed_frames,
+            monitor.min_score,
+            monitor.high_score,
+        )
+        if len(updated):
+            monitor.tracks_version += 1
 
-        if track.max_score >= monitor.high_score:
-            track.confirmed = True
+        return [tracks.detection(i) for i in confirmed]
 
     def _candidate_in_monitor_region(
         self,
@@ -1479,31 +2393,46 @@ class MinimapRedDotDetector:
             monitor.active = False
             monitor.expired = True
 
-    @staticmethod
-    def _monitor_to_result_dict(monitor: _MonitorState) -> Dict[str, Any]:
-        confirmed_tracks = [
-            t for t in monitor.tracks.values()
-            if t.confirmed
-        ]
+    def _monitor_coverage(self, monitor: _MonitorState, now: float) -> Dict[str, Any]:
+        """
+        帧覆盖：窗口开始到现在（或窗口结束）按 expected_frame_interval_s 应有的帧数，
+        与实际有效处理的帧数之比；max_frame_gap_s 含最后一帧到现在的间隔。
+        """
+        window_end = min(now, monitor.ends_at)
+        elapsed = max(0.0, window_end - monitor.started_at)
+        expected = elapsed / self.expected_frame_interval_s
+
+        if expected > 0:
+            coverage = min(1.0, monitor.frame_updates / expected)
+        else:
+            coverage = 0.0
+
+        last = monitor.last_valid_at if monitor.last_valid_at is not None else monitor.started_at
+
+        return {
+            "expected_frames": expected,
+            "frame_coverage": coverage,
+            "invalid_updates": monitor.invalid_updates,
+            "max_frame_gap_s": max(monitor.max_frame_gap_s, window_end - last),
+        }
+
+    def _monitor_to_result_dict(self, monitor: _MonitorState) -> Dict[str, Any]:
+        # confirmed detections 只在 tracks 更新后重建一次，两帧之间的轮询直接复用。
+        # 返回的 detection dict 在多次调用间共享，调用方不要修改。
+        cache = monitor.detections_cache
+        if cache is None or cache[0] != monitor.tracks_version:
+            detections = [d.to_dict() for d in monitor.tracks.confirmed_detections()]
+            cache = monitor.detections_cache = (monitor.tracks_version, detections)
+        detections = cache[1]
 
         now = time.perf_counter()
 
         # 当前仍然可见的 confirmed tracks。
         # count 是窗口内已经确认过的总数；
         # current_count 是最近仍被看到的数量。
-        current_tracks = [
-            t for t in confirmed_tracks
-            if now - t.last_seen <= 0.45
-        ]
-
-        detections = [
-            t.to_detection().to_dict()
-            for t in sorted(confirmed_tracks, key=lambda item: item.first_seen)
-        ]
-
         current_detections = [
-            t.to_detection().to_dict()
-            for t in sorted(current_tracks, key=lambda item: item.first_seen)
+            d for d in detections
+            if now - d["last_seen"] <= 0.45
         ]
 
         return {
@@ -1511,9 +2440,9 @@ class MinimapRedDotDetector:
             "active": monitor.active,
             "expired": monitor.expired,
             "valid": monitor.valid,
-            "count": len(confirmed_tracks),
-            "current_count": len(current_tracks),
-            "detections": detections,
+            "count": len(detections),
+            "current_count": len(current_detections),
+            "detections": list(detections),
             "current_detections": current_detections,
             "region": monitor.region,
             "region_mode": monitor.region_mode,
@@ -1521,9 +2450,148 @@ class MinimapRedDotDetector:
             "ends_at": monitor.ends_at,
             "updated_at": monitor.updated_at,
             "frame_updates": monitor.frame_updates,
+            **self._monitor_coverage(monitor, now),
             "reason": monitor.reason,
         }
 
 
 # 可选：全局单例，方便其他模块直接 import 使用。
-red_dot_detector = MinimapRedDotDetector()
\ No newline at end of file
+red_dot_detector = MinimapRedDotDetector(
+    stats_csv_path=getattr(config, 'RED_DOT_STATS_CSV', None),
+    auto_locate_minimap=getattr(config, 'MINIMAP_AUTO_LOCATE', False),
+)
+
+
+def _check_red_mask_bits() -> int:
+    """
+    在全部 2^24 种 BGR 颜色上比较查位图结果与 _red_pixel_predicate，返回不一致的颜色数。
+    """
+    analyzer = RedDotFrameAnalyzer()
+    mismatches = 0
+
+    # 每次取 R 的 16 个值，拼成 (16 * 256) x 256 的图像，覆盖全部 G/B 组合。
+    gb = np.arange(256, dtype=np.uint8)
+    g, b = np.meshgrid(gb, gb, indexing="ij")
+    for r0 in range(0, 256, 16):
+        r = np.repeat(np.arange(r0, r0 + 16, dtype=np.uint8), 256 * 256).reshape(16 * 256, 256)
+        colors = np.stack([np.tile(b, (16, 1)), np.tile(g, (16, 1)), r], axis=-1)
+
+        expected = _red_pixel_predicate(colors).astype(np.uint8) * 255
+        actual = analyzer._lookup_red_pixels(colors)
+        mismatches += int(np.count_nonzero(expected != actual))
+
+    return mismatches
+
+
+def _benchmark_red_mask(repeats: int = 300) -> None:
+    """
+    对比原实现（HSV + 多个 int16 布尔表达式）与查位图实现的单帧耗时，并校验两者的 mask 一致。
+    red_ratio 为落在候选颜色盒内的像素比例，1.0 是查位图路径的最坏情况。
+    """
+    rng = np.random.default_rng(0)
+    h = MinimapRedDotDetector.MINIMAP_BASE_H
+    w = MinimapRedDotDetector.MINIMAP_BASE_W
+    analyzer = RedDotFrameAnalyzer()
+
+    def reference(bgr: np.ndarray) -> np.ndarray:
+        mask = _red_pixel_predicate(bgr).astype(np.uint8) * 255
+        return cv2.dilate(mask, _RED_MASK_DILATE_KERNEL, iterations=1)
+
+    def measure(func, frame: np.ndarray) -> float:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            func(frame)
+        return (time.perf_counter() - start) * 1000.0 / repeats
+
+    start = time.perf_counter()
+    _get_red_mask_bits()
+    print(f"颜色位图构建: {(time.perf_counter() - start) * 1000.0:.1f} ms（进程内只构建一次）")
+
+    for red_ratio in (0.0, 0.02, 0.1, 1.0):
+        # 暗色背景 + 一定比例的偏红像素。
+        frame = rng.integers(0, 60, size=(h, w, 3), dtype=np.uint8)
+        selected = rng.random((h, w)) < red_ratio
+        n = int(np.count_nonzero(selected))
+        frame[selected] = np.stack([
+            rng.integers(0, 91, n),
+            rng.integers(0, 91, n),
+            rng.integers(65, 256, n),
+        ], axis=-1).astype(np.uint8)
+
+        if not np.array_equal(reference(frame), analyzer._build_red_mask(frame)):
+            raise AssertionError("查位图 mask 与原实现不一致")
+
+        reference_ms = measure(reference, frame)
+        bits_ms = measure(analyzer._build_red_mask, frame)
+        print(
+            f"red_ratio={red_ratio:<4} 原实现 {reference_ms:.3f} ms/帧，"
+            f"查位图 {bits_ms:.3f} ms/帧 ({reference_ms / max(bits_ms, 1e-9):.1f}x)"
+        )
+
+
+def _benchmark_cluster_components(component_count: int = 400, repeats: int = 20) -> None:
+    """
+    红色碎片很多的帧：对比两两比较的聚类与网格聚类的耗时，并校验聚类结果一致。
+    """
+    rng = np.random.default_rng(1)
+    analyzer = RedDotFrameAnalyzer()
+    w = MinimapRedDotDetector.MINIMAP_BASE_W
+    h = MinimapRedDotDetector.MINIMAP_BASE_H
+
+    components = []
+    for label_id in range(1, component_count + 1):
+        cw, ch = int(rng.integers(1, 12)), int(rng.integers(1, 12))
+        x, y = int(rng.integers(0, w - cw)), int(rng.integers(0, h - ch))
+        components.append({
+            "label_id": label_id,
+            "bbox": (x, y, cw, ch),
+            "area": cw * ch,
+            "center": (x + cw / 2.0, y + ch / 2.0),
+        })
+
+    def pairwise(comps: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        n = len(comps)
+        parent = list(range(n))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i in range(n):
+            for j in range(i + 1, n):
+                if analyzer._should_merge_components(comps[i], comps[j]):
+                    ri, rj = find(i), find(j)
+                    if ri != rj:
+                        parent[rj] = ri
+
+        groups: Dict[int, List[Dict[str, Any]]] = {}
+        for i, comp in enumerate(comps):
+            groups.setdefault(find(i), []).append(comp)
+        return list(groups.values())
+
+    if pairwise(components) != analyzer._cluster_components(components):
+        raise AssertionError("网格聚类结果与两两比较不一致")
+
+    def measure(func) -> float:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            func(components)
+        return (time.perf_counter() - start) * 1000.0 / repeats
+
+    pairwise_ms = measure(pairwise)
+    grid_ms = measure(analyzer._cluster_components)
+    print(
+        f"{component_count} 个连通块聚类：两两比较 {pairwise_ms:.2f} ms，"
+        f"网格 {grid_ms:.2f} ms ({pairwise_ms / max(grid_ms, 1e-9):.1f}x)"
+    )
+
+
+# 校验 + 基准测试：python -m src.game_readers.minimap_red_dot_detector
+if __name__ == "__main__":
+    _benchmark_red_mask()
+    _benchmark_cluster_components()
+    mismatch_count = _check_red_mask_bits()
+    print(f"全颜色空间校验: {mismatch_count} 种颜色不一致")
+    raise SystemExit(1 if mismatch_count else 0)
@@ -34,6 +34,8 @@ class Mutator_and_enemy_race_recognizer:
         
         self._running = False
         self._thread = None
+        # 两次扫描之间在此等待；游戏时间超过 60 秒或停止时被唤醒
+        self._wakeup = threading.Event()
         self._current_game_time = 0.0
         self.logger = get_logger(__name__)
 
@@ -110,6 +112,7 @@ class Mutator_and_enemy_race_recognizer:
         """启动后台识别线程。"""
         if not self._running:
             self._running = True
+            self._wakeup.clear()
             self._thread = threading.Thread(target=self._run_loop, daemon=True)
             self._thread.start()
             self.logger.info("Mutator_and_enemy_race_recognizer 后台识别线程已启动。")
@@ -120,6 +123,8 @@ class Mutator_and_enemy_race_recognizer:
         """停止后台识别线程。"""
         self.logger.info("正在停止 Mutator_and_enemy_race_recognizer...")
         self._running = False
+        self._wakeup.set()
+        state.wake_screenshot_waiters()
         if self._thread and self._thread.is_alive():
             self._thread.join(timeout=2)
         self.logger.info("Mutator_and_enemy_race_recognizer 已停止。")
@@ -142,6 +147,8 @@ class Mutator_and_enemy_race_recognizer:
     def update_game_time(self,game_time_seconds):
         self.logger.info(f"已经接收到游戏时间{game_time_seconds}")
         self._current_game_time = game_time_seconds
+        if game_time_seconds >= 60 and not self.mutator_detection_complete:
+            self._wakeup.set()
 
     def _scan_for_races(self, screenshot_gray, scale_factor):
         """在截图中扫描并更新种族识别状态。"""
@@ -238,10 +245,14 @@ class Mutator_and_enemy_race_recognizer:
 
 
     def _run_loop(self):
-        """后台线程的主循环，使用独立计时器分别调度种族和突变因子的识别任务。"""
+        """
+        后台线程的主循环，使用独立计时器分别调度种族和突变因子的识别任务。
+        没有任务到期时一直等到最近的到期时间；任务到期后等待下一张新截图（由截图线程通知），不再轮询。
+        """
         
-        last_game_screen_time_stamp = 0.0
-        while self._running:
+        last_frame_id = 0
+        # 程序关闭后 wait_for_screenshot 会立即返回，这里同时检查 app_closing，避免 shutdown 之前空转
+        while self._running and not state.app_closing:
             # 检查所有任务是否都已完成
             if self.race_detection_complete and self.mutator_detection_complete:
                 self.logger.info("所有识别任务已完成，进入等待状态。")
@@ -259,51 +270,62 @@ class Mutator_and_enemy_race_recognizer:
             current_time = time.perf_counter()
             
             # 检查哪个任务需要扫描
+            next_due_times = []
+            if not self.race_detection_complete:
+                next_due_times.append(self._last_race_scan_time + self._race_scan_interval)
+            if not self.mutator_detection_complete:
+                next_due_times.append(self._last_mutator_scan_time + self._mutator_scan_interval)
+
+            wait_time = min(next_due_times) - current_time
+            if wait_time > 0:
+                # 睡到最近一个任务到期（期间可被 update_game_time / shutdown 唤醒）
+                self._wakeup.wait(wait_time)
+                self._wakeup.clear()
+                continue
+
             is_race_scan_due = not self.race_detection_complete and \
                                 current_time - self._last_race_scan_time >= self._race_scan_interval
             is_mutator_scan_due = not self.mutator_detection_complete and \
                                     current_time - self._last_mutator_scan_time >= self._mutator_scan_interval
 
-            # 如果有任何一个任务需要扫描，才执行截图和预处理
+            # 有任务到期，才执行截图和预处理
             self.logger.info(f"检测到种族或突变因子扫描任务到期，准备识别...当前种族{is_race_scan_due}，突变因子{is_mutator_scan_due},窗口状态{state.is_in_game}")
-            if is_race_scan_due or is_mutator_scan_due:
-                if not is_game_active():
-                    time.sleep(0.5)
-                    continue
-                
-                with state.screenshot_lock:
-                    game_screen = state.latest_screenshot
-                    game_screen_time_stamp = state.screenshot_timestamp
-                    scale_factor = state.scale_factor
-                self.logger.info("截图已获取，准备进行识别处理。")
-
-                # 没新截图就不处理
-                if game_screen is None or game_screen_time_stamp == last_game_screen_time_stamp:
-                    time.sleep(0.05)
-                    continue
-
-                x1, y1, x2, y2 = config.MUTATOR_AND_ENEMY_RACE_RECOGNIZER_ROI
-                if y2 > game_screen.shape[0] or x2 > game_screen.shape[1]:
-                    time.sleep(1)
-                    continue
-
-                roi_image = game_screen[y1:y2, x1:x2]
-                last_game_screen_time_stamp = game_screen_time_stamp
-                screenshot_gray = cv2.cvtColor(roi_image, cv2.COLOR_BGR2GRAY)
-
-                # 执行到期的任务
-                if is_race_scan_due:
-                    self.logger.info(f"执行种族扫描 (间隔: {self._race_scan_interval}s)")
-                    self._scan_for_races(screenshot_gray, scale_factor)
-                    self._last_race_scan_time = current_time
-
-                if is_mutator_scan_due:
-                    self.logger.info(f"执行突变因子扫描 (间隔: {self._mutator_scan_interval}s)")
-                    self._scan_for_mutators(screenshot_gray, scale_factor)
-                    self._last_mutator_scan_time = current_time
-
-            # 主循环的短暂休眠，以防止CPU占用过高
-            time.sleep(0.1)
+            if not is_game_active():
+                self._wakeup.wait(0.5)
+                continue
+
+            # 等待一张还没处理过的截图
+            frame_id = state.wait_for_screenshot(last_frame_id, timeout=1.0, should_stop=lambda: not self._running)
+            if frame_id == last_frame_id:
+                continue
+
+            with state.screenshot_lock:
+                game_screen = state.latest_screenshot
+                scale_factor = state.scale_factor
+            self.logger.info("截图已获取，准备进行识别处理。")
+
+            if game_screen is None:
+                continue
+
+            x1, y1, x2, y2 = config.MUTATOR_AND_ENEMY_RACE_RECOGNIZER_ROI
+            if y2 > game_screen.shape[0] or x2 > game_screen.shape[1]:
+                self._wakeup.wait(1)
+                continue
+
+            roi_image = game_screen[y1:y2, x1:x2]
+            last_frame_id = frame_id
+            screenshot_gray = cv2.cvtColor(roi_image, cv2.COLOR_BGR2GRAY)
+
+            # 执行到期的任务
+            if is_race_scan_due:
+                self.logger.info(f"执行种族扫描 (间隔: {self._race_scan_interval}s)")
+                self._scan_for_races(screenshot_gray, scale_factor)
+                self._last_race_scan_time = current_time
+
+            if is_mutator_scan_due:
+                self.logger.info(f"执行突变因子扫描 (间隔: {self._mutator_scan_interval}s)")
+                self._scan_for_mutators(screenshot_gray, scale_factor)
+                self._last_mutator_scan_time = current_time
                 
     def _get_latest_screenshot(self):
         """获取最新的游戏截图和缩放比例。"""
@@ -0,0 +1,474 @@
+# src/game_readers/red_dot_benchmark.py
+"""
+小地图红点检测的回归 / 性能基准。
+
+数据来源：
+1. 标注集（可选）：--dataset 目录下的小地图截图 + labels.json，
+   格式 {"xxx.png": [[cx, cy], ...]}，坐标为小地图局部坐标（264x259 基准），空列表表示没有红点。
+2. 合成帧：把程序绘制的红点 ping（中央菱形 + 外圈）以及暴风雪暗红斑块、红色单位、红色建筑、
+   围成一圈的零散红色碎片等干扰物叠加到小地图背景上。背景取自 --backgrounds 目录（真实小地图截图，最好不含红点）；
+   未提供时使用暗色噪声背景。
+
+3. 金标准帧：resources/red_dot_golden 下固定的小地图帧 + labels.json（由 --export 从合成帧导出，
+   之后不再随生成器变化），expected.json 记录每个变体在金标准帧和固定种子合成帧上的 TP / FP / FN。
+
+输出：
+- 每种启发式消融（关闭 _has_hot_ping_red / _is_fragmented_false_candidate / _score_diamond_candidate）
+  下的单帧候选 precision / recall，与 baseline 对比即可看出每条启发式挡掉了多少误检、损失了多少召回。
+- 单帧分析耗时与 FPS。
+
+用法：
+    python -m src.game_readers.red_dot_benchmark --frames 300
+    python -m src.game_readers.red_dot_benchmark --dataset D:/red_dot_frames --backgrounds D:/minimaps
+    python -m src.game_readers.red_dot_benchmark --check              # 与 expected.json 对比，偏差超出容差时退出码为 1
+    python -m src.game_readers.red_dot_benchmark --update-expected    # 有意修改检测器之后重新记录期望值
+    python -m src.game_readers.red_dot_benchmark --frames 16 --seed 7 --export D:/golden
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from src.game_readers.minimap_red_dot_detector import (
+    MinimapRedDotDetector,
+    Point,
+    RedDotFrameAnalyzer,
+    _FrameCandidate,
+)
+from src.utils.fileutil import get_project_root
+
+
+MINIMAP_W = MinimapRedDotDetector.MINIMAP_BASE_W
+MINIMAP_H = MinimapRedDotDetector.MINIMAP_BASE_H
+
+# 候选中心与标注中心的距离不超过该值才算命中。
+MATCH_RADIUS_PX = 6.0
+
+# --check 使用的金标准帧目录、合成帧种子 / 数量，以及 TP / FP / FN 允许的相对偏差（至少 1）。
+GOLDEN_DIR = os.path.join(get_project_root(), "resources", "red_dot_golden")
+CHECK_SEED = 0
+CHECK_FRAMES = 200
+CHECK_TOLERANCE = 0.03
+
+
+@dataclass
+class LabelledFrame:
+    name: str
+    image: np.ndarray
+    pings: List[Point]
+
+
+@dataclass
+class Score:
+    true_positive: int = 0
+    false_positive: int = 0
+    false_negative: int = 0
+    elapsed_s: float = 0.0
+    frames: int = 0
+
+    @property
+    def precision(self) -> float:
+        return self.true_positive / max(1, self.true_positive + self.false_positive)
+
+    @property
+    def recall(self) -> float:
+        return self.true_positive / max(1, self.true_positive + self.false_negative)
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+
+@dataclass
+class BenchmarkReport:
+    scores: Dict[str, Score] = field(default_factory=dict)
+
+    def format(self) -> str:
+        lines = [
+            f"{'variant':<22}{'precision':>10}{'recall':>10}{'TP':>6}{'FP':>6}{'FN':>6}{'ms/帧':>9}{'FPS':>9}"
+        ]
+        for name, s in self.scores.items():
+            ms = s.elapsed_s * 1000.0 / max(1, s.frames)
+            lines.append(
+                f"{name:<22}{s.precision:>10.3f}{s.recall:>10.3f}"
+                f"{s.true_positive:>6}{s.false_positive:>6}{s.false_negative:>6}{ms:>9.3f}{s.fps:>9.1f}"
+            )
+        return "\n".join(lines)
+
+
+# --- 启发式消融 ---
+
+class _NoHotPingRedAnalyzer(RedDotFrameAnalyzer):
+    def _has_hot_ping_red(self, minimap_bgr, bbox, min_hot_pixels=3, min_hot_ratio=0.008) -> bool:
+        return True
+
+
+class _NoFragmentFilterAnalyzer(RedDotFrameAnalyzer):
+    @staticmethod
+    def _is_fragmented_false_candidate(component_count, red_count, largest_area, fill_ratio, has_outer_ring) -> bool:
+        return False
+
+
+class _NoDiamondScoreAnalyzer(RedDotFrameAnalyzer):
+    def _score_diamond_candidate(self, crop_mask: np.ndarray) -> Tuple[float, bool]:
+        return 1.0, self._has_outer_ring(crop_mask > 0)
+
+
+ANALYZER_VARIANTS = {
+    "baseline": RedDotFrameAnalyzer,
+    "no_hot_ping_red": _NoHotPingRedAnalyzer,
+    "no_fragment_filter": _NoFragmentFilterAnalyzer,
+    "no_diamond_score": _NoDiamondScoreAnalyzer,
+}
+
+
+# --- 数据 ---
+
+def _read_image(path: str) -> Optional[np.ndarray]:
+    # 兼容中文路径
+    data = np.fromfile(path, dtype=np.uint8)
+    if data.size == 0:
+        return None
+    image = cv2.imdecode(data, cv2.IMREAD_COLOR)
+    if image is None:
+        return None
+    if image.shape[1] != MINIMAP_W or image.shape[0] != MINIMAP_H:
+        image = cv2.resize(image, (MINIMAP_W, MINIMAP_H), interpolation=cv2.INTER_AREA)
+    return image
+
+
+def load_labelled_frames(dataset_dir: str) -> List[LabelledFrame]:
+    with open(os.path.join(dataset_dir, "labels.json"), encoding="utf-8") as f:
+        labels = json.load(f)
+
+    frames = []
+    for name, pings in labels.items():
+        image = _read_image(os.path.join(dataset_dir, name))
+        if image is None:
+            print(f"无法读取图片，跳过：{name}")
+            continue
+        frames.append(LabelledFrame(name, image, [(float(x), float(y)) for x, y in pings]))
+    return frames
+
+
+def load_backgrounds(background_dir: str) -> List[np.ndarray]:
+    backgrounds = []
+    for filename in sorted(os.listdir(background_dir)):
+        if filename.lower().endswith((".png", ".jpg", ".bmp")):
+            image = _read_image(os.path.join(background_dir, filename))
+            if image is not None:
+                backgrounds.append(image)
+    return backgrounds
+
+
+class SyntheticPingGenerator:
+    """
+    合成带标注的小地图帧。
+    ping 由中央实心菱形和外圈菱形边框组成（外圈按动画阶段随机缩放，部分帧没有外圈），
+    外圈线宽 1 像素、与核心至少相隔 5.5 像素：更粗或更近的外圈膨胀后会超过 max_component_area
+    或与核心粘成一块，检测器的阈值不是按这种外形定的。颜色、透明度略有抖动；干扰物为暴风雪暗红半透明斑块、零散红色单位点、轴向红色建筑方块，
+    以及沿菱形轮廓分布、没有实心核心和完整外圈的红色碎片（_is_fragmented_false_candidate 针对的情况）。
+    """
+
+    def __init__(self, backgrounds: Sequence[np.ndarray] = (), seed: int = 0) -> None:
+        self.backgrounds = list(backgrounds)
+        self.rng = np.random.default_rng(seed)
+
+    def frame(self, index: int) -> LabelledFrame:
+        rng = self.rng
+        image = self._background()
+
+        for _ in range(int(rng.integers(0, 3))):
+            self._draw_blizzard(image)
+        for _ in range(int(rng.integers(0, 7))):
+            self._draw_red_unit(image)
+        for _ in range(int(rng.integers(0, 3))):
+            self._draw_red_structure(image)
+        for _ in range(int(rng.integers(0, 2))):
+            self._draw_red_fragments(image)
+
+        pings: List[Point] = []
+        for _ in range(int(rng.integers(0, 4))):
+            cx = float(rng.integers(16, MINIMAP_W - 16))
+            cy = float(rng.integers(16, MINIMAP_H - 16))
+            if any(math.hypot(cx - px, cy - py) < 32 for px, py in pings):
+                continue
+            self._draw_ping(image, cx, cy)
+            pings.append((cx, cy))
+
+        return LabelledFrame(f"synthetic_{index:05d}", image, pings)
+
+    def _background(self) -> np.ndarray:
+        if self.backgrounds:
+            return self.backgrounds[int(self.rng.integers(0, len(self.backgrounds)))].copy()
+        # 暗色地形噪声 + 少量偏亮的平滑斑块
+        noise = self.rng.integers(0, 45, size=(MINIMAP_H, MINIMAP_W, 3), dtype=np.uint8)
+        return cv2.GaussianBlur(noise, (5, 5), 0)
+
+    def _blend(self, image: np.ndarray, overlay: np.ndarray, mask: np.ndarray, alpha: float) -> None:
+        selected = mask > 0
+        image[selected] = (
+            image[selected].astype(np.float32) * (1.0 - alpha) +
+            overlay[selected].astype(np.float32) * alpha
+        ).astype(np.uint8)
+
+    def _draw_ping(self, image: np.ndarray, cx: float, cy: float) -> None:
+        rng = self.rng
+        color = (int(rng.integers(0, 30)), int(rng.integers(0, 30)), int(rng.integers(215, 256)))
+        overlay = np.zeros_like(image)
+        mask = np.zeros(image.shape[:2], dtype=np.uint8)
+
+        def diamond(half: float) -> np.ndarray:
+            return np.array([
+                [cx, cy - half], [cx + half, cy], [cx, cy + half], [cx - half, cy],
+            ], dtype=np.int32)
+
+        core_half = float(rng.uniform(4.5, 6.5))
+        cv2.fillPoly(overlay, [diamond(core_half)], color)
+        cv2.fillPoly(mask, [diamond(core_half)], 255)
+
+        if rng.random() < 0.8:
+            ring_half = float(rng.uniform(core_half + 5.5, 13.0))
+            cv2.polylines(overlay, [diamond(ring_half)], True, color, 1)
+            cv2.polylines(mask, [diamond(ring_half)], True, 255, 1)
+
+        self._blend(image, overlay, mask, float(rng.uniform(0.85, 1.0)))
+
+    def _draw_blizzard(self, image: np.ndarray) -> None:
+        rng = self.rng
+        overlay = np.zeros_like(image)
+        mask = np.zeros(image.shape[:2], dtype=np.uint8)
+        center = (int(rng.integers(15, MINIMAP_W - 15)), int(rng.integers(15, MINIMAP_H - 15)))
+        radius = int(rng.integers(7, 15))
+        color = (int(rng.integers(20, 50)), int(rng.integers(20, 50)), int(rng.integers(120, 180)))
+        cv2.circle(overlay, center, radius, color, -1)
+        cv2.circle(mask, center, radius, 255, -1)
+        self._blend(image, overlay, mask, float(rng.uniform(0.4, 0.7)))
+
+    def _draw_red_unit(self, image: np.ndarray) -> None:
+        rng = self.rng
+        x, y = int(rng.integers(0, MINIMAP_W - 4)), int(rng.integers(0, MINIMAP_H - 4))
+        size = int(rng.integers(2, 4))
+        image[y:y + size, x:x + size] = (
+            int(rng.integers(0, 40)), int(rng.integers(0, 40)), int(rng.integers(170, 240)),
+        )
+
+    def _draw_red_structure(self, image: np.ndarray) -> None:
+        rng = self.rng
+        w, h = int(rng.integers(6, 12)), int(rng.integers(6, 12))
+        x, y = int(rng.integers(0, MINIMAP_W - w)), int(rng.integers(0, MINIMAP_H - h))
+        image[y:y + h, x:x + w] = (
+            int(rng.integers(0, 40)), int(rng.integers(0, 40)), int(rng.integers(180, 250)),
+        )
+
+    def _draw_red_fragments(self, image: np.ndarray) -> None:
+        # 5~8 个 2~3 像素的高亮红点大致围成菱形，中心最多一个小点：
+        # 形状和颜色都像 ping，只有碎片数量多、填充率低能把它和真正的红点区分开。
+        rng = self.rng
+        color = (int(rng.integers(0, 30)), int(rng.integers(0, 30)), int(rng.integers(215, 256)))
+        half = float(rng.uniform(8.0, 13.0))
+        cx = float(rng.integers(16, MINIMAP_W - 16))
+        cy = float(rng.integers(16, MINIMAP_H - 16))
+        vertices = [(cx, cy - half), (cx + half, cy), (cx, cy + half), (cx - half, cy)]
+
+        count = int(rng.integers(5, 9))
+        start = float(rng.uniform(0.0, 1.0))
+        for k in range(count):
+            t = ((start + k / count + rng.uniform(-0.03, 0.03)) % 1.0) * 4.0
+            edge = int(t)
+            (x0, y0), (x1, y1) = vertices[edge], vertices[(edge + 1) % 4]
+            x = x0 + (x1 - x0) * (t - edge)
+            y = y0 + (y1 - y0) * (t - edge)
+            size = int(rng.integers(2, 4))
+            image[int(y - size / 2):int(y - size / 2) + size, int(x - size / 2):int(x - size / 2) + size] = color
+
+        if rng.random() < 0.5:
+            size = int(rng.integers(2, 4))
+            image[int(cy - size / 2):int(cy - size / 2) + size, int(cx - size / 2):int(cx - size / 2) + size] = color
+
+
+# --- 评估 ---
+
+def match_candidates(candidates: Sequence[_FrameCandidate], pings: Sequence[Point]) -> Tuple[int, int, int]:
+    """按中心距离贪心匹配，返回 (TP, FP, FN)。"""
+    unmatched = list(pings)
+    true_positive = 0
+
+    for candidate in sorted(candidates, key=lambda c: c.score, reverse=True):
+        cx, cy = candidate.center
+        best_i, best_dist = -1, MATCH_RADIUS_PX
+        for i, (px, py) in enumerate(unmatched):
+            dist = math.hypot(cx - px, cy - py)
+            if dist <= best_dist:
+                best_i, best_dist = i, dist
+        if best_i >= 0:
+            unmatched.pop(best_i)
+            true_positive += 1
+
+    return true_positive, len(candidates) - true_positive, len(unmatched)
+
+
+def evaluate(frames: Sequence[LabelledFrame], ring_only: bool = False) -> BenchmarkReport:
+    """
+    ring_only：只统计带外圈的候选（与 monitor 的确认规则一致，core-only 候选不会被确认）。
+    """
+    report = BenchmarkReport()
+
+    for name, analyzer_cls in ANALYZER_VARIANTS.items():
+        analyzer = analyzer_cls()
+        score = Score()
+
+        # 预热：构建颜色位图等一次性开销不计入耗时。
+        if frames:
+            analyzer.analyze(frames[0].image)
+
+        for frame in frames:
+            start = time.perf_counter()
+            candidates = analyzer.analyze(frame.image)
+            score.elapsed_s += time.perf_counter() - start
+            score.frames += 1
+
+            if ring_only:
+                candidates = [c for c in candidates if c.has_outer_ring]
+
+            tp, fp, fn = match_candidates(candidates, frame.pings)
+            score.true_positive += tp
+            score.false_positive += fp
+            score.false_negative += fn
+
+        report.scores[name] = score
+
+    return report
+
+
+def export_frames(frames: Sequence[LabelledFrame], out_dir: str) -> None:
+    """按 load_labelled_frames 的格式写出 PNG + labels.json。"""
+    os.makedirs(out_dir, exist_ok=True)
+    labels = {}
+    for frame in frames:
+        name = f"{frame.name}.png"
+        ok, data = cv2.imencode(".png", frame.image, [cv2.IMWRITE_PNG_COMPRESSION, 9])
+        if not ok:
+            raise RuntimeError(f"PNG 编码失败：{name}")
+        data.tofile(os.path.join(out_dir, name))
+        labels[name] = [[round(x, 1), round(y, 1)] for x, y in frame.pings]
+    with open(os.path.join(out_dir, "labels.json"), "w", encoding="utf-8") as f:
+        json.dump(labels, f, ensure_ascii=False, indent=1)
+
+
+def check_suites(golden_dir: str = GOLDEN_DIR) -> Dict[str, List[LabelledFrame]]:
+    """--check 评估的两组帧：金标准帧和固定种子的合成帧。"""
+    generator = SyntheticPingGenerator(seed=CHECK_SEED)
+    return {
+        "golden": load_labelled_frames(golden_dir),
+        "synthetic": [generator.frame(i) for i in range(CHECK_FRAMES)],
+    }
+
+
+def report_counts(report: BenchmarkReport) -> Dict[str, Dict[str, int]]:
+    return {
+        name: {"tp": s.true_positive, "fp": s.false_positive, "fn": s.false_negative}
+        for name, s in report.scores.items()
+    }
+
+
+def compare_counts(
+    actual: Dict[str, Dict[str, Dict[str, int]]],
+    expected: Dict[str, Dict[str, Dict[str, int]]],
+    tolerance: float = CHECK_TOLERANCE,
+) -> List[str]:
+    """返回所有超出容差的偏差描述，空列表表示一致。"""
+    drifts = []
+    for suite, variants in expected.items():
+        for variant, counts in variants.items():
+            got = actual.get(suite, {}).get(variant)
+            if got is None:
+                drifts.append(f"{suite}/{variant}: 没有结果")
+                continue
+            for key, want in counts.items():
+                allowed = max(1, int(math.ceil(want * tolerance)))
+                if abs(got[key] - want) > allowed:
+                    drifts.append(f"{suite}/{variant} {key}: 期望 {want}±{allowed}，实际 {got[key]}")
+    return drifts
+
+
+def _run_check(update: bool) -> int:
+    expected_path = os.path.join(GOLDEN_DIR, "expected.json")
+    actual = {}
+    for suite_name, frames in check_suites().items():
+        report = evaluate(frames)
+        ping_count = sum(len(f.pings) for f in frames)
+        print(f"\n== {suite_name}: {len(frames)} 帧，{ping_count} 个红点 ==")
+        print(report.format())
+        actual[suite_name] = report_counts(report)
+
+    if update:
+        with open(expected_path, "w", encoding="utf-8") as f:
+            json.dump(actual, f, ensure_ascii=False, indent=1)
+        print(f"\n已写入 {expected_path}")
+        return 0
+
+    with open(expected_path, encoding="utf-8") as f:
+        expected = json.load(f)
+    drifts = compare_counts(actual, expected)
+    if drifts:
+        print("\n与 expected.json 不一致：")
+        for line in drifts:
+            print(f"  {line}")
+        return 1
+    print("\n与 expected.json 一致")
+    return 0
+
+
+def _main() -> int:
+    parser = argparse.ArgumentParser(description="小地图红点检测 precision / recall / FPS 基准")
+    parser.add_argument("--dataset", default=None, help="标注集目录（含 labels.json）")
+    parser.add_argument("--backgrounds", default=None, help="合成帧使用的小地图背景目录")
+    parser.add_argument("--frames", type=int, default=300, help="合成帧数量，0 表示只跑标注集")
+    parser.add_argument("--seed", type=int, default=0, help="合成帧随机种子")
+    parser.add_argument("--ring-only", action="store_true", help="只统计带外圈的候选")
+    parser.add_argument("--check", action="store_true", help="评估金标准帧和固定种子合成帧，与 expected.json 对比")
+    parser.add_argument("--update-expected", action="store_true", help="用当前结果重写 expected.json")
+    parser.add_argument("--export", default=None, help="把合成帧导出到该目录（PNG + labels.json）后退出")
+    args = parser.parse_args()
+
+    if args.check or args.update_expected:
+        return _run_check(update=args.update_expected)
+
+    if args.export:
+        generator = SyntheticPingGenerator(seed=args.seed)
+        export_frames([generator.frame(i) for i in range(args.frames)], args.export)
+        print(f"已导出 {args.frames} 帧到 {args.export}")
+        return 0
+
+    suites: Dict[str, List[LabelledFrame]] = {}
+
+    if args.dataset:
+        suites["dataset"] = load_labelled_frames(args.dataset)
+
+    if args.frames > 0:
+        backgrounds = load_backgrounds(args.backgrounds) if args.backgrounds else []
+        generator = SyntheticPingGenerator(backgrounds, seed=args.seed)
+        suites["synthetic"] = [generator.frame(i) for i in range(args.frames)]
+
+    if not suites:
+        print("没有可评估的帧")
+        return 2
+
+    for suite_name, frames in suites.items():
+        ping_count = sum(len(f.pings) for f in frames)
+        print(f"\n== {suite_name}: {len(frames)} 帧，{ping_count} 个红点 ==")
+        print(evaluate(frames, ring_only=args.ring_only).format())
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
@@ -42,6 +42,9 @@ class GlobalState:
         self.screenshot_timestamp = 0
         self.scale_factor = 1.0        # 基于1920宽度的缩放比例
         self.screenshot_lock = threading.Lock() # 用于保护截图数据的读写安全
+        # 新截图到达的条件变量（与 screenshot_lock 共用同一把锁），每张新截图 frame_id 加 1
+        self.screenshot_condition = threading.Condition(self.screenshot_lock)
+        self.screenshot_frame_id = 0
         
         # 消息播报状态
         self.message_presenter_triggered = False
@@ -50,6 +53,33 @@ class GlobalState:
         self.player_names = []
         self.app_closing = False
 
+    def publish_screenshot(self, screenshot, scale_factor):
+        """写入新截图并唤醒所有等待新帧的识别线程"""
+        with self.screenshot_condition:
+            self.latest_screenshot = screenshot
+            self.scale_factor = scale_factor
+            self.screenshot_timestamp = time.perf_counter()
+            self.screenshot_frame_id += 1
+            self.screenshot_condition.notify_all()
+
+    def wait_for_screenshot(self, last_frame_id, timeout, should_stop=None):
+        """
+        阻塞直到出现 frame_id 不等于 last_frame_id 的截图，或超时 / 程序关闭 / should_stop() 为真。
+        返回当前的 frame_id（没有新截图时与 last_frame_id 相同）。
+        """
+        with self.screenshot_condition:
+            self.screenshot_condition.wait_for(
+                lambda: (self.screenshot_frame_id != last_frame_id or self.app_closing
+                         or (should_stop is not None and should_stop())),
+                timeout=timeout,
+            )
+            return self.screenshot_frame_id
+
+    def wake_screenshot_waiters(self):
+        """让等待新帧的线程重新检查退出条件（程序关闭或某个识别线程停止时调用）"""
+        with self.screenshot_condition:
+            self.screenshot_condition.notify_all()
+
 
 # 创建一个唯一的全局状态实例
 state = GlobalState()
@@ -230,11 +260,8 @@ def _capture_game_screen(sct):
         # 4. 计算缩放比例（基于宽度）
         # current_scale = float(w) / BASE_RESOLUTION_WIDTH
         
-        # 5. 更新全局状态 (加锁)
-        with state.screenshot_lock:
-            state.latest_screenshot = game_screen_bgr
-            state.scale_factor = current_scale
-            state.screenshot_timestamp = time.perf_counter()
+        # 5. 更新全局状态 (加锁)，并通知等待新帧的识别线程
+        state.publish_screenshot(game_screen_bgr, current_scale)
         logger.info("截图成功更新全局状态")
     except Exception as e:
         logger.error(f"截图失败: {e}")
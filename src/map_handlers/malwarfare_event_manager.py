@@ -1,14 +1,16 @@
 import traceback
-from PyQt5.QtGui import QBrush, QColor
-from PyQt5.QtCore import Qt
-import time, sys, os
+import time
+import numpy as np
 from src import config
+from src.db.timeline_cache import NO_COUNT
+from src.event_managers_and_notifiers.alert_rules import build_malwarfare_alert_message
+from src.ui.event_table_model import ROW_NEXT, ROW_NORMAL, ROW_PASSED
 
 class MapwarfareEventManager:
     def __init__(self, table_area, toast_manager, logger):
         """
         初始化净网地图事件管理器
-        :param table_area: QTableWidget 实例
+        :param table_area: QTableView 实例，模型为 EventTableModel
         :param toast_manager: ToastManager 实例
         :param logger: 日志对象
         """
@@ -18,15 +20,6 @@ class MapwarfareEventManager:
         self.last_count = -1
         self.last_seconds = -1
 
-    def _parse_time_to_seconds(self, time_str):
-        """将 MM:SS 或 HH:MM:SS 格式的时间字符串转换为秒"""
-        parts = time_str.split(':')
-        if len(parts) == 2:
-            return int(parts[0]) * 60 + int(parts[1])
-        elif len(parts) == 3:
-            return int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
-        raise ValueError("Invalid time format")
-
     def update_events(self, current_count, current_countdown_seconds, is_in_game):
         """
         根据当前阶段(count)和倒计时更新表格颜色和Toast提示
@@ -44,97 +37,61 @@ class MapwarfareEventManager:
         start_time = time.time()
 
         try:
+            model = self.table_area.model()
+            timeline = model.timeline
+            if timeline is None or not len(timeline):
+                return
+            count_values = timeline.count_values
+            time_values = timeline.time_values
+            valid = count_values != NO_COUNT
+            in_current_count = valid & (count_values == current_count)
+
+            # --- 分析事件，找出当前count下下一个要发生的事件 ---
             next_event_row = -1
-            min_future_diff = float('inf')
             last_passed_row_in_count = -1
-
-            # --- 第一次遍历：分析事件，找出当前count下下一个要发生的事件 ---
-            for row in range(self.table_area.rowCount()):
-                count_item = self.table_area.item(row, 0)
-                time_item = self.table_area.item(row, 1) # 时间现在是第2列
-
-                if not (count_item and count_item.text() and time_item and time_item.text()):
-                    continue
-
-                try:
-                    row_count = int(count_item.text())
-                    
-                    # 只处理与当前count匹配的行
-                    if row_count == current_count:
-                        row_seconds = self._parse_time_to_seconds(time_item.text())
-                        time_diff = row_seconds - current_countdown_seconds
-
-                        if time_diff >= 0: # 事件在未来或刚刚发生
-                            if time_diff < min_future_diff:
-                                min_future_diff = time_diff
-                                next_event_row = row
-                        else: # 事件已在当前count中过去
-                           last_passed_row_in_count = row
-
-                except (ValueError, IndexError):
-                    continue
-            
-            # --- 第二次遍历：更新UI（颜色、提示、滚动） ---
-            for row in range(self.table_area.rowCount()):
-                count_item = self.table_area.item(row, 0)
-                time_item = self.table_area.item(row, 1)
-                event_item = self.table_area.item(row, 2)
-                army_item = self.table_area.item(row, 3)
-
-                if not (count_item and count_item.text() and time_item and time_item.text()):
-                    continue
-                
-                # 为所有单元格设置默认颜色（避免状态残留）
-                for col in range(self.table_area.columnCount()):
-                    item = self.table_area.item(row, col)
-                    if item:
-                        item.setForeground(QBrush(QColor(255, 255, 255))) # 假设默认是白色
-                        item.setBackground(QBrush(QColor(0, 0, 0, 0)))   # 透明背景
-
-                try:
-                    row_count = int(count_item.text())
-                    row_seconds = self._parse_time_to_seconds(time_item.text())
-                    
-                    # 确定行状态并上色
-                    if row_count < current_count: # 已完成的阶段
-                        for col in range(self.table_area.columnCount()):
-                            item = self.table_area.item(row, col)
-                            if item:
-                                item.setForeground(QBrush(QColor(128, 128, 128, 255))) # 灰色
-                    elif row_count == current_count: # 当前阶段
-                        if row_seconds < current_countdown_seconds: # 已完成的事件
-                            for col in range(self.table_area.columnCount()):
-                                item = self.table_area.item(row, col)
-                                if item:
-                                    item.setForeground(QBrush(QColor(128, 128, 128, 255))) # 灰色
-                        elif row == next_event_row: # 即将发生的事件
-                             for col in range(self.table_area.columnCount()):
-                                item = self.table_area.item(row, col)
-                                if item:
-                                    item.setForeground(QBrush(QColor(*config.TABLE_NEXT_FONT_COLOR)))
-                                    item.setBackground(QBrush(QColor(*config.TABLE_NEXT_FONT_BG_COLOR)))
-                    # 对于 row_count > current_count 的行，保持默认颜色即可
-
-                    # 处理Toast提示
-                    event_id = f"special_event_{row}"
-                    if row_count == current_count:
-                        time_diff = current_countdown_seconds - row_seconds
-                        # 在指定时间窗口内显示或更新提示
-                        if 0 < time_diff <= config.MAP_ALERT_SECONDS:
-                            toast_message = f'余{int(time_diff):0>2}秒  ' + f"  {time_item.text()}\t{event_item.text()}" + (
-                                f"\t{army_item.text()}" if army_item and army_item.text() else "")
-                            self.toast_manager.show_map_countdown_alert(event_id, time_diff, toast_message, is_in_game)
-                        else:
-                            # 确保过时或远未到来的提示被移除
-                            if self.toast_manager.has_alert(event_id):
-                                self.toast_manager.remove_alert(event_id)
-                    else:
-                        # 确保其他阶段的提示被移除
-                        if self.toast_manager.has_alert(event_id):
-                            self.toast_manager.remove_alert(event_id)
-
-                except (ValueError, IndexError):
-                    continue
+            time_diffs = time_values - current_countdown_seconds
+            future_rows = np.flatnonzero(in_current_count & (time_diffs >= 0))  # 事件在未来或刚刚发生
+            if future_rows.size:
+                next_event_row = int(future_rows[np.argmin(time_diffs[future_rows])])
+            passed_rows = np.flatnonzero(in_current_count & (time_diffs < 0))  # 事件已在当前count中过去
+            if passed_rows.size:
+                last_passed_row_in_count = int(passed_rows[-1])
+
+            # --- 确定行状态并上色；对于 row_count > current_count 的行，保持默认颜色即可 ---
+            row_states = np.full(len(timeline), ROW_NORMAL, dtype=np.int8)
+            row_states[valid & (count_values < current_count)] = ROW_PASSED  # 已完成的阶段
+            row_states[in_current_count & (time_values < current_countdown_seconds)] = ROW_PASSED  # 当前阶段已完成的事件
+            if next_event_row != -1:
+                row_states[next_event_row] = ROW_NEXT  # 即将发生的事件
+            model.set_row_states(row_states)
+
+            # --- 处理Toast提示 ---
+            for row in np.flatnonzero(valid).tolist():
+                event_id = f"special_event_{row}"
+                if in_current_count[row]:
+                    time_diff = current_countdown_seconds - int(time_values[row])
+                    # 在指定时间窗口内显示或更新提示
+                    if 0 < time_diff <= config.MAP_ALERT_SECONDS:
+                        toast_message = build_malwarfare_alert_message(
+                            time_diff, timeline.time_labels[row], timeline.events[row], timeline.armies[row])
+                        self.toast_manager.show_map_countdown_alert(event_id, time_diff, toast_message, is_in_game)
+                        continue
+                # 确保过时、远未到来或其他阶段的提示被移除
+                if self.toast_manager.has_alert(event_id):
+                    self.toast_manager.remove_alert(event_id)
+
+            # 预渲染当前阶段即将进入提醒窗口的事件
+            if is_in_game:
+                alert_seconds = config.MAP_ALERT_SECONDS
+                lookahead_seconds = getattr(config, 'MAP_ALERT_PRERENDER_SECONDS', 60)
+                remaining = current_countdown_seconds - time_values
+                pending = {}
+                for row in np.flatnonzero(
+                    in_current_count & (remaining > alert_seconds) & (remaining <= lookahead_seconds)
+                ).tolist():
+                    pending[f"special_event_{row}"] = (alert_seconds, build_malwarfare_alert_message(
+                        alert_seconds, timeline.time_labels[row], timeline.events[row], timeline.armies[row]))
+                self.toast_manager.prerender_map_alerts(pending)
 
             # --- 滚动位置逻辑 ---
             scroll_target_row = next_event_row if next_event_row != -1 else last_passed_row_in_count
@@ -227,6 +227,7 @@ class MalwarfareMapHandler:
         """停止后台线程并清理资源。"""
         if self._running:
             self._running = False
+            state.wake_screenshot_waiters()
             if self._running_thread and self._running_thread.is_alive():
                 self._running_thread.join(timeout=1)
             #清理线程池
@@ -237,18 +238,20 @@ class MalwarfareMapHandler:
             self.logger.info("MalwarfareMapHandler 已停止。")
 
     def _run_loop(self):
-        """后台线程的主循环"""
-        last_game_screen_time_stamp = 0.0
-        while self._running:
-            start_time = time.perf_counter()
-            
+        """后台线程的主循环：每张新截图处理一次，没有新截图时阻塞等待截图线程通知"""
+        last_frame_id = 0
+        # 程序关闭后 wait_for_screenshot 会立即返回，这里同时检查 app_closing，避免 shutdown 之前空转
+        while self._running and not state.app_closing:
+            frame_id = state.wait_for_screenshot(last_frame_id, timeout=1.0, should_stop=lambda: not self._running)
+            if frame_id == last_frame_id:
+                continue
+
             with state.screenshot_lock:
                 game_screen = state.latest_screenshot
                 #self.logger.info(f"当前处理图片尺寸: {game_screen.shape if game_screen is not None else 'None'}")
-                game_screen_time_stamp = state.screenshot_timestamp
             
-            if game_screen is None or game_screen_time_stamp == last_game_screen_time_stamp:
-                time.sleep(0.05)
+            if game_screen is None:
+                last_frame_id = frame_id
                 continue
             
             if self._current_ui_offset_state == -1:
@@ -257,7 +260,7 @@ class MalwarfareMapHandler:
                     time.sleep(0.5)
                     continue
             
-            last_game_screen_time_stamp = game_screen_time_stamp
+            last_frame_id = frame_id
             current_time = time.perf_counter()
             
             # 依据时间间隔决定执行哪些OCR任务
@@ -270,11 +273,6 @@ class MalwarfareMapHandler:
 
             self._update_latest_result()
 
-            elapsed_time = time.perf_counter() - start_time
-            sleep_time = max(0, 0.1 - elapsed_time)
-            if sleep_time > 0:
-                time.sleep(sleep_time)
-
     def _post_process_n_value(self, n_value):
         """对识别出的n值进行后处理，修正已知的特定识别错误。"""
         if n_value is None:
@@ -1,9 +1,13 @@
 # map_event_manager.py
 import traceback
-from PyQt5.QtGui import QBrush, QColor
-from PyQt5.QtCore import Qt
-import sys, os
+import numpy as np
 from src import config , game_state_service
+from src.event_managers_and_notifiers.alert_rules import (
+    build_map_alert_message,
+    map_alert_rows,
+    map_prerender_rows,
+)
+from src.ui.event_table_model import ROW_NEXT, ROW_NORMAL, ROW_PASSED
 import time  # 添加 time 模块用于调试
 
 
@@ -11,7 +15,7 @@ class MapEventManager:
     def __init__(self, table_area, toast_manager, logger):
         """
         初始化地图事件管理器
-        :param table_area: QTableWidget 实例
+        :param table_area: QTableView 实例，模型为 EventTableModel
         :param toast_manager: ToastManager 实例
         :param logger: 日志对象
         """
@@ -34,117 +38,65 @@ class MapEventManager:
         self.logger.debug(f'正在执行地图事件检查,当前时间{current_seconds}')
         start_time = time.time()
         try:
-            closest_row = 0
-            min_diff = float('inf')
-            next_event_row = -1
-            next_event_seconds = float('inf')
-
-            # 第一次遍历：找出下一个即将触发的事件
-            for row in range(self.table_area.rowCount()):
-                time_item = self.table_area.item(row, 0)
-                if time_item and time_item.text():
-                    try:
-                        time_parts = time_item.text().split(':')
-                        row_seconds = 0
-                        if len(time_parts) == 2:  # MM:SS
-                            row_seconds = int(time_parts[0]) * 60 + int(time_parts[1])
-                        elif len(time_parts) == 3:  # HH:MM:SS
-                            row_seconds = int(time_parts[0]) * 3600 + int(time_parts[1]) * 60 + int(time_parts[2])
+            model = self.table_area.model()
+            timeline = model.timeline
+            if timeline is None or not len(timeline):
+                return
+            time_values = timeline.time_values
 
-                        if row_seconds > current_seconds and row_seconds < next_event_seconds:
-                            next_event_seconds = row_seconds
-                            next_event_row = row
+            # 找出下一个即将触发的事件（时间最早的未来事件）和最接近当前时间的行
+            next_event_row = -1
+            future_rows = np.flatnonzero(time_values > current_seconds)
+            if future_rows.size:
+                next_event_row = int(future_rows[np.argmin(time_values[future_rows])])
+            closest_row = int(np.argmin(np.abs(time_values - current_seconds)))
+
+            # 设置颜色：提交行状态，由表格模型负责着色
+            row_states = np.full(len(timeline), ROW_NORMAL, dtype=np.int8)
+            row_states[time_values < current_seconds] = ROW_PASSED
+            if next_event_row != -1:
+                row_states[next_event_row] = ROW_NEXT
+            model.set_row_states(row_states)
 
-                        diff = abs(current_seconds - row_seconds)
-                        if diff < min_diff:
-                            min_diff = diff
-                            closest_row = row
-                    except ValueError:
-                        continue
-            
             is_heroes_from_the_storm_active = False
             if game_state_service.state.active_mutators and 'HeroesFromtheStorm' in game_state_service.state.active_mutators:
                 is_heroes_from_the_storm_active = True
-            
-            # 第二次遍历：设置颜色和触发提示
-            for row in range(self.table_area.rowCount()):
-                time_item = self.table_area.item(row, 0)
-                event_item = self.table_area.item(row, 1)
-                army_item = self.table_area.item(row, 2)
-                if time_item and time_item.text():
-                    try:
-                        time_parts = time_item.text().split(':')
-                        row_seconds = 0
-                        if len(time_parts) == 2:
-                            row_seconds = int(time_parts[0]) * 60 + int(time_parts[1])
-                        elif len(time_parts) == 3:
-                            row_seconds = int(time_parts[0]) * 3600 + int(time_parts[1]) * 60 + int(time_parts[2])
-
-                        if row_seconds < current_seconds:
-                            time_item.setForeground(QBrush(QColor(128, 128, 128, 255)))
-                            time_item.setBackground(QBrush(QColor(0, 0, 0, 0)))
-                            if event_item:
-                                event_item.setForeground(QBrush(QColor(128, 128, 128, 255)))
-                                event_item.setBackground(QBrush(QColor(0, 0, 0, 0)))
-                        elif row == next_event_row:
-                            time_item.setForeground(QBrush(
-                                QColor(config.TABLE_NEXT_FONT_COLOR[0], config.TABLE_NEXT_FONT_COLOR[1],
-                                       config.TABLE_NEXT_FONT_COLOR[2])))
-                            time_item.setBackground(QBrush(
-                                QColor(config.TABLE_NEXT_FONT_BG_COLOR[0], config.TABLE_NEXT_FONT_BG_COLOR[1],
-                                       config.TABLE_NEXT_FONT_BG_COLOR[2], config.TABLE_NEXT_FONT_BG_COLOR[3])))
-                            if event_item:
-                                event_item.setForeground(QBrush(
-                                    QColor(config.TABLE_NEXT_FONT_COLOR[0], config.TABLE_NEXT_FONT_COLOR[1],
-                                           config.TABLE_NEXT_FONT_COLOR[2])))
-                                event_item.setBackground(QBrush(
-                                    QColor(config.TABLE_NEXT_FONT_BG_COLOR[0], config.TABLE_NEXT_FONT_BG_COLOR[1],
-                                           config.TABLE_NEXT_FONT_BG_COLOR[2], config.TABLE_NEXT_FONT_BG_COLOR[3])))
-                    except ValueError:
-                        continue
-
-            # 第三次遍历：更新提醒和销毁过时提醒    
-            for row in range(self.table_area.rowCount()):
-                time_item = self.table_area.item(row, 0)
-                event_item = self.table_area.item(row, 1)
-                army_item = self.table_area.item(row, 2)
-                sound_item = self.table_area.item(row, 3)
-                hero_item = self.table_area.item(row, 4)
-                
-                if time_item and time_item.text():
-                    try:
-                        time_parts = time_item.text().split(':')
-                        row_seconds = 0
-                        if len(time_parts) == 2:  # MM:SS
-                            row_seconds = int(time_parts[0]) * 60 + int(time_parts[1])
-                        elif len(time_parts) == 3:  # HH:MM:SS
-                            row_seconds = int(time_parts[0]) * 3600 + int(time_parts[1]) * 60 + int(time_parts[2])
-                        time_diff = row_seconds - current_seconds
-                        event_id = f"map_event_{row}"  # 使用行号作为唯一ID
-
-                        if time_diff > 0 and time_diff <= config.MAP_ALERT_SECONDS:
-                            toast_message = (
-                                f'{time_diff:0>2}秒后'
-                                + f"{time_item.text()}\t{event_item.text()}"
-                                + (f"\t{army_item.text()}" if army_item else "")
-                                + (f"风暴: \t{hero_item.text()}" if is_heroes_from_the_storm_active and len(hero_item.text())>0 else "")
-                            )
-                            sound_filename = sound_item.text().strip() if sound_item else ""
-                            # 调用 ToastManager 的新方法
-                            self.logger.debug(f'正在调用toast_manager播报地图事件')
-                            self.toast_manager.show_map_countdown_alert(event_id, time_diff, toast_message,is_in_game, sound_filename)
-                        else:
-                            if self.toast_manager.has_alert(event_id):
-                                self.toast_manager.remove_alert(event_id)
-
-                    except ValueError:
-                        continue
-
-
-
-                        # ... 其他颜色逻辑保持不变
-
 
+            # 更新提醒和销毁过时提醒
+            alert_rows = dict(map_alert_rows(time_values, current_seconds))
+            for row in range(len(timeline)):
+                event_id = f"map_event_{row}"  # 使用行号作为唯一ID
+                time_diff = alert_rows.get(row)
+                if time_diff is not None:
+                    toast_message = build_map_alert_message(
+                        time_diff,
+                        timeline.time_labels[row],
+                        timeline.events[row],
+                        timeline.armies[row],
+                        timeline.heroes[row],
+                        is_heroes_from_the_storm_active,
+                    )
+                    sound_filename = timeline.sounds[row].strip()
+                    # 调用 ToastManager 的新方法
+                    self.logger.debug(f'正在调用toast_manager播报地图事件')
+                    self.toast_manager.show_map_countdown_alert(event_id, time_diff, toast_message,is_in_game, sound_filename)
+                elif self.toast_manager.has_alert(event_id):
+                    self.toast_manager.remove_alert(event_id)
+
+            # 预渲染即将进入提醒窗口的事件，首次显示时只需切换 pixmap
+            if is_in_game:
+                alert_seconds = config.MAP_ALERT_SECONDS
+                pending = {}
+                for row, _ in map_prerender_rows(time_values, current_seconds, alert_seconds):
+                    pending[f"map_event_{row}"] = (alert_seconds, build_map_alert_message(
+                        alert_seconds,
+                        timeline.time_labels[row],
+                        timeline.events[row],
+                        timeline.armies[row],
+                        timeline.heroes[row],
+                        is_heroes_from_the_storm_active,
+                    ))
+                self.toast_manager.prerender_map_alerts(pending)
 
             # 滚动位置逻辑
             if self.table_area.rowHeight(0) == 0:
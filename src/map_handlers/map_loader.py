@@ -1,13 +1,13 @@
 import os
 import traceback
-from PyQt5.QtWidgets import QTableWidgetItem, QPushButton
-from PyQt5.QtGui import QBrush, QColor
-from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QPushButton
 from src.utils.fileutil import get_resources_dir
 from src.map_handlers.map_event_manager import MapEventManager
 from src.map_handlers.malwarfare_event_manager import MapwarfareEventManager
 from src.map_handlers.malwarfare_map_handler import MalwarfareMapHandler
 from src.db.map_daos import load_map_by_name
+from src.db.timeline_cache import compile_map_timeline
+from src.ui.event_table_model import LAYOUT_MALWARFARE, LAYOUT_STANDARD
 from src.ui.main_window_layout import (
     apply_malwarfare_table_columns,
     apply_standard_map_table_columns,
@@ -47,6 +47,15 @@ def handle_version_selection(window):
     if index >= 0:
         window.combo_box.setCurrentIndex(index)
 
+def get_map_timeline(window, map_name):
+    """取地图的编译时间轴，窗口未挂载缓存时直接从数据库编译"""
+    map_timelines = getattr(window, 'map_timelines', None)
+    if map_timelines is not None:
+        return map_timelines.get(map_name)
+
+    map_data = load_map_by_name(window.maps_db, map_name)
+    return compile_map_timeline(map_name, map_data) if map_data else None
+
 def handle_map_selection(window, map_name):
     
     # 设置列宽函数
@@ -170,99 +179,15 @@ def handle_map_selection(window, map_name):
     else:
         window.map_version_group.hide()
         
-    # 加载地图文件内容并填充表格 (原有的文件加载和表格填充逻辑)
+    # 加载地图时间轴并填充表格 (优先使用编译缓存，避免每次切换都查询数据库)
     try:
-        
-        map_data = load_map_by_name(window.maps_db, map_name)
-        if map_data:
-            window.logger.info(f'成功从数据库读取地图数据: {map_name}，记录数: {len(map_data)}')
-            # 清空表格现有内容
-            window.table_area.setRowCount(0)
-            window.logger.info('已清空表格现有内容')
-            
-            # 设置表格行数
-            window.table_area.setRowCount(len(map_data))
-            window.logger.info(f'设置表格行数为: {len(map_data)}')
-            
-            # 填充表格内容
-            for row, map_row in enumerate(map_data):
-                if window.is_map_Malwarfare:
-                    # 净网行动处理逻辑 (4列)
-                    
-                    count_text = str(map_row['count'])
-                    time_text = str(map_row['time']['label'])
-                    event_text = map_row['event']
-                    army_text = map_row['army']
-                    sound_text = map_row['sound']  # Sound 现在是第 5 列
-                    hero_text = map_row['hero'] 
-
-                    # 0. Count
-                    count_item = QTableWidgetItem(count_text)
-                    count_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                    count_item.setForeground(QBrush(QColor(255, 255, 255)))
-                    window.table_area.setItem(row, 0, count_item)
-                    
-                    # 1. Time
-                    time_item = QTableWidgetItem(time_text)
-                    time_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                    time_item.setForeground(QBrush(QColor(255, 255, 255)))
-                    window.table_area.setItem(row, 1, time_item)
-                    
-                    # 2. Event
-                    event_item = QTableWidgetItem(event_text)
-                    event_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                    event_item.setForeground(QBrush(QColor(255, 255, 255)))
-                    window.table_area.setItem(row, 2, event_item) 
-                    
-                    # 3. Army
-                    army_item = QTableWidgetItem(army_text)
-                    army_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                    army_item.setForeground(QBrush(QColor(255, 255, 255)))
-                    window.table_area.setItem(row, 3, army_item)
-                    
-                    # 4. Sound (隐藏列，音频文件)
-                    sound_item = QTableWidgetItem(sound_text)
-                    sound_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                    sound_item.setForeground(QBrush(QColor(255, 255, 255)))
-                    window.table_area.setItem(row, 4, sound_item)
-                else:
-                        # 标准地图处理逻辑 (2或3列)
-                        
-                        time_text = str(map_row['time']['label'])
-                        event_text = map_row['event']
-                        army_text = map_row['army']
-                        sound_text = map_row['sound']  # Sound 现在是第 5 列
-                        hero_text = map_row['hero'] 
-                        
-                        # 1. 时间单元格 (列 0)
-                        time_item = QTableWidgetItem(time_text)
-                        time_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                        time_item.setForeground(QBrush(QColor(255, 255, 255)))
-                        window.table_area.setItem(row, 0, time_item)
-                        
-                        # 2. 事件单元格 (列 1)
-                        event_item = QTableWidgetItem(event_text)
-                        event_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                        event_item.setForeground(QBrush(QColor(255, 255, 255)))
-                        window.table_area.setItem(row, 1, event_item)
-    
-                        # 3. 兵种/备注单元格 (列 2)
-                        army_item = QTableWidgetItem(army_text)
-                        army_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                        army_item.setForeground(QBrush(QColor(255, 255, 255)))
-                        window.table_area.setItem(row, 2, army_item)
-                        
-                        # 4. 音频文件单元格 (列 3)
-                        sound_item = QTableWidgetItem(sound_text)
-                        sound_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                        sound_item.setForeground(QBrush(QColor(255, 255, 255)))
-                        window.table_area.setItem(row, 3, sound_item)
-                        
-                        # 5. 英雄事件单元格 (列 4)
-                        hero_item = QTableWidgetItem(hero_text)
-                        hero_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                        hero_item.setForeground(QBrush(QColor(255, 255, 255)))
-                        window.table_area.setItem(row, 4, hero_item)
+        timeline = get_map_timeline(window, map_name)
+        if timeline is not None and len(timeline):
+            window.logger.info(f'成功读取地图时间轴: {map_name}，记录数: {len(timeline)}')
+            # 表格模型直接引用时间轴数组，不再逐个创建单元格
+            layout = LAYOUT_MALWARFARE if window.is_map_Malwarfare else LAYOUT_STANDARD
+            window.table_area.model().set_timeline(timeline, layout)
+            window.logger.info(f'设置表格行数为: {len(timeline)}')
     except Exception as e:
         window.logger.error(f'加载地图数据时出错: {str(e)}\n{traceback.format_exc()}')
 
@@ -0,0 +1,122 @@
+# src/map_handlers/map_search_index.py
+# 地图搜索索引：启动时为每张地图预先计算 全拼 / 首字母 / map_keywords 别名，常驻内存。
+# 输入时只在排好序的键列表上做二分前缀查找并按匹配类型排序，不再每次按键都查询数据库或重新计算拼音。
+import bisect
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from pypinyin import lazy_pinyin, Style
+
+from src.db import map_daos
+
+# 匹配类型，数值越小排名越靠前
+RANK_KEYWORD_EXACT = 0     # 与 map_keywords 中的关键词完全一致（保持旧行为：关键词结果优先）
+RANK_NAME_PREFIX = 1       # 地图名前缀
+RANK_ALIAS_PREFIX = 2      # 全拼 / 首字母 / 关键词前缀
+RANK_NAME_SUBSTRING = 3    # 地图名包含输入（旧行为的子串匹配）
+
+
+@lru_cache(maxsize=None)
+def pinyin_initials(text: str) -> str:
+    """拼音首字母串（小写），用于排序与首字母搜索"""
+    return ''.join(lazy_pinyin(text, style=Style.FIRST_LETTER)).lower()
+
+
+@lru_cache(maxsize=None)
+def pinyin_full(text: str) -> str:
+    """全拼（小写、无分隔）"""
+    return ''.join(lazy_pinyin(text)).lower()
+
+
+class MapSearchIndex:
+    """
+    map_names 按拼音首字母排序，是下拉框的默认顺序；
+    keyword_entries 为 [(关键词, 地图名)]，按优先级从高到低排列。
+    """
+
+    def __init__(self, map_names, keyword_entries=(), conn=None):
+        # conn 不为 None 时，数据库有写入（例如设置中修改了关键词）后自动重建
+        self._conn = conn
+        self._stamp = self._read_stamp()
+        self._results: Dict[str, Tuple[str, ...]] = {}
+        self._build(map_names, keyword_entries)
+
+    def _build(self, map_names, keyword_entries):
+        self.map_names: List[str] = sorted(dict.fromkeys(map_names), key=pinyin_initials)
+        self._order = {name: i for i, name in enumerate(self.map_names)}
+
+        # 关键词完全匹配：关键词 -> [(优先级序号, 地图名)]
+        self._keywords: Dict[str, List[Tuple[int, str]]] = {}
+        # 前缀查找用的有序键表：(键, 排名, 次序, 地图名)
+        entries = []
+        for name in self.map_names:
+            order = self._order[name]
+            entries.append((name.lower(), RANK_NAME_PREFIX, order, name))
+            entries.append((pinyin_full(name), RANK_ALIAS_PREFIX, order, name))
+            entries.append((pinyin_initials(name), RANK_ALIAS_PREFIX, order, name))
+        for priority, (keyword, name) in enumerate(keyword_entries):
+            if name not in self._order:
+                continue
+            keyword = str(keyword).strip().lower()
+            if not keyword:
+                continue
+            self._keywords.setdefault(keyword, []).append((priority, name))
+            entries.append((keyword, RANK_ALIAS_PREFIX, self._order[name], name))
+        entries.sort()
+        self._keys = [e[0] for e in entries]
+        self._entries = entries
+        self._lower_names = [(name.lower(), name) for name in self.map_names]
+
+    @classmethod
+    def from_db(cls, conn):
+        return cls(map_daos.get_all_map_names(conn), map_daos.get_keyword_entries(conn), conn=conn)
+
+    def _read_stamp(self):
+        return getattr(self._conn, 'total_changes', None) if self._conn is not None else None
+
+    def refresh(self):
+        """数据库内容变化时重建索引"""
+        stamp = self._read_stamp()
+        if self._conn is None or stamp == self._stamp:
+            return
+        self._stamp = stamp
+        self._results.clear()
+        self._build(map_daos.get_all_map_names(self._conn), map_daos.get_keyword_entries(self._conn))
+
+    def search(self, keyword: str) -> Tuple[str, ...]:
+        """返回排好序的匹配地图；空输入返回全部地图。相同输入的结果会被缓存"""
+        self.refresh()
+        keyword = keyword.strip().lower()
+        result = self._results.get(keyword)
+        if result is None:
+            if len(self._results) >= 256:
+                self._results.clear()
+            result = self._results[keyword] = self._search(keyword)
+        return result
+
+    def _search(self, keyword: str) -> Tuple[str, ...]:
+        if not keyword:
+            return tuple(self.map_names)
+
+        best: Dict[str, Tuple[int, int]] = {}
+
+        def offer(name, rank, order):
+            current = best.get(name)
+            if current is None or (rank, order) < current:
+                best[name] = (rank, order)
+
+        for priority, name in self._keywords.get(keyword, ()):
+            offer(name, RANK_KEYWORD_EXACT, priority)
+
+        # 二分定位所有以 keyword 开头的键
+        start = bisect.bisect_left(self._keys, keyword)
+        for key, rank, order, name in self._entries[start:]:
+            if not key.startswith(keyword):
+                break
+            offer(name, rank, order)
+
+        for lower_name, name in self._lower_names:
+            if keyword in lower_name:
+                offer(name, RANK_NAME_SUBSTRING, self._order[name])
+
+        return tuple(sorted(best, key=best.get))
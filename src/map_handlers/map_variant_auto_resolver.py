@@ -47,6 +47,10 @@ class MapVariantRule:
     min_score: float = 0.58
     high_score: float = 0.82
 
+    # 判定 absent 前要求窗口内实际处理的帧数 / 应有帧数不低于这个比例，
+    # 截图断断续续时“没看到红点”不可信，不切图。
+    min_frame_coverage: float = 0.5
+
 
 RULES: Tuple[MapVariantRule, ...] = (
     MapVariantRule(
@@ -154,6 +158,8 @@ class MapVariantAutoResolver:
         self.monitor_ids.clear()
         self.last_results.clear()
         self.resolved_rule_ids.clear()
+        # 新的一局 / 录像的界面布局可能不同，下一帧重新定位小地图
+        red_dot_detector.reset_minimap_geometry()
         self.disabled_by_manual = False
         self.manual_disable_reason = None
         self._hide_variant_message()
@@ -344,6 +350,14 @@ class MapVariantAutoResolver:
                     result=result,
                 )
 
+            if result.get("frame_coverage", 1.0) < rule.min_frame_coverage:
+                self._finish_rule_without_switch(
+                    rule=rule,
+                    reason="insufficient_frame_coverage",
+                    result=result,
+                )
+                return False
+
             return self._apply_decision(
                 rule=rule,
                 target_map=rule.absent_map,
@@ -373,12 +387,16 @@ class MapVariantAutoResolver:
 
         self.logger.info(
             "[MapVariantAutoResolver] decision=%s rule=%s target=%s "
-            "count=%s current_count=%s detections=%s",
+            "count=%s current_count=%s frames=%s/%.1f coverage=%.2f max_gap=%.2fs detections=%s",
             decision,
             rule.rule_id,
             target_map,
             result.get("count") if result else None,
             result.get("current_count") if result else None,
+            result.get("frame_updates") if result else None,
+            result.get("expected_frames", 0.0) if result else 0.0,
+            result.get("frame_coverage", 0.0) if result else 0.0,
+            result.get("max_frame_gap_s", 0.0) if result else 0.0,
             result.get("detections") if result else None,
         )
 
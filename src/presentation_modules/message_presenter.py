@@ -264,16 +264,7 @@ class MessagePresenter(QLabel):
         
         # 仅在发生变化时设置 text / style（OutlinedLabel 会缓存渲染）
         if message != self._last_message or color != self._last_color:
-            # 如果外部指定了 height，告诉 text_label 期望的行高（像素）
-            if height is not None:
-                self.text_label.set_line_height(int(height))
-            self.text_label.set_vertical_offset(vertical_offset) # 设置垂直偏移
-            self.text_label.set_font_pixel_size(int(font_size))  # 用像素字体
-            self.text_label.setText(message)
-            # 通过 palette 或 stylesheet 设置前景色（这里用 setStyleSheet）
-            self.text_label.setStyleSheet(f'color: {color};background-color: transparent;')
-            self._last_message = message
-            self._last_color = color
+            self._apply_message(message, color, height, font_size, vertical_offset)
 
         if self.icon_label and self.icon_path:
             icon_path = os.path.join(get_resources_dir(), 'icons', 'mutators', self.icon_path)
@@ -307,6 +298,33 @@ class MessagePresenter(QLabel):
             except Exception:
                 pass
 
+    def _apply_message(self, message, color, height, font_size, vertical_offset):
+        # 如果外部指定了 height，告诉 text_label 期望的行高（像素）
+        if height is not None:
+            self.text_label.set_line_height(int(height))
+        self.text_label.set_vertical_offset(vertical_offset) # 设置垂直偏移
+        self.text_label.set_font_pixel_size(int(font_size))  # 用像素字体
+        self.text_label.setText(message)
+        # 通过 palette 或 stylesheet 设置前景色（这里用 setStyleSheet）
+        self.text_label.setStyleSheet(f'color: {color};background-color: transparent;')
+        self._last_message = message
+        self._last_color = color
+
+    def prerender(self, message, color, height=None, font_size=16, vertical_offset=0):
+        """
+        在隐藏状态下提前完成窗口创建、文本设置和 pixmap 渲染。
+        之后以相同的 message / color 调用 update_message 时只需移动并显示，不再重新渲染。
+        """
+        self.winId()  # 提前创建原生窗口
+        if (message == self._last_message and color == self._last_color
+                and self.text_label._cached_pixmap is not None):
+            return
+        self._apply_message(message, color, height, font_size, vertical_offset)
+        # 先应用样式表，使 palette 中的前景色生效，再渲染缓存
+        self.text_label.ensurePolished()
+        self.text_label._render_to_pixmap()
+        self.adjustSize()
+
     def paintEvent(self, event):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing, True)
@@ -7,6 +7,7 @@ import asyncio
 from src import config
 from src.troop_util import TroopLoader
 from src.presentation_modules.message_presenter import MessagePresenter
+from src.event_managers_and_notifiers.alert_rules import toast_color_and_sound
 from src.utils.window_utils import get_sc2_window_geometry
 
 class ToastManager:
@@ -15,6 +16,7 @@ class ToastManager:
         self.parent = parent_window
         self.logger = parent_window.logger
         self.map_alerts = {}  # 用于存储地图事件的 MessagePresenter 实例
+        self.prerendered_alerts = {}  # 尚未显示、已提前渲染好的 MessagePresenter 实例
 
     def hide_toast(self):
         """隐藏Toast提示"""
@@ -24,7 +26,6 @@ class ToastManager:
     def show_map_countdown_alert(self, event_id, time_diff, message, is_in_game, sound_filename: str = None, default_color=None):
         self.logger.debug(f"尝试播报信息{message}")
         
-        new_event = False
         """
         根据事件ID显示或更新地图倒计时提示
         event_id: 地图事件的唯一标识符
@@ -38,17 +39,11 @@ class ToastManager:
 
         # 根据事件ID获取或创建 MessagePresenter 实例
         if event_id not in self.map_alerts:
-            # 如果是新事件，创建一个新的 MessagePresenter
-            self.map_alerts[event_id] = MessagePresenter(icon_path=None)
-            new_event = True
+            # 如果是新事件，优先使用已预渲染的实例，否则创建一个新的 MessagePresenter
+            presenter = self.prerendered_alerts.pop(event_id, None)
+            self.map_alerts[event_id] = presenter if presenter is not None else self._create_presenter()
 
         alert_label = self.map_alerts[event_id]
-        if new_event:
-            #alert_label.setWindowFlags(
-            #    Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool | Qt.WA_TranslucentBackground
-            #)
-            alert_label.setAttribute(Qt.WA_TransparentForMouseEvents, True)
-            alert_label.setAttribute(Qt.WA_TranslucentBackground, True)
         sc2_rect = get_sc2_window_geometry()
         if not sc2_rect:
             alert_label.hide_alert()
@@ -98,14 +93,8 @@ class ToastManager:
         # 根据时间差设置颜色
         # 1. 优先使用传入的 default_color (自定义倒计时颜色)
         # 2. 如果没有传入，使用 config.MAP_ALERT_NORMAL_COLOR (地图事件默认颜色)
-        text_color = default_color if default_color else config.MAP_ALERT_NORMAL_COLOR
-
-        final_sound_filename = None
-
-        if time_diff is not None and time_diff <= config.MAP_ALERT_WARNING_THRESHOLD_SECONDS:
-            text_color = config.MAP_ALERT_WARNING_COLOR
-            if sound_filename:
-                final_sound_filename = sound_filename
+        # 3. 进入警告阈值后变为警告色，并播放音频
+        text_color, final_sound_filename = toast_color_and_sound(time_diff, sound_filename, default_color)
 
         # 更新 MessagePresenter 的内容
         alert_label.update_message(
@@ -120,6 +109,49 @@ class ToastManager:
             vertical_offset=getattr(config,'TOAST_VERTICAL_OFFSET',0) # 从config读取垂直偏移，默认为0
         )
 
+    def _create_presenter(self):
+        presenter = MessagePresenter(icon_path=None)
+        presenter.setAttribute(Qt.WA_TransparentForMouseEvents, True)
+        presenter.setAttribute(Qt.WA_TranslucentBackground, True)
+        return presenter
+
+    def prerender_map_alerts(self, pending, default_color=None):
+        """
+        预渲染即将进入提醒窗口的事件，使首次显示只是一次 pixmap 切换。
+        pending: {event_id: (time_diff, message)}，time_diff / message 为首次显示时的内容。
+        不在 pending 中的预渲染实例会被丢弃。
+        """
+        for event_id in list(self.prerendered_alerts.keys()):
+            if event_id not in pending:
+                self._discard_prerendered(event_id)
+
+        line_height = getattr(config, 'TOAST_LINE_HEIGHT', 40)
+        vertical_offset = getattr(config, 'TOAST_VERTICAL_OFFSET', 0)
+        for event_id, (time_diff, message) in pending.items():
+            if event_id in self.map_alerts:
+                continue
+            presenter = self.prerendered_alerts.get(event_id)
+            if presenter is None:
+                presenter = self._create_presenter()
+                self.prerendered_alerts[event_id] = presenter
+            text_color, _ = toast_color_and_sound(time_diff, None, default_color)
+            try:
+                presenter.prerender(
+                    message,
+                    text_color,
+                    height=line_height,
+                    font_size=config.TOAST_FONT_SIZE,
+                    vertical_offset=vertical_offset,
+                )
+            except Exception as e:
+                self.logger.warning(f"预渲染提示失败 {event_id}: {e}")
+                self._discard_prerendered(event_id)
+
+    def _discard_prerendered(self, event_id):
+        presenter = self.prerendered_alerts.pop(event_id, None)
+        if presenter is not None:
+            presenter.deleteLater()
+
     def remove_alert(self, event_id):
         if event_id in self.map_alerts:
             alert_instance = self.map_alerts.get(event_id)
@@ -137,4 +169,6 @@ class ToastManager:
         for alert_id in list(self.map_alerts.keys()):
             self.remove_alert(alert_id) # 复用已有的 remove_alert 逻辑
         # 确保字典最终为空
-        self.map_alerts.clear()
\ No newline at end of file
+        self.map_alerts.clear()
+        for event_id in list(self.prerendered_alerts.keys()):
+            self._discard_prerendered(event_id)
\ No newline at end of file
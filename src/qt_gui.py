@@ -13,6 +13,7 @@ from src.map_handlers import map_loader
 from src.map_handlers.map_variant_auto_resolver import MapVariantAutoResolver
 from src.presentation_modules.toast_manager import ToastManager
 from src.game_readers.mutator_and_enemy_race_recognizer import Mutator_and_enemy_race_recognizer
+from src.game_readers.minimap_red_dot_detector import red_dot_detector
 from src.memo_overlay import MemoOverlay
 from src.event_managers_and_notifiers.artifact_notifier import ArtifactNotifier
 from src.event_managers_and_notifiers.countdown_manager import CountdownManager
@@ -20,7 +21,6 @@ from src.event_managers_and_notifiers.supply_notifier import SupplyNotifier
 
 from src.utils.fileutil import get_project_root
 from src.db.db_manager import DBManager
-from src.db.map_daos import search_maps_by_keyword
 from src.ui.main_window_layout import apply_table_row_height, get_control_font_size
 
 #from src.settings_window import SettingsWindow
@@ -55,7 +55,12 @@ class TimerWindow(QMainWindow):
         # 获取数据库连接
         self.maps_db = self.db_manager.get_maps_conn()
         self.mutators_db = self.db_manager.get_mutators_conn()
+        # 编译时间轴缓存：切换地图/因子时不再重复查询数据库
+        self.map_timelines = self.db_manager.get_map_timelines()
+        self.mutator_timelines = self.db_manager.get_mutator_timelines()
         #self.enemies_db = self.db_manager.get_enemies_conn()#暂不可用
+        # 敌方构成倒排索引：根据观察到的单位排序候选构成（内部自行打开 enemies.db，失败时退回 CSV）
+        self.enemy_comp_index = self.db_manager.get_enemy_comp_index()
         
         #在最开始安全地初始化 control_window 为 None
         # 万一在真正创建前触发了 moveEvent，它可以通过 hasattr() 或 try/except 优雅地失败。
@@ -281,23 +286,17 @@ class TimerWindow(QMainWindow):
         # 用户输入搜索
         # 清空搜索框的定时器->现在在ui_setup实现
 
-        # 更新搜索内容
+        # 更新搜索内容：下拉列表立即更新，切换地图（重新加载表格）由防抖定时器触发
+        pending_selection = {'map_name': None}
+
         def update_combo_box(keyword, allow_auto_select=True):
 
-            keyword = keyword.strip().lower()
             current_selected = self.combo_box.currentText()
 
+            filtered = list(self.map_search_index.search(keyword))
+
             self.combo_box.blockSignals(True)  # 🚫 禁止选项变化触发 currentTextChanged
             self.combo_box.clear()
-
-            filtered = [f for f in map_list if keyword in f.lower()]
-
-            mapped_results = search_maps_by_keyword(self.maps_db, keyword)
-            
-            for map_name in reversed(mapped_results):
-                if map_name in map_list and map_name not in filtered:
-                    filtered.insert(0, map_name)
-
             self.combo_box.addItems(filtered)
 
             # ✅ 如果不是自动选择场景，恢复原选项
@@ -308,9 +307,19 @@ class TimerWindow(QMainWindow):
 
             self.combo_box.blockSignals(False)
 
-            # ✅ 只在明确需要时触发地图变更
+            # ✅ 只在明确需要时触发地图变更，且等输入稳定后再执行
             if filtered and allow_auto_select:
-                map_loader.handle_map_selection(self, filtered[0])
+                pending_selection['map_name'] = filtered[0]
+                self.search_debounce_timer.start(getattr(config, 'SEARCH_DEBOUNCE_MS', 250))
+            else:
+                pending_selection['map_name'] = None
+                self.search_debounce_timer.stop()
+
+        def apply_pending_selection():
+            map_name = pending_selection['map_name']
+            pending_selection['map_name'] = None
+            if map_name:
+                map_loader.handle_map_selection(self, map_name)
 
         # 用户输入时触发（允许自动选择）
         def filter_combo_box_user():
@@ -333,6 +342,7 @@ class TimerWindow(QMainWindow):
         self.search_box.textChanged.connect(filter_combo_box_user)
         self.search_box.textChanged.connect(restart_clear_timer)
         self.clear_search_timer.timeout.connect(filter_combo_box_clear)
+        self.search_debounce_timer.timeout.connect(apply_pending_selection)
         self.combo_box.currentTextChanged.connect(self.on_map_selected)
 
         # 调整时间标签的位置和高度
@@ -428,17 +438,15 @@ class TimerWindow(QMainWindow):
     def on_text_double_click(self, event):
         """处理表格区域双击事件"""
         if event.button() == Qt.LeftButton:
-            selected_items = self.table_area.selectedItems()
-            if selected_items:
+            selected_indexes = self.table_area.selectionModel().selectedIndexes()
+            if selected_indexes:
                 # 获取选中行的完整内容
-                row = selected_items[0].row()
-                time_item = self.table_area.item(row, 0)
-                event_item = self.table_area.item(row, 1)
-                army_item = self.table_area.item(row, 2)
-                if time_item and event_item:
-                    time_text = time_item.text().strip()
-                    event_text = event_item.text().strip()
-                    army_text = army_item.text().strip() if army_item else ""
+                row = selected_indexes[0].row()
+                model = self.table_area.model()
+                time_text = model.cell_text(row, 0).strip()
+                event_text = model.cell_text(row, 1).strip()
+                army_text = model.cell_text(row, 2).strip()
+                if time_text or event_text:
                     selected_text = f"{time_text}\t{event_text}\t{army_text}" if time_text and army_text.strip() else (
                         f"{time_text}\t{event_text}" if time_text else event_text)
             event.accept()
@@ -613,6 +621,7 @@ class TimerWindow(QMainWindow):
 
         try:
             game_state_service.state.app_closing = True
+            game_state_service.state.wake_screenshot_waiters()
 
             if hasattr(self, 'timer') and self.timer:
                 self.timer.stop()
@@ -626,6 +635,9 @@ class TimerWindow(QMainWindow):
                 self.mutator_and_enemy_race_recognizer.shutdown()
                 self.logger.info("突变因子和种族识别器已关闭。")
 
+            red_dot_detector.stop_worker()
+            self.logger.info("小地图红点检测器已关闭。")
+
             if hasattr(self, 'artifact_notifier') and self.artifact_notifier:
                 self.artifact_notifier.shutdown()
                 self.logger.info("ArtifactNotifier 已关闭。")
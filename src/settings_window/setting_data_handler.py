@@ -3,6 +3,7 @@
 import json, os, copy
 from src import config
 from src.db import map_daos, mutator_daos
+from src.db.backplane_diff import compute_diff, apply_diff
 from src.utils.excel_utils import ExcelUtil
 from src.utils.data_validator import DataValidator
 from src.utils.logging_util import get_logger
@@ -14,11 +15,17 @@ class SettingsHandler:
         'map': {
             'name': "地图 (Map)",
             'db_conn_attr': 'maps_db',
+            'db_file': 'maps.db',
             'table_name': 'map_configs',
             'id_col': 'map_name',
             'dao_load': map_daos.load_map_by_name,
             'dao_import': map_daos.bulk_import_map_configs,
             'dao_get_names': map_daos.get_all_map_names,
+            'dao_export': map_daos.export_all_map_configs,
+            # 差异同步使用的列顺序、主键与行转换
+            'columns': map_daos.MAP_CONFIG_COLUMNS,
+            'key_columns': map_daos.MAP_CONFIG_KEY,
+            'dao_to_row': map_daos.map_config_row,
             'headers': ["时间点 (Label)", "节点 (净网限定)", "提醒事件", "科技等级", "声音文件", "风暴英雄"],
             # 这里的映射必须与 DAO 中的 bulk_import 键名严格一致
             'mapping': ['time_label', 'count_value', 'event_text', 'army_text', 'sound_filename', 'hero_text']
@@ -26,20 +33,42 @@ class SettingsHandler:
         'mutator': {
             'name': "突变因子 (Mutator)",
             'db_conn_attr': 'mutators_db',
+            'db_file': 'mutators.db',
             'table_name': 'mutator_configs',
             'id_col': 'mutator_name',
             'dao_load': mutator_daos.load_mutator_by_name,
             'dao_import': mutator_daos.bulk_import_mutator_configs,
             'dao_get_names': mutator_daos.get_all_mutator_names,
+            'dao_export': mutator_daos.export_all_mutator_configs,
+            'columns': mutator_daos.MUTATOR_CONFIG_COLUMNS,
+            'key_columns': mutator_daos.MUTATOR_CONFIG_KEY,
+            'dao_to_row': mutator_daos.mutator_config_row,
             'headers': ["时间点 (Label)", "提醒内容", "声音文件"],
             'mapping': ['time_label', 'content_text', 'sound_filename']
         }
     }
-    def __init__(self, settings_file, maps_db=None, mutators_db=None):
+    def __init__(self, settings_file, maps_db=None, mutators_db=None, timeline_caches=None, backup_manager=None):
         self.settings_file = settings_file
         self.maps_db = maps_db
         self.mutators_db = mutators_db
+        # {'map': TimelineCache, 'mutator': TimelineCache}，写入后只重建受影响的时间轴
+        self.timeline_caches = timeline_caches or {}
+        self.last_diff = None
         self.logger = get_logger(__name__)
+        # 打开设置时在后台备份一次（内容未变化时只比较哈希），每次写入后再备份，任意一步都可以回退
+        self.backup_manager = backup_manager
+        self._request_backup()
+
+    def _request_backup(self, db_file=None):
+        if self.backup_manager is None:
+            return
+        try:
+            if db_file is None:
+                self.backup_manager.request_backup_all()
+            else:
+                self.backup_manager.request_backup(db_file)
+        except Exception as e:
+            self.logger.error(f"请求数据库备份失败: {e}")
     def _get_base_from_config_module(self):
         """从 config 模块中提取基础配置项，排除函数、类和模块等非数据项"""
         base_config = {}
@@ -90,38 +119,49 @@ class SettingsHandler:
                 base_dict[k] = v
 
     def validate_and_import(self, file_path, config_type='map'):
-        """验证并导入数据：改为先删除 Excel 中涉及的地图/因子的旧数据，再重新插入"""
-        # 1. 解析 Excel
-        raw_data, parse_err = ExcelUtil.import_configs(file_path, config_type)
-        if parse_err: return False, [parse_err]
-
+        """验证并导入数据：Excel 中涉及的地图/因子以 Excel 为准，与数据库按差异同步"""
         # 根据类型选择数据库连接
         reg = self.BACKPLANE_REGISTRY[config_type]
         db_conn = getattr(self, reg['db_conn_attr'])
         validator = DataValidator(db_conn)
-        
-        valid_data, validation_errors = validator.validate(config_type, raw_data)
+
+        # 1. 流式解析 Excel，逐块按列校验
+        try:
+            frames = ExcelUtil.iter_config_frames(file_path, config_type)
+            valid_data, validation_errors = validator.validate(config_type, frames)
+        except Exception as e:
+            return False, [str(e)]
         if validation_errors:
             return False, validation_errors
+        if not valid_data:
+            return False, ["Excel 中没有可导入的数据"]
 
-        # 2. 执行“覆盖式”写入逻辑
+        # 2. 按主键与数据库现有数据比较，只写入差异（Excel 中删除的行也会从数据库删除）
         try:
             # 提取 Excel 中涉及的所有唯一名称 (例如：['亡者之夜', '净网行动'])
-            target_names = list(set(item[reg['id_col']] for item in valid_data))
-            
-            if target_names:
-                # 物理删除这些目标的旧数据，确保 Excel 中删除的行也能反馈到数据库
-                placeholders = ', '.join(['?'] * len(target_names))
-                sql_delete = f"DELETE FROM {reg['table_name']} WHERE {reg['id_col']} IN ({placeholders})"
-                db_conn.execute(sql_delete, target_names)
-            
-            # 批量插入新数据
-            reg['dao_import'](db_conn, valid_data)
-            db_conn.commit()
-            
-            return True, f"成功同步 {len(valid_data)} 条记录，已覆盖原有的 {len(target_names)} 个项目。"
+            target_names = list(dict.fromkeys(item[reg['id_col']] for item in valid_data))
+            diff = self._sync_backplane(config_type, target_names, valid_data)
+            return True, f"成功同步 {len(target_names)} 个项目：{diff.summary()}"
         except Exception as e:
             return False, [f"写入失败: {str(e)}"]
+
+    def _sync_backplane(self, config_type, names, data_list):
+        """计算 names 范围内的差异并在一个事务中写入，随后只失效受影响的时间轴缓存"""
+        reg = self.BACKPLANE_REGISTRY[config_type]
+        db_conn = getattr(self, reg['db_conn_attr'])
+        rows = [reg['dao_to_row'](item) for item in data_list]
+        diff = compute_diff(
+            db_conn, reg['table_name'], reg['id_col'], reg['columns'], reg['key_columns'], names, rows
+        )
+        if not diff.is_empty:
+            apply_diff(db_conn, diff)
+            self._request_backup(reg['db_file'])
+            cache = self.timeline_caches.get(config_type)
+            if cache is not None and diff.affected_names:
+                cache.invalidate(diff.affected_names)
+        self.last_diff = diff
+        self.logger.info(f"{reg['table_name']} 差异同步: {diff.summary()}")
+        return diff
     
     def save_backplane_to_db(self, config_type, target_name, data_list):
         """通用保存逻辑：不再使用 if-else 判断类型"""
@@ -138,19 +178,12 @@ class SettingsHandler:
             return False, f"当前表格无数据，保存已取消。请确认是否真的要清空【{target_name}】的所有背板数据，或先恢复数据后再保存。"
 
         try:
-            # 第一步：物理删除该目标下的所有旧数据（确保 UI 删掉的行在数据库也同步消失）
-            # 注意：bulk_import 里的 INSERT OR REPLACE 只能处理更新，不能处理删除
-            sql_delete = f"DELETE FROM {reg['table_name']} WHERE {reg['id_col']} = ?"
-            db_conn.execute(sql_delete, (target_name,))
-            
-            # 第二步：调用对应的 DAO 函数执行插入
+            # 只写入与数据库现有数据的差异（UI 删掉的行在数据库也同步删除），整体一个事务
             # 此时传入的 data_list 中的键名必须符合 reg['mapping'] 的定义
-            reg['dao_import'](db_conn, data_list)
-            
-            # 第三步：强制提交事务 (DAO 内部通常有 commit，但这里双重保险)
-            db_conn.commit()
-            
-            return True, f"【{target_name}】的背板数据已同步"
+            diff = self._sync_backplane(config_type, [target_name], data_list)
+            if diff.is_empty:
+                return True, f"【{target_name}】的背板数据没有变化"
+            return True, f"【{target_name}】的背板数据已同步：{diff.summary()}"
         except Exception as e:
             return False, f"同步失败: {str(e)}"
     def save_all(self, config_data, keyword_dict=None):
@@ -171,48 +204,38 @@ class SettingsHandler:
                 # 仅当关键词有实际改变时才提交到数据库
                 if current_keywords != keyword_dict:
                     map_daos.update_keywords_batch(self.maps_db, keyword_dict)
+                    self._request_backup('maps.db')
                 
             return True, "设置及关键词已成功保存"
         except Exception as e:
             return False, f"保存失败: {str(e)}"
     
     def get_all_configs_for_export(self, config_type):
-        """根据类型获取全量背板数据，用于 Excel 导出"""
+        """
+        根据类型获取全量背板数据，用于 Excel 导出。
+        整张表一次有序查询，按列返回 {字段名: 该列全部值}；没有数据时返回空字典。
+        """
         reg = self.BACKPLANE_REGISTRY.get(config_type)
-        if not reg: return []
-        
+        if not reg: return {}
+
         db_conn = getattr(self, reg['db_conn_attr'])
-        all_data = []
-        
-        # 简化版：直接遍历 names
-        names = reg['dao_get_names'](db_conn)
-        # 2. 遍历加载每项的配置
-        for name in names:
-            display_name = name
-            if config_type == 'mutator':
-                display_name = mutator_names_to_CHS.get(name, name)
-            
-            rows = reg['dao_load'](db_conn, name)
-            for r in rows:
-                # 扁平化数据以适配 Excel 结构
-                item = {reg['id_col']: display_name}
-                item['time_label'] = r['time']['label']if isinstance(r.get('time'), dict) else ""
-                
-                # 动态填充其他映射字段
-                for col_key in reg['mapping']:
-                    if col_key == 'time_label':continue # time_label 已特殊处理
-                    source_key = col_key.replace('_text', '').replace('_filename', '').replace('_value', '')
-                    if source_key == 'count': source_key = 'count' # 适配 map_daos
-                    item[col_key] = r.get(source_key, '')
-                
-                all_data.append(item)
-        return all_data
+        col_names, rows = reg['dao_export'](db_conn)
+        if not rows:
+            return {}
+
+        columns = dict(zip(col_names, map(list, zip(*rows))))
+        if config_type == 'mutator':
+            # 突变因子导出为简略中文名
+            columns[reg['id_col']] = [mutator_names_to_CHS.get(n, n) for n in columns[reg['id_col']]]
+        return columns
     
     def export_to_excel(self, config_type, path):
-        """具体导出逻辑"""
-        if config_type == 'map' and self.maps_db:
-            all_data = [] # ... 执行原本 on_export_data 里的查询逻辑
-            ExcelUtil.export_configs(all_data, path, 'map')
+        """导出全部背板数据到 Excel，没有数据时返回 False"""
+        columns = self.get_all_configs_for_export(config_type)
+        if not columns:
+            return False
+        ExcelUtil.export_columns(columns, path, config_type)
+        return True
 
     def get_names_by_type(self, config_type):
         """统一返回格式为 [(原始名, 显示名), ...]"""
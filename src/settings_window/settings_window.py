@@ -21,7 +21,6 @@ from PyQt5.QtGui import QKeyEvent, QColor, QKeySequence, QPainter
 from src import config
 from src.utils.logging_util import get_logger
 from src.utils.fileutil import get_resources_dir, get_project_root
-from src.utils.excel_utils import ExcelUtil
 from src.utils.data_validator import DataValidator
 from src.db import map_daos, mutator_daos
 from src.settings_window.widgets import (
@@ -91,10 +90,16 @@ class SettingsWindow(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent, Qt.Dialog | Qt.FramelessWindowHint)
         self.settings_file = os.path.join(get_project_root(), 'settings.json')
+        db_manager = getattr(parent, 'db_manager', None)
         self.data_handler = SettingsHandler(
             self.settings_file,
             maps_db=parent.maps_db if parent else None,
-            mutators_db=parent.mutators_db if parent else None
+            mutators_db=parent.mutators_db if parent else None,
+            timeline_caches={
+                'map': getattr(parent, 'map_timelines', None),
+                'mutator': getattr(parent, 'mutator_timelines', None),
+            },
+            backup_manager=db_manager.get_backup_manager() if db_manager else None
         )
         self.main_window = parent
 
@@ -789,13 +794,10 @@ class SettingsWindow(QDialog):
             return
 
         try:
-            all_data = self.data_handler.get_all_configs_for_export(config_type)
-
-            if not all_data:
+            if not self.data_handler.export_to_excel(config_type, path):
                 QMessageBox.warning(self, "警告", "数据库中没有找到任何可导出的数据。")
                 return
 
-            ExcelUtil.export_configs(all_data, path, config_type)
             QMessageBox.information(self, "成功", f"数据已成功导出至: {path}")
         except Exception as e:
             QMessageBox.critical(self, "错误", f"导出失败: {str(e)}")
@@ -391,7 +391,8 @@ class SettingsTabsBuilder:
         gl_alert = QFormLayout(gb_alert)
         SettingsTabsBuilder._add_compact_row(parent, gl_alert, "时间设定 (秒):", [
                 ("提示时间:", 'MAP_ALERT_SECONDS', 'spin', {}),
-                ("警告时间:", 'MAP_ALERT_WARNING_THRESHOLD_SECONDS', 'spin', {})
+                ("警告时间:", 'MAP_ALERT_WARNING_THRESHOLD_SECONDS', 'spin', {}),
+                ("预渲染:", 'MAP_ALERT_PRERENDER_SECONDS', 'spin', {})
             ])
         parent.add_row(gl_alert, "正常文本颜色:", 'MAP_ALERT_NORMAL_COLOR', 'color')
         parent.add_row(gl_alert, "警告文本颜色:", 'MAP_ALERT_WARNING_COLOR', 'color')
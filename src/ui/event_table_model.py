@@ -0,0 +1,171 @@
+# event_table_model.py
+# 地图事件表格的数据模型：直接以编译时间轴 (MapTimeline) 的列式数组作为数据源，
+# 视图只在绘制可见行时通过 data() 取值，不再为每个单元格创建 QTableWidgetItem。
+# 行的颜色由 row_states 数组决定，事件管理器每秒只需提交新的状态数组。
+import numpy as np
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt5.QtGui import QBrush, QColor
+
+from src import config
+from src.db.timeline_cache import NO_COUNT
+
+# 行状态
+ROW_NORMAL = 0   # 未到达 / 默认
+ROW_PASSED = 1   # 已经过去
+ROW_NEXT = 2     # 下一个即将发生的事件
+
+LAYOUT_STANDARD = 'standard'
+LAYOUT_MALWARFARE = 'malwarfare'
+
+
+class EventTableModel(QAbstractTableModel):
+    """地图事件表格模型，列布局与 main_window_layout 中的列宽设置对应"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._timeline = None
+        self._layout = LAYOUT_STANDARD
+        self._columns = ()
+        self._state_columns = ()
+        self._column_count = 0
+        self._row_states = np.zeros(0, dtype=np.int8)
+        self._alignment = int(Qt.AlignLeft | Qt.AlignVCenter)
+        self._brush_key = None
+        self._brushes = {}
+
+    # --- 数据源 ---
+
+    @property
+    def timeline(self):
+        return self._timeline
+
+    @property
+    def layout(self):
+        return self._layout
+
+    @property
+    def row_states(self):
+        return self._row_states
+
+    def set_column_count(self, count):
+        """由列宽设置函数调用，只增删列，不影响已有列的宽度与隐藏状态"""
+        count = max(0, int(count))
+        if count == self._column_count:
+            return
+        if count > self._column_count:
+            self.beginInsertColumns(QModelIndex(), self._column_count, count - 1)
+            self._column_count = count
+            self.endInsertColumns()
+        else:
+            self.beginRemoveColumns(QModelIndex(), count, self._column_count - 1)
+            self._column_count = count
+            self.endRemoveColumns()
+
+    def set_timeline(self, timeline, layout=LAYOUT_STANDARD):
+        """
+        切换表格显示的时间轴。
+        只做行的删除与插入，不 reset 模型，避免表头的列宽设置被重置。
+        """
+        old_rows = self.rowCount()
+        if old_rows:
+            self.beginRemoveRows(QModelIndex(), 0, old_rows - 1)
+            self._timeline = None
+            self._columns = ()
+            self._row_states = np.zeros(0, dtype=np.int8)
+            self.endRemoveRows()
+
+        self._layout = layout
+        if timeline is None:
+            self._timeline = None
+            return
+
+        if layout == LAYOUT_MALWARFARE:
+            # 净网行动: 节点 / 时间 / 事件 / 兵种 / 音频(隐藏列)，整行随状态变色
+            counts = tuple('' if c == NO_COUNT else str(c) for c in timeline.count_values.tolist())
+            columns = (counts, timeline.time_labels, timeline.events, timeline.armies, timeline.sounds)
+            state_columns = tuple(range(len(columns)))
+        else:
+            # 标准地图: 时间 / 事件 / 兵种 / 音频 / 风暴英雄，只有时间和事件列随状态变色
+            columns = (timeline.time_labels, timeline.events, timeline.armies, timeline.sounds, timeline.heroes)
+            state_columns = (0, 1)
+
+        new_rows = len(timeline)
+        if new_rows:
+            self.beginInsertRows(QModelIndex(), 0, new_rows - 1)
+        self._timeline = timeline
+        self._columns = columns
+        self._state_columns = state_columns
+        self._row_states = np.zeros(new_rows, dtype=np.int8)
+        if new_rows:
+            self.endInsertRows()
+
+    def set_row_states(self, states):
+        """提交新的行状态数组，只对状态发生变化的行区间发出 dataChanged"""
+        states = np.asarray(states, dtype=np.int8)
+        if states.shape != self._row_states.shape:
+            return
+        changed = np.flatnonzero(states != self._row_states)
+        if changed.size == 0:
+            return
+        self._row_states = states.copy()
+        last_column = max(0, self.columnCount() - 1)
+        top_left = self.index(int(changed[0]), 0)
+        bottom_right = self.index(int(changed[-1]), last_column)
+        self.dataChanged.emit(top_left, bottom_right, [Qt.ForegroundRole, Qt.BackgroundRole])
+
+    def cell_text(self, row, column) -> str:
+        if 0 <= column < len(self._columns) and 0 <= row < self.rowCount():
+            return self._columns[column][row]
+        return ""
+
+    # --- QAbstractTableModel 接口 ---
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self._timeline is None:
+            return 0
+        return len(self._timeline)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._column_count
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+
+        if role == Qt.DisplayRole:
+            if column < len(self._columns):
+                return self._columns[column][row]
+            return None
+        if role == Qt.TextAlignmentRole:
+            return self._alignment
+        if role == Qt.ForegroundRole:
+            state = self._row_states[row] if column in self._state_columns else ROW_NORMAL
+            return self._get_brushes()[state][0]
+        if role == Qt.BackgroundRole:
+            state = self._row_states[row] if column in self._state_columns else ROW_NORMAL
+            return self._get_brushes()[state][1]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    # --- 颜色 ---
+
+    def _get_brushes(self):
+        """各状态的 (前景, 背景) 画刷；设置中修改颜色后自动重建"""
+        key = (tuple(config.TABLE_NEXT_FONT_COLOR), tuple(config.TABLE_NEXT_FONT_BG_COLOR))
+        if key != self._brush_key:
+            transparent = QBrush(QColor(0, 0, 0, 0))
+            self._brushes = {
+                ROW_NORMAL: (QBrush(QColor(255, 255, 255)), transparent),
+                ROW_PASSED: (QBrush(QColor(128, 128, 128, 255)), transparent),
+                ROW_NEXT: (QBrush(QColor(*config.TABLE_NEXT_FONT_COLOR)),
+                           QBrush(QColor(*config.TABLE_NEXT_FONT_BG_COLOR))),
+            }
+            self._brush_key = key
+        return self._brushes
@@ -103,6 +103,15 @@ def _scaled_table_width(base_width, table_width=None):
     return max(1, round(base_width * table_width / base_table_width))
 
 
+def _set_column_count(table, count):
+    # 事件表格使用 EventTableModel 时，列数由模型决定
+    model = table.model()
+    if hasattr(model, 'set_column_count'):
+        model.set_column_count(count)
+    else:
+        table.setColumnCount(count)
+
+
 def _set_header_modes(table, modes):
     header = table.horizontalHeader()
     header.setStretchLastSection(False)
@@ -113,7 +122,7 @@ def _set_header_modes(table, modes):
 
 def apply_default_table_columns(table):
     table_width = _table_width()
-    table.setColumnCount(4)
+    _set_column_count(table, 4)
     _set_header_modes(
         table,
         {
@@ -136,7 +145,7 @@ def apply_default_table_columns(table):
 
 def apply_standard_map_table_columns(table, event_width_factor, army_width_factor):
     table_width = _table_width()
-    table.setColumnCount(5)
+    _set_column_count(table, 5)
     _set_header_modes(
         table,
         {
@@ -166,7 +175,7 @@ def apply_standard_map_table_columns(table, event_width_factor, army_width_facto
 
 def apply_malwarfare_table_columns(table):
     table_width = _table_width()
-    table.setColumnCount(5)
+    _set_column_count(table, 5)
     _set_header_modes(
         table,
         {
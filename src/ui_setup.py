@@ -11,8 +11,7 @@ from PyQt5.QtCore import Qt, QTimer
 from src import config
 from src.utils.font_uitils import set_font_size
 from src.event_managers_and_notifiers.mutator_manager import MutatorManager
-from src.db.map_daos import get_all_map_names
-from pypinyin import lazy_pinyin, Style
+from src.map_handlers.map_search_index import MapSearchIndex, pinyin_initials
 from PyQt5.QtGui import QPixmap
 from src.utils.fileutil import get_resources_dir
 from src.ui.main_window_layout import (
@@ -130,8 +129,11 @@ def setup_map_version_group(window):
 def setup_table_area(window):
     """创建表格显示区"""
     # ... (表格区域创建和样式代码) ... (保持与原文件一致)
-    from PyQt5.QtWidgets import QTableWidget
-    window.table_area = QTableWidget(window.main_container)
+    from PyQt5.QtWidgets import QTableView
+    from src.ui.event_table_model import EventTableModel
+    window.table_area = QTableView(window.main_container)
+    window.event_table_model = EventTableModel(window.table_area)
+    window.table_area.setModel(window.event_table_model)
     header = window.table_area.horizontalHeader()
     header.setSectionResizeMode(QHeaderView.Fixed)
     header.setStretchLastSection(False)
@@ -141,43 +143,43 @@ def setup_table_area(window):
     apply_default_table_columns(window.table_area)
     window.table_area.verticalHeader().setVisible(False)
     apply_table_row_height(window.table_area)
-    window.table_area.setEditTriggers(QTableWidget.NoEditTriggers)
-    window.table_area.setSelectionBehavior(QTableWidget.SelectRows)
+    window.table_area.setEditTriggers(QTableView.NoEditTriggers)
+    window.table_area.setSelectionBehavior(QTableView.SelectRows)
     window.table_area.setShowGrid(False)
     window.table_area.setStyleSheet(f'''
-            QTableWidget {{ 
+            QTableView {{ 
                 border: none; 
                 background-color: transparent; 
                 padding-left: 5px; 
                 font-size: {config.TABLE_FONT_SIZE}px;
             }}
-            QTableWidget::horizontalHeader {{ 
+            QTableView::horizontalHeader {{ 
                 border: none;
                 background-color: transparent;
                 padding: 0px;
                 padding-left: 5px;
                 text-align: left;
             }}
-            QTableWidget::verticalHeader {{
+            QTableView::verticalHeader {{
                 border: none;
                 background-color: transparent;
                 padding: 0px;
                 padding-left: 5px;
                 text-align: left;
             }}
-            QTableWidget::item {{ 
+            QTableView::item {{ 
                 padding: 0px;
                 padding-left: 5px;
                 text-align: left;
-                /* 移除对颜色的全局设置，允许单元格通过setForeground方法设置颜色 */
+                /* 移除对颜色的全局设置，颜色由 EventTableModel 的 ForegroundRole 提供 */
             }}
-            QTableWidget::item:selected {{ 
+            QTableView::item:selected {{ 
                 background-color: transparent; 
                 color: rgb(255, 255, 255); 
                 border: none; 
                 text-align: left;
             }}
-            QTableWidget::item:focus {{ 
+            QTableView::item:focus {{ 
                 background-color: transparent; 
                 color: rgb(255, 255, 255); 
                 border: none; 
@@ -269,14 +271,19 @@ def setup_search_and_combo_box_and_drag_icon(window):
             border-radius: 4px;
     }''')
 
-    window.map_list = sorted(get_all_map_names(window.maps_db),key=pinyin_key)
-    window.combo_box.addItems(sorted(window.map_list, key=pinyin_key))
+    # 地图搜索索引（全拼 / 首字母 / 关键词），map_list 已按拼音首字母排序
+    window.map_search_index = MapSearchIndex.from_db(window.maps_db)
+    window.map_list = list(window.map_search_index.map_names)
+    window.combo_box.addItems(window.map_list)
 
     ####################
     # 用户输入搜索
     # 清空搜索框的定时器
     window.clear_search_timer = QTimer()
     window.clear_search_timer.setSingleShot(True)
+    # 输入防抖：停止输入一段时间后才切换地图、重新加载表格
+    window.search_debounce_timer = QTimer()
+    window.search_debounce_timer.setSingleShot(True)
     # 注意：搜索框的信号连接 (textChanged.connect) 需要保留在 TimerWindow 的 __init__ 中，以便访问内部函数。
     
     ####################
@@ -316,7 +323,11 @@ def setup_search_and_combo_box_and_drag_icon(window):
 def setup_mutator_ui(window):
     """创建突变管理器和指挥官替换按钮"""
     # ... (突变和按钮创建和样式代码) ... (保持与原文件一致)
-    window.mutator_manager = MutatorManager(window.main_container,window.mutators_db)
+    window.mutator_manager = MutatorManager(
+        window.main_container,
+        window.mutators_db,
+        mutator_timelines=getattr(window, 'mutator_timelines', None),
+    )
     window.mutator_manager.setStyleSheet("""
         QWidget {
             background-color: rgba(43, 43, 43, 96);
@@ -410,11 +421,9 @@ def setup_bottom_buttons(window):
 
 def pinyin_key(text: str):
     """
-    返回拼音首字母串，用于排序
+    返回拼音首字母串，用于排序（结果已缓存）
     """
-    return ''.join(
-        lazy_pinyin(text, style=Style.FIRST_LETTER)
-    )
+    return pinyin_initials(text)
 
 # 主 UI 初始化函数
 def init_ui(window):
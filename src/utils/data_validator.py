@@ -1,10 +1,13 @@
 # src/utils/data_validator.py
 import pandas as pd
 from src.db import map_daos, mutator_daos
-from src.utils.excel_utils import ExcelUtil
 from src.utils.temp_translate_utils import mutator_names_to_CHS
 
-import re
+# 严格正则：必须是 分:秒，且秒数不能超过 59
+TIME_PATTERN = r'([0-6]?\d):([0-5]\d)'
+# 同一类错误最多列出的行号区间数
+MAX_LISTED_RANGES = 20
+
 
 class DataValidator:
     def __init__(self, conn):
@@ -22,67 +25,126 @@ class DataValidator:
                 'specific_rules': self._mutator_specific_rules
             }
         }
+        self._name_sets = {}
+
+    def _allowed_names(self, config_type):
+        """合法名称集合，每个校验器实例只查询一次"""
+        names = self._name_sets.get(config_type)
+        if names is None:
+            names = self._name_sets[config_type] = frozenset(self._registry[config_type]['fetch_func'](self.conn))
+        return names
 
-    def validate(self, config_type, data_list):
-        """执行严格的时间格式和名称校验"""
+    def validate(self, config_type, data):
+        """
+        执行严格的时间格式和名称校验（按列向量化）。
+        data 可以是 DataFrame（索引为 Excel 行号）、DataFrame 的迭代器（流式分块），
+        或字典列表（行号按 标题行 + 序号 推算）。
+        返回 (已校验的字典列表, 错误列表)；同一类错误合并为一条，并列出所有出错的行号。
+        """
         if config_type not in self._registry:
             return None, ["未知配置类型"]
-        
+
+        if isinstance(data, pd.DataFrame):
+            frames = [data]
+        elif isinstance(data, (list, tuple)) and not (data and isinstance(data[0], pd.DataFrame)):
+            frames = [pd.DataFrame(list(data), index=range(2, len(data) + 2), dtype=object)] if data else []
+        else:
+            frames = data
+
+        error_rows = {}   # 错误信息 -> 行号列表（按出现顺序）
+        valid_rows = []
+        for df in frames:
+            valid_rows.extend(self._validate_frame(config_type, df, error_rows))
+
+        errors = [f"{self._format_lines(lines)}: {msg}" for msg, lines in error_rows.items()]
+        # 返回已校验行及错误列表。如果 errors 不为空，UI 层应停止导入。
+        return valid_rows, errors
+
+    def _validate_frame(self, config_type, df, error_rows):
         cfg = self._registry[config_type]
-        allowed_names = set(cfg['fetch_func'](self.conn)) #
-        
-        # 严格正则：必须是 分:秒，且秒数不能超过 59
-        time_pattern = re.compile(r'^([0-6]?\d):([0-5]\d)$') 
-        
-        
-        rev_mutator_map = {}
+        id_field = cfg['id_field']
+        if df.empty:
+            return []
+        # 统一缺失值为 None（写入数据库时为 NULL）
+        df = df.astype(object)
+        df = df.where(df.notna(), None)
+        ok = pd.Series(True, index=df.index)
+
+        def report(mask, message_of):
+            """mask 为出错行；message_of(行号组) -> {错误信息: 行号列表}"""
+            nonlocal ok
+            if mask.any():
+                ok &= ~mask
+                for msg, lines in message_of(mask).items():
+                    error_rows.setdefault(msg, []).extend(lines)
+
+        def by_value(values, template):
+            def group(mask):
+                bad = values[mask]
+                return {template.format(v): list(idx) for v, idx in bad.groupby(bad, sort=False, dropna=False).groups.items()}
+            return group
+
+        # 1. 名称合法性校验
+        raw_names = self._text_column(df, id_field)
+        internal_names = raw_names
         if config_type == 'mutator':
             rev_mutator_map = {v: k for k, v in mutator_names_to_CHS.items()}
-        
-        
-        errors, valid_rows = [], []
-        for i, row in enumerate(data_list):
-            line = i + 2  # Excel 行号补偿（标题行+索引）
-            row_errs = []
-            
-            # 1. 名称合法性校验
-            raw_name = str(row.get(cfg['id_field'], '')).strip()
-            internal_name = raw_name
-            
-            if config_type == 'mutator' and raw_name in rev_mutator_map:
-                internal_name = rev_mutator_map[raw_name]
-            
-            if not internal_name or internal_name not in allowed_names:
-                row_errs.append(f"名称 '{raw_name}' 在数据库中不存在")
-            else:
-                #将 row 里的名称更新为数据库识别的英文名，确保后续 DAO 写入正确
-                row[cfg['id_field']] = internal_name
-
-            # 2. 严格时间解析校验（拦截脏数据）
-            label = str(row.get('time_label', '')).strip()
-            if not time_pattern.match(label):
-                row_errs.append(f"时间格式非法: '{label}' (正确示例: 1:20)")
-            else:
-                # 只有正则通过，才进行换算并存入 row 供后续 DAO 直接使用
-                row['time_value'] = ExcelUtil.parse_time_label(label) #
-
-            # 3. 特有规则逻辑...
-            row_errs.extend(cfg['specific_rules'](row, internal_name))
-
-            if row_errs:
-                errors.append(f"第 {line} 行: " + " | ".join(row_errs))
-            else:
-                valid_rows.append(row)
-        
-        # 返回已校验行及错误列表。如果 errors 不为空，UI 层应停止导入。
-        return valid_rows, errors
+            internal_names = raw_names.map(rev_mutator_map).fillna(raw_names)
+        name_ok = internal_names.isin(self._allowed_names(config_type)) & (internal_names != '')
+        report(~name_ok, by_value(raw_names, "名称 '{}' 在数据库中不存在"))
+        # 将名称更新为数据库识别的英文名，确保后续 DAO 写入正确
+        df.loc[name_ok, id_field] = internal_names[name_ok]
+
+        # 2. 严格时间解析校验（拦截脏数据）
+        labels = self._text_column(df, 'time_label')
+        parts = labels.str.extract(f'^{TIME_PATTERN}$')
+        time_ok = parts[0].notna()
+        report(~time_ok, by_value(labels, "时间格式非法: '{}' (正确示例: 1:20)"))
+        # 只有正则通过，才进行换算并存入 time_value 供后续 DAO 直接使用
+        seconds = parts[0][time_ok].astype(int) * 60 + parts[1][time_ok].astype(int)
+        df['time_value'] = None
+        df.loc[time_ok, 'time_value'] = seconds.astype(object)
+
+        # 3. 特有规则逻辑...
+        cfg['specific_rules'](df, internal_names, report, by_value)
+
+        return df[ok].to_dict(orient='records')
+
+    @staticmethod
+    def _text_column(df, column):
+        """取一列并转为去除首尾空白的字符串（缺失的列视为空字符串）"""
+        if column not in df.columns:
+            return pd.Series('', index=df.index, dtype=object)
+        # v != v 用于识别 NaN
+        return df[column].map(lambda v: '' if v is None or v != v else str(v).strip()).astype(object)
+
+    @staticmethod
+    def _format_lines(lines):
+        """把行号列表压缩为区间，例如 第 3-5, 9 行（共 4 行）"""
+        lines = sorted(set(lines))
+        ranges = []
+        start = prev = lines[0]
+        for line in lines[1:]:
+            if line == prev + 1:
+                prev = line
+                continue
+            ranges.append((start, prev))
+            start = prev = line
+        ranges.append((start, prev))
+
+        text = ", ".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges[:MAX_LISTED_RANGES])
+        if len(ranges) > MAX_LISTED_RANGES:
+            text += " ..."
+        if len(lines) == 1:
+            return f"第 {text} 行"
+        return f"第 {text} 行（共 {len(lines)} 行）"
 
-    def _map_specific_rules(self, row, name):
-        errs = []
-        if name == '净网行动':
-            cv = row.get('count_value')
-            if pd.isna(cv) or not str(cv).isdigit() or int(cv) < 0:
-                errs.append(f"净网行动计数值应为正整数，当前: {cv}")
-        return errs
+    def _map_specific_rules(self, df, names, report, by_value):
+        is_malwarfare = names == '净网行动'
+        if not is_malwarfare.any():
+            return
+        cv_text = self._text_column(df, 'count_value')
+        cv_ok = cv_text.str.isdigit().astype(bool)
+        report(is_malwarfare & ~cv_ok, by_value(cv_text, "净网行动计数值应为正整数，当前: {}"))
 
-    def _mutator_specific_rules(self, row, name): return []
\ No newline at end of file
+    def _mutator_specific_rules(self, df, names, report, by_value): return
@@ -1,11 +1,16 @@
 import pandas as pd
 import datetime
 import sys
-from openpyxl import load_workbook
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Protection
 from openpyxl.utils import get_column_letter
 from src.utils.temp_translate_utils import MUTATOR_HEADER_MAP, MAP_HEADER_MAP
 
+# 流式导入时每个 DataFrame 分块的行数
+IMPORT_CHUNK_ROWS = 5000
+
+
 class ExcelUtil:
 
     @staticmethod
@@ -27,70 +32,112 @@ class ExcelUtil:
 
     @staticmethod
     def export_configs(data_list, file_path, config_type='map'):
-        """导出配置，强制 B 列为文本格式并优化列宽"""
+        """导出配置（字典列表），转换为按列存放的数据后交给 export_columns"""
         header_map = MAP_HEADER_MAP if config_type == 'map' else MUTATOR_HEADER_MAP
-        df = pd.DataFrame(data_list)
-        
-        # 补齐标题列
-        for col in header_map.keys():
-            if col not in df.columns:
-                df[col] = "" 
-        
-        df = df[list(header_map.keys())].rename(columns=header_map)
+        columns = {key: [item.get(key, "") for item in data_list] for key in header_map.keys()}
+        ExcelUtil.export_columns(columns, file_path, config_type)
 
-        with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False)
-        
-        wb = load_workbook(file_path)
-        ws = wb.active
-        
-        # --- 重点：固定 B 列（时间点）为文本格式 ---
-        # 即使是空行也应用此格式，确保用户后续输入时不会被自动转换
-        for row_idx in range(1, 1000): # 预设处理 1000 行
-            ws.cell(row=row_idx, column=2).number_format = '@'
-
-        # 自动调整列宽并解锁
-        for i, col_cells in enumerate(ws.columns, start=1):
-            max_length = 0
-            column_letter = get_column_letter(i)
-            for cell in col_cells:
-                max_length = max(max_length, ExcelUtil._get_column_width(cell.value))
-                cell.protection = Protection(locked=False)
-            ws.column_dimensions[column_letter].width = max_length + 2
+    @staticmethod
+    def export_columns(columns, file_path, config_type='map'):
+        """
+        按列导出配置：columns 为 {字段名: 该列全部值}，缺少的字段导出为空列。
+        使用 openpyxl 只写模式逐行流式写入，列宽按列预先计算；
+        B 列（时间点）固定为文本格式，所有单元格解锁后开启工作表保护以维持格式。
+        """
+        header_map = MAP_HEADER_MAP if config_type == 'map' else MUTATOR_HEADER_MAP
+        keys = list(header_map.keys())
+        n_rows = max((len(v) for v in columns.values()), default=0)
+        data = [list(columns.get(key, ())) or [""] * n_rows for key in keys]
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        unlocked = Protection(locked=False)
+
+        # 列宽与列样式需要在写入任何行之前设置；列样式同样作用于之后用户新增的空行
+        for i, (key, values) in enumerate(zip(keys, data), start=1):
+            width = max(
+                [ExcelUtil._get_column_width(header_map[key])] + [ExcelUtil._get_column_width(v) for v in values]
+            )
+            dim = ws.column_dimensions[get_column_letter(i)]
+            dim.width = width + 2
+            dim.protection = unlocked
+            if i == 2:
+                dim.number_format = '@'
+
+        def make_cell(value, col_idx):
+            cell = WriteOnlyCell(ws, value=value)
+            cell.protection = unlocked
+            if col_idx == 2:
+                cell.number_format = '@'
+            return cell
+
+        ws.append([make_cell(header_map[key], i) for i, key in enumerate(keys, start=1)])
+        for row in zip(*data):
+            ws.append([make_cell(value, i) for i, value in enumerate(row, start=1)])
 
         ws.protection.sheet = True # 开启保护以维持格式，由于单元格 unlocked，用户仍可编辑
         wb.save(file_path)
 
     @staticmethod
-    def import_configs(file_path, config_type='map'):
-        """读取 Excel，并根据业务逻辑清洗数据"""
+    def iter_config_frames(file_path, config_type='map', chunk_rows=IMPORT_CHUNK_ROWS):
+        """
+        流式读取 Excel（openpyxl 只读模式），每 chunk_rows 行产出一个 DataFrame，内存占用与表格大小无关。
+        列名已换算为数据库字段名，索引为 Excel 中的实际行号；名称为空的行被跳过，
+        非“净网行动”的行清空 count_value。表头缺少名称列时抛出 ValueError。
+        """
         header_map = MAP_HEADER_MAP if config_type == 'map' else MUTATOR_HEADER_MAP
         rev_map = {v: k for k, v in header_map.items()}
-        
+
         identity_key = 'map_name' if config_type == 'map' else 'mutator_name'
         identity_chs = header_map[identity_key]
 
+        wb = load_workbook(file_path, read_only=True, data_only=True)
         try:
-            # 强制将所有列读为 object，防止初次解析时丢失精度
-            df = pd.read_excel(file_path, dtype=object)
-            df = df.where(pd.notnull(df), None)
-
-            if identity_chs not in df.columns:
-                return None, f"❌ 找不到 '{identity_chs}' 列，请检查表头。"
-
-            df = df.rename(columns=rev_map)
-            data = df.to_dict(orient='records')
-
-            results = []
-            for row in data:
+            ws = wb.worksheets[0]
+            # 部分工具生成的文件记录的表格尺寸不准确，忽略它并读到实际末尾
+            ws.reset_dimensions()
+            rows = ws.iter_rows(values_only=True)
+
+            header = next(rows, None) or ()
+            columns = [rev_map.get(h, h) for h in header]
+            if identity_key not in columns:
+                raise ValueError(f"❌ 找不到 '{identity_chs}' 列，请检查表头。")
+            id_pos = columns.index(identity_key)
+            width = len(columns)
+
+            buffer, line_numbers = [], []
+            for line, values in enumerate(rows, start=2):
                 # 过滤完全空的行
-                if pd.isna(row.get(identity_key)): continue
+                if len(values) <= id_pos or values[id_pos] is None:
+                    continue
+                values = tuple(values[:width]) + (None,) * (width - len(values))
+                buffer.append(values)
+                line_numbers.append(line)
+                if len(buffer) >= chunk_rows:
+                    yield ExcelUtil._make_config_frame(buffer, columns, line_numbers)
+                    buffer, line_numbers = [], []
+            if buffer:
+                yield ExcelUtil._make_config_frame(buffer, columns, line_numbers)
+        finally:
+            wb.close()
 
-                # 业务逻辑：非“净网行动”清空 count_value
-                if str(row.get('map_name')).strip() != '净网行动':
-                    row['count_value'] = None
+    @staticmethod
+    def _make_config_frame(rows, columns, line_numbers):
+        # dtype=object 保留单元格原始类型（避免含空值的整数列被推断为浮点数）
+        df = pd.DataFrame(rows, columns=columns, index=line_numbers, dtype=object)
+        df = df.where(pd.notnull(df), None)
+        # 业务逻辑：非“净网行动”清空 count_value
+        if 'count_value' in df.columns and 'map_name' in df.columns:
+            df.loc[df['map_name'].astype(str).str.strip() != '净网行动', 'count_value'] = None
+        return df
 
-                results.append(row)
+    @staticmethod
+    def import_configs(file_path, config_type='map'):
+        """读取 Excel，并根据业务逻辑清洗数据，返回 (字典列表, 错误信息)"""
+        try:
+            results = []
+            for df in ExcelUtil.iter_config_frames(file_path, config_type):
+                results.extend(df.to_dict(orient='records'))
             return results, None
         except Exception as e:
             return None, str(e)
@@ -0,0 +1,458 @@
+# src/utils/timeline_analysis.py
+# 批量时间轴分析：用 NumPy 一次性算出整局游戏中每条提醒的显示区间、重叠数量、
+# 同屏提醒峰值和音频冲突，用于调整 MAP_ALERT_SECONDS / 突变因子提醒窗口 / 自定义倒计时等参数。
+# 区间规则与 alert_rules / TimelineSimulator 逐秒模拟的结果一致，但不需要逐秒推进。
+#
+# 示例：
+#   python -m src.utils.timeline_analysis                       # 全部地图 x 各突变因子
+#   python -m src.utils.timeline_analysis --map 亡者之夜 --mutators VoidRifts,KillBots \
+#       --map-alert-seconds 20 --countdown 300:120:神器
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src import config
+from src.db import map_daos, mutator_daos
+from src.db.timeline_cache import TimelineCache
+from src.utils.timeline_simulator import (
+    SOURCE_COUNTDOWN,
+    SOURCE_MAP,
+    SOURCE_MUTATOR,
+    format_clock,
+    load_timelines_from_dbs,
+    parse_countdown_spec,
+    resolve_mutator_config_name,
+)
+
+
+@dataclass(frozen=True)
+class AlertSettings:
+    """参与分析的提醒参数，默认取自 config，可用 dataclasses.replace 生成假设方案"""
+    map_alert_seconds: int = 30
+    map_warning_seconds: int = 10
+    mutator_alert_seconds: int = 49
+    mutator_warning_seconds: int = 10
+    countdown_warning_seconds: int = 10
+    countdown_max_concurrent: int = 3
+    sound_cooldown: float = 20.0
+    sound_collision_window: int = 2   # 两个音频开始时间相差小于该秒数视为冲突
+
+    @classmethod
+    def from_config(cls) -> 'AlertSettings':
+        return cls(
+            map_alert_seconds=int(config.MAP_ALERT_SECONDS),
+            map_warning_seconds=int(config.MAP_ALERT_WARNING_THRESHOLD_SECONDS),
+            mutator_alert_seconds=int(config.MUTATOR_ALERT_SECONDS),
+            mutator_warning_seconds=int(config.MUTATOR_WARNING_THRESHOLD_SECONDS),
+            countdown_warning_seconds=int(getattr(config, 'COUNTDOWN_WARNING_THRESHOLD_SECONDS', 10)),
+            countdown_max_concurrent=int(config.COUNTDOWN_MAX_CONCURRENT),
+            sound_cooldown=float(config.ALERT_SOUND_COOLDOWN),
+        )
+
+
+@dataclass
+class AlertIntervals:
+    """每条提醒的显示区间 [starts, ends]（含两端，单位为游戏秒）"""
+    ids: Tuple[str, ...]
+    sources: Tuple[str, ...]
+    starts: np.ndarray          # int64
+    ends: np.ndarray            # int64
+    sound_starts: np.ndarray    # int64，开始请求音频的秒数，无音频为 -1
+    sounds: Tuple[str, ...]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+@dataclass
+class ClutterReport:
+    """一局游戏的提醒拥挤度统计"""
+    start: int
+    duration: int
+    intervals: AlertIntervals
+    concurrency: np.ndarray         # 每秒同屏提醒数，下标 0 对应 start
+    overlap_counts: np.ndarray      # 每条提醒显示期间与之重叠的其他提醒数
+    peak_concurrency: int
+    peak_seconds: np.ndarray        # 达到峰值的游戏秒
+    sound_plays: List[Tuple[int, str, str]] = field(default_factory=list)       # (秒, 提醒ID, 音频)
+    suppressed_sounds: List[Tuple[int, str, str]] = field(default_factory=list)  # 被同名冷却吞掉的首次请求
+    sound_collisions: List[Tuple[int, str, int, str]] = field(default_factory=list)
+
+    def summary(self) -> dict:
+        visible = self.concurrency[self.concurrency > 0]
+        return {
+            'alerts': len(self.intervals),
+            'peak': self.peak_concurrency,
+            'peak_at': [format_clock(t) for t in self.peak_seconds[:5].tolist()],
+            'mean_visible': round(float(visible.mean()), 2) if visible.size else 0.0,
+            'seconds_over_2': int(np.count_nonzero(self.concurrency > 2)),
+            'max_overlap': int(self.overlap_counts.max()) if self.overlap_counts.size else 0,
+            'sounds': len(self.sound_plays),
+            'suppressed_sounds': len(self.suppressed_sounds),
+            'sound_collisions': len(self.sound_collisions),
+        }
+
+
+# === 区间计算 ===
+
+def map_alert_intervals(map_timeline, settings: AlertSettings) -> AlertIntervals:
+    """地图事件：剩余时间在 (0, map_alert_seconds] 内显示，进入警告阈值后请求音频"""
+    if map_timeline is None or not len(map_timeline):
+        return _empty_intervals()
+    targets = map_timeline.time_values.astype(np.int64)
+    starts = targets - settings.map_alert_seconds
+    ends = targets - 1
+    sound_starts = targets - min(settings.map_warning_seconds, settings.map_alert_seconds)
+    sounds = tuple(s.strip() for s in map_timeline.sounds)
+    has_sound = np.array([bool(s) for s in sounds], dtype=bool)
+    sound_starts = np.where(has_sound & (settings.map_warning_seconds > 0), sound_starts, -1)
+    return AlertIntervals(
+        ids=tuple(f"map_event_{row}" for row in range(len(map_timeline))),
+        sources=(SOURCE_MAP,) * len(map_timeline),
+        starts=starts,
+        ends=ends,
+        sound_starts=sound_starts,
+        sounds=sounds,
+    )
+
+
+def mutator_alert_intervals(mutator_name, mutator_timeline, settings: AlertSettings) -> AlertIntervals:
+    """
+    突变因子：始终只提示下一个时间点，剩余时间 <= mutator_alert_seconds 时显示。
+    第 i 个时间点从 max(p[i] - 窗口, p[i-1]) 开始显示到 p[i] - 1。
+    """
+    if mutator_timeline is None or not len(mutator_timeline):
+        return _empty_intervals()
+    points = mutator_timeline.time_values.astype(np.int64)
+    previous = np.concatenate(([np.iinfo(np.int64).min // 2], points[:-1]))
+    starts = np.maximum(points - settings.mutator_alert_seconds, previous)
+    ends = points - 1
+    warn = min(settings.mutator_warning_seconds, settings.mutator_alert_seconds)
+    sound_starts = np.maximum(points - warn, starts)
+    sounds = tuple(s.strip() for s in mutator_timeline.sounds)
+    has_sound = np.array([bool(s) for s in sounds], dtype=bool)
+    sound_starts = np.where(has_sound & (warn > 0), sound_starts, -1)
+    return AlertIntervals(
+        ids=(mutator_name,) * len(mutator_timeline),
+        sources=(SOURCE_MUTATOR,) * len(mutator_timeline),
+        starts=starts,
+        ends=ends,
+        sound_starts=sound_starts,
+        sounds=sounds,
+    )
+
+
+def countdown_alert_intervals(countdowns, settings: AlertSettings) -> AlertIntervals:
+    """
+    自定义倒计时：按启动时间入队，超过并发上限时挤掉最早的一个（与 CountdownManager 一致）。
+    倒计时数量很少，入队顺序直接逐个处理。
+    """
+    if not countdowns:
+        return _empty_intervals()
+    active: List[int] = []
+    ids, starts, ends, targets, sounds = [], [], [], [], []
+    for index, spec in enumerate(sorted(countdowns, key=lambda c: c['start'])):
+        start, target = int(spec['start']), int(spec['start']) + int(spec['time'])
+        # 入队时仍在列表中的倒计时（包括本秒到期、尚未移除的）参与挤占
+        active = [i for i in active if ends[i] + 1 >= start]
+        if len(active) >= settings.countdown_max_concurrent:
+            evicted = active.pop(0)
+            ends[evicted] = min(ends[evicted], start - 1)
+        ids.append(f"custom_cd_{index + 1}")
+        starts.append(start)
+        ends.append(target - 1)
+        targets.append(target)
+        sounds.append(spec.get('sound') or '')
+        active.append(index)
+
+    # 倒计时的音频只在首次进入警告时请求一次，且需同时满足提示框的警告阈值
+    sound_starts = []
+    for index, target in enumerate(targets):
+        sound_at = max(starts[index], target - settings.countdown_warning_seconds)
+        if sounds[index] and sound_at <= ends[index] and target - sound_at <= settings.map_warning_seconds:
+            sound_starts.append(sound_at)
+        else:
+            sound_starts.append(-1)
+
+    return AlertIntervals(
+        ids=tuple(ids),
+        sources=(SOURCE_COUNTDOWN,) * len(ids),
+        starts=np.array(starts, dtype=np.int64),
+        ends=np.array(ends, dtype=np.int64),
+        sound_starts=np.array(sound_starts, dtype=np.int64),
+        sounds=tuple(sounds),
+    )
+
+
+def concat_intervals(parts: Sequence[AlertIntervals]) -> AlertIntervals:
+    parts = [p for p in parts if len(p)]
+    if not parts:
+        return _empty_intervals()
+    return AlertIntervals(
+        ids=sum((p.ids for p in parts), ()),
+        sources=sum((p.sources for p in parts), ()),
+        starts=np.concatenate([p.starts for p in parts]),
+        ends=np.concatenate([p.ends for p in parts]),
+        sound_starts=np.concatenate([p.sound_starts for p in parts]),
+        sounds=sum((p.sounds for p in parts), ()),
+    )
+
+
+def _empty_intervals() -> AlertIntervals:
+    empty = np.zeros(0, dtype=np.int64)
+    return AlertIntervals((), (), empty, empty.copy(), empty.copy(), ())
+
+
+def _clip_intervals(intervals: AlertIntervals, start, duration) -> AlertIntervals:
+    starts = np.maximum(intervals.starts, start)
+    ends = np.minimum(intervals.ends, duration)
+    keep = starts <= ends
+    sound_starts = np.where(
+        (intervals.sound_starts >= starts) & (intervals.sound_starts <= ends), intervals.sound_starts, -1)
+    # 显示区间被 start 截断时，已经处于警告阈值内的提醒在首个 tick 就请求音频
+    late = (intervals.sound_starts >= 0) & (intervals.sound_starts < starts) & (starts <= ends)
+    sound_starts = np.where(late, starts, sound_starts)
+    index = np.flatnonzero(keep)
+    return AlertIntervals(
+        ids=tuple(intervals.ids[i] for i in index),
+        sources=tuple(intervals.sources[i] for i in index),
+        starts=starts[index],
+        ends=ends[index],
+        sound_starts=sound_starts[index],
+        sounds=tuple(intervals.sounds[i] for i in index),
+    )
+
+
+# === 统计 ===
+
+def _concurrency(intervals: AlertIntervals, start, duration) -> np.ndarray:
+    length = duration - start + 1
+    delta = np.zeros(length + 1, dtype=np.int64)
+    np.add.at(delta, intervals.starts - start, 1)
+    np.add.at(delta, intervals.ends - start + 1, -1)
+    return np.cumsum(delta[:-1])
+
+
+def _overlap_counts(intervals: AlertIntervals) -> np.ndarray:
+    """区间 i 与多少个其他区间相交：#(start_j <= end_i) - #(end_j < start_i) - 1"""
+    if not len(intervals):
+        return np.zeros(0, dtype=np.int64)
+    sorted_starts = np.sort(intervals.starts)
+    sorted_ends = np.sort(intervals.ends)
+    began = np.searchsorted(sorted_starts, intervals.ends, side='right')
+    finished = np.searchsorted(sorted_ends, intervals.starts, side='left')
+    return began - finished - 1
+
+
+def _sound_plays(intervals: AlertIntervals, settings: AlertSettings):
+    """
+    警告阶段每秒都会请求一次音频，由 SoundManager 的同名冷却决定是否真正播放。
+    先把全部请求展开成 (秒, 提醒, 音频) 数组，再按音频名逐个执行冷却。
+    """
+    has_sound = np.flatnonzero(intervals.sound_starts >= 0)
+    if has_sound.size == 0:
+        return [], []
+
+    sound_starts = intervals.sound_starts[has_sound]
+    request_counts = intervals.ends[has_sound] - sound_starts + 1
+    # 倒计时只请求一次
+    is_countdown = np.array([intervals.sources[i] == SOURCE_COUNTDOWN for i in has_sound], dtype=bool)
+    request_counts = np.where(is_countdown, 1, request_counts)
+
+    owner = np.repeat(has_sound, request_counts)
+    offsets = np.arange(owner.size) - np.repeat(np.cumsum(request_counts) - request_counts, request_counts)
+    request_times = np.repeat(sound_starts, request_counts) + offsets
+    names = np.array([intervals.sounds[i] for i in owner], dtype=object)
+
+    plays, suppressed = [], []
+    order = np.lexsort((owner, request_times, names))
+    last_played: Dict[str, int] = {}
+    first_request = set()
+    for i in order.tolist():
+        t, alert_index, name = int(request_times[i]), int(owner[i]), names[i]
+        last = last_played.get(name)
+        played = last is None or (t - last) >= settings.sound_cooldown
+        if played:
+            last_played[name] = t
+            plays.append((t, intervals.ids[alert_index], name))
+        if alert_index not in first_request:
+            first_request.add(alert_index)
+            if not played:
+                suppressed.append((t, intervals.ids[alert_index], name))
+    plays.sort()
+    suppressed.sort()
+    return plays, suppressed
+
+
+def _sound_collisions(plays, window) -> List[Tuple[int, str, int, str]]:
+    """开始时间相差小于 window 秒的两个不同音频"""
+    if len(plays) < 2 or window <= 0:
+        return []
+    times = np.array([p[0] for p in plays], dtype=np.int64)
+    upper = np.searchsorted(times, times + window, side='left')
+    collisions = []
+    for i in np.flatnonzero(upper - np.arange(len(times)) > 1).tolist():
+        for j in range(i + 1, int(upper[i])):
+            if plays[i][2] != plays[j][2]:
+                collisions.append((plays[i][0], plays[i][2], plays[j][0], plays[j][2]))
+    return collisions
+
+
+def analyze_timeline(map_timeline=None, mutator_timelines=None, countdowns=None,
+                     settings: Optional[AlertSettings] = None, duration=None, start=0) -> ClutterReport:
+    """
+    一次性计算整局游戏的提醒区间和拥挤度。
+    duration 默认取最后一个事件 / 时间点的时间。
+    """
+    settings = settings or AlertSettings.from_config()
+    # 拼接顺序与逐秒处理顺序一致：突变因子 -> 地图事件 -> 自定义倒计时
+    parts = [
+        mutator_alert_intervals(mutator_name, timeline, settings)
+        for mutator_name, timeline in (mutator_timelines or {}).items()
+    ]
+    parts.append(map_alert_intervals(map_timeline, settings))
+    parts.append(countdown_alert_intervals(countdowns, settings))
+    intervals = concat_intervals(parts)
+
+    if duration is None:
+        duration = int(intervals.ends.max()) + 1 if len(intervals) else start
+    start, duration = int(start), max(int(start), int(duration))
+    intervals = _clip_intervals(intervals, start, duration)
+
+    concurrency = _concurrency(intervals, start, duration)
+    peak = int(concurrency.max()) if concurrency.size else 0
+    peak_seconds = np.flatnonzero(concurrency == peak) + start if peak else np.zeros(0, dtype=np.int64)
+    plays, suppressed = _sound_plays(intervals, settings)
+
+    return ClutterReport(
+        start=start,
+        duration=duration,
+        intervals=intervals,
+        concurrency=concurrency,
+        overlap_counts=_overlap_counts(intervals),
+        peak_concurrency=peak,
+        peak_seconds=peak_seconds,
+        sound_plays=plays,
+        suppressed_sounds=suppressed,
+        sound_collisions=_sound_collisions(plays, settings.sound_collision_window),
+    )
+
+
+# === 全部地图 x 突变因子 ===
+
+def sweep_all(maps_db_path, mutators_db_path, settings: Optional[AlertSettings] = None,
+              countdowns=None, enemy_race=None, duration=None) -> List[dict]:
+    """对每张（按时钟驱动的）地图，分别在无因子和每个需要提示的突变因子下统计"""
+    settings = settings or AlertSettings.from_config()
+    maps_conn = _open_ro(maps_db_path)
+    mutators_conn = _open_ro(mutators_db_path)
+    try:
+        map_cache = TimelineCache(maps_conn, maps_db_path, TimelineCache.KIND_MAP)
+        mutator_cache = TimelineCache(mutators_conn, mutators_db_path, TimelineCache.KIND_MUTATOR)
+        notify_names = mutator_daos.get_all_notify_mutator_names(mutators_conn)
+        # 神族变式由 enemy_race 选择，不单独列出
+        mutator_names = [n for n in notify_names if n != 'AggressiveDeploymentProtoss']
+
+        rows = []
+        for map_name in map_daos.get_all_map_names(maps_conn):
+            if map_name == '净网行动':
+                continue
+            map_timeline = map_cache.get(map_name)
+            for mutator_name in [None] + mutator_names:
+                mutator_timelines = {}
+                if mutator_name:
+                    config_name = resolve_mutator_config_name(mutator_name, enemy_race)
+                    timeline = mutator_cache.get(config_name)
+                    if timeline is not None:
+                        mutator_timelines[config_name] = timeline
+                report = analyze_timeline(map_timeline, mutator_timelines, countdowns, settings, duration)
+                rows.append({'map': map_name, 'mutator': mutator_name or '-', **report.summary()})
+        return rows
+    finally:
+        maps_conn.close()
+        mutators_conn.close()
+
+
+def _open_ro(path):
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from src.db.db_manager import DBManager
+
+    parser = argparse.ArgumentParser(description="Keiframe 提醒拥挤度批量分析")
+    parser.add_argument('--map', dest='map_name', help="只分析一张地图，默认分析全部地图 x 各突变因子")
+    parser.add_argument('--mutators', default='', help="与 --map 配合使用，逗号分隔的突变因子英文名")
+    parser.add_argument('--enemy-race', default=None, help="敌方种族，Protoss 时部署因子使用神族变式")
+    parser.add_argument('--countdown', action='append', default=[],
+                        help="自定义倒计时 START:DURATION[:LABEL[:SOUND]]，可重复")
+    parser.add_argument('--duration', type=int, default=None, help="分析到的游戏秒数，默认到最后一个事件")
+    parser.add_argument('--map-alert-seconds', type=int, default=None)
+    parser.add_argument('--map-warning-seconds', type=int, default=None)
+    parser.add_argument('--mutator-alert-seconds', type=int, default=None)
+    parser.add_argument('--mutator-warning-seconds', type=int, default=None)
+    parser.add_argument('--countdown-max', type=int, default=None, help="自定义倒计时并发上限")
+    parser.add_argument('--sound-cooldown', type=float, default=None)
+    parser.add_argument('--collision-window', type=int, default=None, help="音频冲突判定窗口（秒）")
+    parser.add_argument('--json', action='store_true', help="以 JSONL 输出")
+    parser.add_argument('--maps-db', default=None, help="maps.db 路径，默认使用 resources/db")
+    parser.add_argument('--mutators-db', default=None, help="mutators.db 路径，默认使用 resources/db")
+    args = parser.parse_args(argv)
+
+    overrides = {
+        'map_alert_seconds': args.map_alert_seconds,
+        'map_warning_seconds': args.map_warning_seconds,
+        'mutator_alert_seconds': args.mutator_alert_seconds,
+        'mutator_warning_seconds': args.mutator_warning_seconds,
+        'countdown_max_concurrent': args.countdown_max,
+        'sound_cooldown': args.sound_cooldown,
+        'sound_collision_window': args.collision_window,
+    }
+    settings = replace(AlertSettings.from_config(), **{k: v for k, v in overrides.items() if v is not None})
+
+    db_manager = DBManager()
+    maps_db_path = args.maps_db or db_manager.maps_db_path
+    mutators_db_path = args.mutators_db or db_manager.mutators_db_path
+
+    wall_start = time.perf_counter()
+    try:
+        countdowns = [parse_countdown_spec(spec) for spec in args.countdown]
+        if args.map_name:
+            mutator_names = [m.strip() for m in args.mutators.split(',') if m.strip()]
+            map_timeline, mutator_timelines = load_timelines_from_dbs(
+                maps_db_path, mutators_db_path, args.map_name, mutator_names, enemy_race=args.enemy_race,
+            )
+            report = analyze_timeline(map_timeline, mutator_timelines, countdowns, settings, args.duration)
+            rows = [{'map': args.map_name, 'mutator': ','.join(mutator_names) or '-', **report.summary()}]
+        else:
+            rows = sweep_all(maps_db_path, mutators_db_path, settings, countdowns,
+                             enemy_race=args.enemy_race, duration=args.duration)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    elapsed = time.perf_counter() - wall_start
+
+    for row in rows:
+        if args.json:
+            print(json.dumps(row, ensure_ascii=False))
+        else:
+            print(
+                f"{row['map']:<10}\t{row['mutator']:<22}\talerts={row['alerts']:<4} peak={row['peak']} "
+                f"over2={row['seconds_over_2']:<4} overlap={row['max_overlap']} "
+                f"sounds={row['sounds']:<3} suppressed={row['suppressed_sounds']:<3} "
+                f"collisions={row['sound_collisions']}"
+            )
+    print(f"combinations={len(rows)} wall={elapsed * 1000:.1f}ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,381 @@
+# src/utils/timeline_simulator.py
+# 无界面时间轴模拟器：从数据库加载地图 + 突变因子，用合成游戏时钟驱动
+# 地图事件 / 突变因子 / 自定义倒计时的提醒规则（alert_rules），把提醒流输出为 JSONL。
+#
+# 用途：
+# 1. 回归基准：修改数据库背板后，对比前后输出的提醒流。
+# 2. 吞吐基准：统计模拟时钟相对现实时间的加速倍数。
+#
+# 示例：
+#   python -m src.utils.timeline_simulator --map 亡者之夜 --mutators VoidRifts,KillBots \
+#       --countdown 300:120:神器 --duration 1800 --output alerts.jsonl
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from typing import Dict, Iterator, List, Optional
+
+from src import config
+from src.db import map_daos, mutator_daos
+from src.db.timeline_cache import TimelineCache
+from src.event_managers_and_notifiers.alert_rules import (
+    build_countdown_message,
+    build_map_alert_message,
+    build_mutator_alert_message,
+    find_next_time_point,
+    map_alert_rows,
+    mutator_color_and_sound,
+    toast_color_and_sound,
+)
+
+SOURCE_MAP = 'map'
+SOURCE_MUTATOR = 'mutator'
+SOURCE_COUNTDOWN = 'countdown'
+
+
+def format_clock(seconds) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600:02d}:{(seconds % 3600) // 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+def parse_countdown_spec(spec) -> dict:
+    """解析 START:DURATION[:LABEL[:SOUND]]，START / DURATION 为秒数或 mm:ss"""
+    parts = spec.split(':')
+    # 允许 START 使用 mm:ss 形式，例如 5:00:120:神器
+    numbers = []
+    while parts and parts[0].strip().isdigit() and len(numbers) < 3:
+        numbers.append(int(parts.pop(0)))
+    if len(numbers) == 3:
+        start, duration = numbers[0] * 60 + numbers[1], numbers[2]
+    elif len(numbers) == 2:
+        start, duration = numbers
+    else:
+        raise ValueError(f"倒计时格式错误: {spec} (应为 START:DURATION[:LABEL[:SOUND]])")
+
+    label = parts[0] if parts else '自定义'
+    sound = parts[1] if len(parts) > 1 else None
+    if sound is None:
+        for opt in config.COUNTDOWN_OPTIONS:
+            if opt.get('label') == label:
+                sound = opt.get('sound')
+                break
+    return {'start': start, 'time': duration, 'label': label, 'sound': sound}
+
+
+class TimelineSimulator:
+    """
+    用合成的整秒游戏时钟驱动提醒规则。
+
+    每个 tick 的处理顺序与 game_time_handler.update_game_time 一致：
+    突变因子 -> 地图事件 -> 自定义倒计时。
+    """
+
+    def __init__(self, map_timeline=None, mutator_timelines=None, countdowns=None,
+                 heroes_from_the_storm=False, emit_updates=False):
+        self.map_timeline = map_timeline
+        self.mutator_timelines = dict(mutator_timelines or {})
+        self.pending_countdowns = sorted(countdowns or [], key=lambda c: c['start'])
+        self.heroes_from_the_storm = heroes_from_the_storm
+        self.emit_updates = emit_updates
+
+        self.sound_cooldown = float(config.ALERT_SOUND_COOLDOWN)
+        self.reset()
+
+    def reset(self):
+        self._visible: Dict[str, dict] = {}
+        self._sound_last_played: Dict[str, float] = {}
+        self._active_countdowns: List[dict] = []
+        self._countdown_cursor = 0
+        self._countdown_counter = 0
+
+    # --- 单个 tick ---
+
+    def step(self, current_seconds) -> List[dict]:
+        records: List[dict] = []
+        shown: Dict[str, dict] = {}
+
+        self._step_mutators(current_seconds, shown)
+        self._step_map(current_seconds, shown)
+        self._step_countdowns(current_seconds, shown)
+
+        for event_id, alert in shown.items():
+            previous = self._visible.get(event_id)
+            if previous is None:
+                records.append(self._record(current_seconds, 'show', event_id, alert))
+            elif alert['color'] != previous['color']:
+                records.append(self._record(current_seconds, 'warn', event_id, alert))
+            elif self.emit_updates and alert['message'] != previous['message']:
+                records.append(self._record(current_seconds, 'update', event_id, alert))
+
+            # 只记录真正会播放的音频（同名冷却内的重复请求被丢弃）
+            sound = alert.get('sound')
+            if sound and self._play_sound(sound, current_seconds):
+                records.append(self._record(current_seconds, 'sound', event_id, alert))
+
+        for event_id in list(self._visible.keys()):
+            if event_id not in shown:
+                records.append(self._record(current_seconds, 'hide', event_id, self._visible[event_id]))
+
+        self._visible = shown
+        return records
+
+    def run(self, duration, start=0, speed=0.0) -> Iterator[dict]:
+        """
+        从 start 运行到 duration（含）。
+        speed <= 0 表示不限速；否则按“游戏秒 / 现实秒”的倍数限速，例如 1000。
+        """
+        wall_start = time.perf_counter()
+        for current_seconds in range(int(start), int(duration) + 1):
+            for record in self.step(current_seconds):
+                yield record
+            if speed > 0:
+                target = wall_start + (current_seconds - start + 1) / speed
+                delay = target - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+    # --- 各来源的提醒规则 ---
+
+    def _step_mutators(self, current_seconds, shown):
+        for mutator_name, timeline in self.mutator_timelines.items():
+            next_point = find_next_time_point(timeline.iter_time_points(), current_seconds)
+            if not next_point:
+                continue
+            time_remaining = next_point[0] - current_seconds
+            if time_remaining > config.MUTATOR_ALERT_SECONDS:
+                continue
+            warning_sound = next_point[2] if next_point[2] else None
+            color, sound = mutator_color_and_sound(time_remaining, warning_sound)
+            shown[mutator_name] = {
+                'source': SOURCE_MUTATOR,
+                'message': build_mutator_alert_message(mutator_name, time_remaining, next_point[1]),
+                'color': color,
+                'sound': sound,
+                'remaining': time_remaining,
+            }
+
+    def _step_map(self, current_seconds, shown):
+        timeline = self.map_timeline
+        if timeline is None:
+            return
+        for row, time_diff in map_alert_rows(timeline.time_values, current_seconds):
+            sound_filename = timeline.sounds[row].strip()
+            color, sound = toast_color_and_sound(time_diff, sound_filename)
+            shown[f"map_event_{row}"] = {
+                'source': SOURCE_MAP,
+                'message': build_map_alert_message(
+                    time_diff,
+                    timeline.time_labels[row],
+                    timeline.events[row],
+                    timeline.armies[row],
+                    timeline.heroes[row],
+                    self.heroes_from_the_storm,
+                ),
+                'color': color,
+                'sound': sound,
+                'remaining': time_diff,
+            }
+
+    def _step_countdowns(self, current_seconds, shown):
+        # 到达启动时间的倒计时加入队列（与 CountdownManager.confirm_selection 相同的 FIFO 上限）
+        while (
+            self._countdown_cursor < len(self.pending_countdowns)
+            and self.pending_countdowns[self._countdown_cursor]['start'] <= current_seconds
+        ):
+            spec = self.pending_countdowns[self._countdown_cursor]
+            self._countdown_cursor += 1
+            if len(self._active_countdowns) >= config.COUNTDOWN_MAX_CONCURRENT:
+                self._active_countdowns.pop(0)
+            self._countdown_counter += 1
+            self._active_countdowns.append({
+                'id': f"custom_cd_{self._countdown_counter}",
+                'target': spec['start'] + spec['time'],
+                'label': spec['label'],
+                'sound': spec['sound'],
+                'warned': False,
+            })
+
+        warn_threshold = getattr(config, 'COUNTDOWN_WARNING_THRESHOLD_SECONDS', 10)
+        custom_color = getattr(config, 'COUNTDOWN_DISPLAY_COLOR', 'rgb(0, 255, 255)')
+        for entry in self._active_countdowns[:]:
+            remaining = entry['target'] - current_seconds
+            if remaining <= 0:
+                self._active_countdowns.remove(entry)
+                continue
+
+            sound_to_play = None
+            if remaining <= warn_threshold and not entry['warned']:
+                sound_to_play = entry['sound']
+                entry['warned'] = True
+
+            color, sound = toast_color_and_sound(remaining, sound_to_play, custom_color)
+            shown[entry['id']] = {
+                'source': SOURCE_COUNTDOWN,
+                'message': build_countdown_message(entry['label'], remaining),
+                'color': color,
+                'sound': sound,
+                'remaining': remaining,
+            }
+
+    # --- 工具 ---
+
+    def _play_sound(self, filename, current_seconds) -> bool:
+        """按 SoundManager 的同名冷却规则判断是否真的会播放（以游戏秒计）"""
+        last = self._sound_last_played.get(filename)
+        if last is not None and (current_seconds - last) < self.sound_cooldown:
+            return False
+        self._sound_last_played[filename] = current_seconds
+        return True
+
+    @staticmethod
+    def _record(current_seconds, action, event_id, alert) -> dict:
+        record = {
+            't': int(current_seconds),
+            'clock': format_clock(current_seconds),
+            'source': alert['source'],
+            'id': event_id,
+            'action': action,
+            'remaining': alert['remaining'],
+            'message': alert['message'],
+            'color': alert['color'],
+        }
+        if action == 'sound':
+            record['sound'] = alert['sound']
+        return record
+
+
+def _open_db(path):
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def load_timelines_from_dbs(maps_db_path, mutators_db_path, map_name, mutator_names, enemy_race=None):
+    """
+    从数据库加载 (地图时间轴, {因子配置名: 因子时间轴})，
+    规则与 MutatorManager 的因子过滤 / 变式选择保持一致
+    """
+    map_timeline = None
+    if map_name:
+        maps_conn = _open_db(maps_db_path)
+        try:
+            if map_name == '净网行动':
+                raise ValueError("净网行动由 OCR 节点数驱动，不支持按游戏时钟模拟")
+            if map_name not in map_daos.get_all_map_names(maps_conn):
+                raise ValueError(f"数据库中不存在地图: {map_name}")
+            map_timeline = TimelineCache(maps_conn, maps_db_path, TimelineCache.KIND_MAP).get(map_name)
+        finally:
+            maps_conn.close()
+
+    mutator_timelines = {}
+    if mutator_names:
+        mutators_conn = _open_db(mutators_db_path)
+        try:
+            all_names = mutator_daos.get_all_mutator_names(mutators_conn)
+            notify_names = set(mutator_daos.get_all_notify_mutator_names(mutators_conn))
+            cache = TimelineCache(mutators_conn, mutators_db_path, TimelineCache.KIND_MUTATOR)
+            for mutator_name in mutator_names:
+                if mutator_name not in all_names:
+                    raise ValueError(f"数据库中不存在突变因子: {mutator_name}")
+                config_name = resolve_mutator_config_name(mutator_name, enemy_race)
+                if config_name not in notify_names:
+                    continue
+                timeline = cache.get(config_name)
+                if timeline is not None:
+                    mutator_timelines[config_name] = timeline
+        finally:
+            mutators_conn.close()
+
+    return map_timeline, mutator_timelines
+
+
+def resolve_mutator_config_name(mutator_name, enemy_race=None):
+    """部署因子在敌方为神族时使用神族变式"""
+    if mutator_name == 'AggressiveDeployment' and enemy_race == 'Protoss':
+        return 'AggressiveDeploymentProtoss'
+    return mutator_name
+
+
+def build_simulator_from_dbs(maps_db_path, mutators_db_path, map_name, mutator_names,
+                             enemy_race=None, countdowns=None, emit_updates=False) -> TimelineSimulator:
+    """从数据库构建模拟器"""
+    map_timeline, mutator_timelines = load_timelines_from_dbs(
+        maps_db_path, mutators_db_path, map_name, mutator_names, enemy_race=enemy_race,
+    )
+    return TimelineSimulator(
+        map_timeline=map_timeline,
+        mutator_timelines=mutator_timelines,
+        countdowns=countdowns,
+        heroes_from_the_storm='HeroesFromtheStorm' in (mutator_names or []),
+        emit_updates=emit_updates,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from src.db.db_manager import DBManager
+
+    parser = argparse.ArgumentParser(description="Keiframe 无界面时间轴模拟器")
+    parser.add_argument('--map', dest='map_name', help="地图名称，例如 亡者之夜")
+    parser.add_argument('--mutators', default='', help="逗号分隔的突变因子英文名，例如 VoidRifts,KillBots")
+    parser.add_argument('--enemy-race', default=None, help="敌方种族，Protoss 时部署因子使用神族变式")
+    parser.add_argument('--countdown', action='append', default=[],
+                        help="自定义倒计时 START:DURATION[:LABEL[:SOUND]]，可重复")
+    parser.add_argument('--start', type=int, default=0, help="起始游戏秒数")
+    parser.add_argument('--duration', type=int, default=3600, help="模拟到的游戏秒数")
+    parser.add_argument('--speed', type=float, default=0.0, help="时钟倍速（游戏秒/现实秒），0 表示不限速")
+    parser.add_argument('--updates', action='store_true', help="输出每次文本变化（默认只输出 show/warn/sound/hide）")
+    parser.add_argument('--repeat', type=int, default=1, help="重复运行次数，用于吞吐基准")
+    parser.add_argument('--output', default=None, help="JSONL 输出文件，默认 stdout")
+    parser.add_argument('--quiet', action='store_true', help="不输出提醒流，只输出统计")
+    parser.add_argument('--maps-db', default=None, help="maps.db 路径，默认使用 resources/db")
+    parser.add_argument('--mutators-db', default=None, help="mutators.db 路径，默认使用 resources/db")
+    args = parser.parse_args(argv)
+
+    db_manager = DBManager()
+    maps_db_path = args.maps_db or db_manager.maps_db_path
+    mutators_db_path = args.mutators_db or db_manager.mutators_db_path
+    mutator_names = [m.strip() for m in args.mutators.split(',') if m.strip()]
+
+    try:
+        countdowns = [parse_countdown_spec(spec) for spec in args.countdown]
+        simulator = build_simulator_from_dbs(
+            maps_db_path, mutators_db_path, args.map_name, mutator_names,
+            enemy_race=args.enemy_race, countdowns=countdowns, emit_updates=args.updates,
+        )
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    out = None
+    if not args.quiet:
+        out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+
+    record_count = 0
+    ticks = 0
+    wall_start = time.perf_counter()
+    try:
+        for _ in range(max(1, args.repeat)):
+            simulator.reset()
+            for record in simulator.run(args.duration, start=args.start, speed=args.speed):
+                record_count += 1
+                if out is not None:
+                    out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            ticks += max(0, args.duration - args.start + 1)
+    finally:
+        if out is not None and out is not sys.stdout:
+            out.close()
+    elapsed = max(time.perf_counter() - wall_start, 1e-9)
+
+    print(
+        f"ticks={ticks} records={record_count} wall={elapsed:.4f}s "
+        f"speedup={ticks / elapsed:.0f}x",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())